@@ -12,6 +12,14 @@ import datetime
 import threading
 import time
 import json
+import re
+import functools
+import operator
+import collections
+import itertools
+import contextlib
+import shutil
+import locale
 from pathlib import Path
 
 # Variables globales para el sistema de notificaciones
@@ -31,6 +39,21 @@ class NotificationItem:
         self.body = body
         self.timestamp = datetime.datetime.now()
 
+# Una red de 'nmcli device wifi list' (tupla: sin un dict por fila)
+WifiRow = collections.namedtuple('WifiRow', ('ssid', 'signal', 'security', 'in_use'))
+
+class BatteryInfo:
+    """Lectura de la batería (con __slots__: sin un dict nuevo por cada lectura)"""
+    __slots__ = ('percent', 'power_plugged', 'time_left', 'manufacturer', 'model', 'cycles')
+
+    def __init__(self, percent, power_plugged, time_left, manufacturer, model, cycles):
+        self.percent = percent
+        self.power_plugged = power_plugged
+        self.time_left = time_left
+        self.manufacturer = manufacturer
+        self.model = model
+        self.cycles = cycles
+
 # Intentar importar PyQt6 primero, luego PyQt5
 try:
     from PyQt6.QtWidgets import *
@@ -58,6 +81,1054 @@ except ImportError:
     PSUTIL_AVAILABLE = False
     print("Advertencia: psutil no disponible. Información del sistema limitada.")
 
+# orjson es opcional: solo acelera la lectura/escritura de la configuración
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _json_dumps(obj):
+    """Serializar a bytes (orjson si está disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+# pulsectl es opcional: habla el protocolo nativo de PulseAudio sin lanzar pactl
+try:
+    import pulsectl
+    PULSECTL_AVAILABLE = True
+except ImportError:
+    PULSECTL_AVAILABLE = False
+
+@functools.lru_cache(maxsize=None)
+def _pulse_connection():
+    if not PULSECTL_AVAILABLE:
+        return None
+    try:
+        # El volumen se consulta también desde el QThreadPool
+        return pulsectl.Pulse('desktop-panel', threading_lock=True)
+    except Exception:
+        return None
+
+def _pulse():
+    """Conexión compartida con PulseAudio (None si no hay pulsectl o servidor). Solo se
+    recuerda una conexión abierta: el servidor puede arrancar después que el panel"""
+    pulse = _pulse_connection()
+    if pulse is None and PULSECTL_AVAILABLE:
+        _pulse_connection.cache_clear()
+    return pulse
+
+def _pulse_reset(pulse):
+    """Cerrar una conexión que falló para reconectar en la próxima llamada"""
+    with contextlib.suppress(Exception):
+        pulse.close()
+    _pulse_connection.cache_clear()
+
+def _pulse_default_sink():
+    """(pulse, sink) del sink por defecto, o None para recurrir a pactl/amixer"""
+    pulse = _pulse()
+    if pulse is None:
+        return None
+    try:
+        return pulse, pulse.get_sink_by_name(pulse.server_info().default_sink_name)
+    except Exception as e:
+        # Servidor reiniciado o desconectado: reconectar en la próxima llamada
+        print(f"Error consultando PulseAudio: {e}")
+        _pulse_reset(pulse)
+        return None
+
+# QtDBus es opcional: permite enterarse de cambios de batería, discos y Bluetooth sin sondear
+try:
+    if PYQT_VERSION == 6:
+        from PyQt6.QtDBus import (QDBusAbstractAdaptor, QDBusConnection, QDBusMessage,
+                                  QDBusPendingCallWatcher)
+    else:
+        from PyQt5.QtDBus import (QDBusAbstractAdaptor, QDBusConnection, QDBusMessage,
+                                  QDBusPendingCallWatcher)
+    QTDBUS_AVAILABLE = True
+except ImportError:
+    QTDBUS_AVAILABLE = False
+
+# Intentar importar python-xlib para hablar con el servidor X sin lanzar procesos
+try:
+    from Xlib import X, Xatom, display as xdisplay, error as xerror
+    from Xlib.protocol import event as xevent
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+    print("Advertencia: python-xlib no disponible. Se usarán xprop/xdotool/wmctrl.")
+
+@functools.lru_cache(maxsize=None)
+def _x_display():
+    """Conexión X11 compartida por todo el panel (None si no está disponible)"""
+    if not XLIB_AVAILABLE:
+        return None
+    try:
+        return xdisplay.Display()
+    except Exception as e:
+        print(f"No se pudo abrir la conexión X11: {e}")
+        return None
+
+def _x_send_client_message(disp, window, message_type, data):
+    """Enviar un ClientMessage EWMH/ICCCM a la ventana raíz"""
+    ev = xevent.ClientMessage(
+        window=window,
+        client_type=disp.intern_atom(message_type),
+        data=(32, (list(data) + [0] * 5)[:5])
+    )
+    disp.screen().root.send_event(
+        ev, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+    disp.flush()
+
+def _x_set_properties(window_id, cardinals, atoms=None):
+    """Escribir propiedades CARDINAL de 32 bits ({nombre: [enteros]}) y de tipo ATOM
+    ({nombre: [nombres de átomo]}) encadenadas en la conexión X compartida, con un solo flush.
+    Devuelve False si no hay Xlib y hay que recurrir a xprop"""
+    disp = _x_display()
+    if disp is None:
+        return False
+    try:
+        win = disp.create_resource_object('window', window_id)
+        for name, names in (atoms or {}).items():
+            win.change_property(disp.intern_atom(name), Xatom.ATOM, 32,
+                                [disp.intern_atom(n) for n in names])
+        for name, values in cardinals.items():
+            win.change_property(disp.intern_atom(name), Xatom.CARDINAL, 32, values)
+        disp.flush()
+        return True
+    except Exception as e:
+        print(f"Error escribiendo propiedades con Xlib: {e}")
+        return False
+
+# Línea de wmctrl -l: "<id> <escritorio> <máquina> <título>"
+_WMCTRL_RE = re.compile(r'^(0x[0-9a-fA-F]+)[ \t]+\S+[ \t]+\S+[ \t]+(.*)$', re.MULTILINE)
+
+def _x_client_list(disp, watched):
+    """Ventanas gestionadas según _NET_CLIENT_LIST como [(id hex, título)], igual que wmctrl -l.
+    Se piden los PropertyNotify de cada ventana nueva para enterarse de los cambios de título"""
+    root = disp.screen().root
+    prop = root.get_full_property(disp.intern_atom('_NET_CLIENT_LIST'), Xatom.WINDOW)
+    net_wm_name = disp.intern_atom('_NET_WM_NAME')
+    utf8 = disp.intern_atom('UTF8_STRING')
+    windows = []
+    for xid in (prop.value if prop is not None else ()):
+        win = disp.create_resource_object('window', xid)
+        try:
+            if xid not in watched:
+                win.change_attributes(event_mask=X.PropertyChangeMask, onerror=lambda *args: None)
+            name = win.get_full_property(net_wm_name, utf8)
+            if name is not None:
+                title = name.value.decode('utf-8', 'replace')
+            else:
+                title = win.get_wm_name() or ''
+                if isinstance(title, bytes):
+                    title = title.decode('latin-1')
+        except Exception:
+            continue  # La ventana se cerró mientras se leía
+        windows.append((f"0x{xid:08x}", title))
+    watched.clear()
+    watched.update(int(window_id, 16) for window_id, _ in windows)
+    return windows
+
+# Hoja de estilo única del panel. Los menús desplegables son hijos del panel y la heredan,
+# así que cada widget solo necesita su objectName: Qt la analiza una sola vez
+_PANEL_QSS = """
+    QMainWindow {
+        background-color: #2e2e2e;
+        border-bottom: 1px solid #555;
+    }
+    QPushButton {
+        background-color: #404040;
+        border: 1px solid #555;
+        color: white;
+        padding: 5px 10px;
+        border-radius: 3px;
+    }
+    QPushButton:hover {
+        background-color: #505050;
+    }
+    QPushButton:pressed {
+        background-color: #606060;
+    }
+    QLabel {
+        color: white;
+        padding: 5px;
+    }
+
+    /* Monitor del sistema y reloj */
+    QLabel#SystemLabel {
+        color: #00ff00;
+        font-family: monospace;
+    }
+    QLabel#ClockLabel {
+        color: white;
+        font-weight: bold;
+        font-family: monospace;
+        font-size: 12px;
+    }
+
+    /* Indicadores de estado de la barra */
+    QPushButton#NetworkButton, QPushButton#VolumeButton, QPushButton#BatteryButton,
+    QPushButton#StorageButton, QPushButton#BluetoothButton {
+        background: transparent;
+        border: none;
+    }
+
+    /* Botones de la lista de ventanas */
+    QPushButton#WindowButton {
+        background-color: #505050;
+        border: 1px solid #666;
+        border-radius: 5px;
+        padding: 0;
+    }
+    QPushButton#WindowButton:hover {
+        background-color: #606060;
+    }
+    QPushButton#WindowButton:pressed {
+        background-color: #404040;
+    }
+
+    /* Campana de notificaciones: 'emoji' si no hay icono del tema, 'unread' con pendientes */
+    QPushButton#NotificationButton {
+        background: transparent;
+        border: none;
+        padding: 4px;
+    }
+    QPushButton#NotificationButton[emoji="true"] {
+        font-size: 16px;
+    }
+    QPushButton#NotificationButton:hover {
+        background: rgba(255, 255, 255, 0.1);
+        border-radius: 4px;
+    }
+    QPushButton#NotificationButton:pressed {
+        background: rgba(255, 255, 255, 0.2);
+    }
+    QPushButton#NotificationButton[unread="true"] {
+        background: rgba(255, 255, 255, 0.1);
+        border-radius: 4px;
+        color: white;
+    }
+    QPushButton#NotificationButton[unread="true"]:hover {
+        background: rgba(255, 255, 255, 0.2);
+    }
+
+    /* Estilo común de los menús desplegables */
+    QMenu#PanelPopup {
+        background: #ffffff;
+        border: 1px solid #d0d0d0;
+        border-radius: 8px;
+        padding: 4px;
+    }
+    QLabel#MenuTitle {
+        font-weight: bold;
+        color: #333333;
+        font-size: 14px;
+    }
+    QLabel#MenuEmpty {
+        color: #666666;
+        padding: 20px;
+    }
+    QFrame#MenuSeparator {
+        background: rgba(0, 0, 0, 0.1);
+        margin: 4px 0;
+    }
+    QListView#MenuList {
+        background: transparent;
+    }
+
+    /* Botones planos de "Configuración de ..." al pie de los menús */
+    QPushButton#MenuLinkButton {
+        background: transparent;
+        border: none;
+        padding: 8px;
+        text-align: left;
+        color: #333333;
+    }
+    QPushButton#MenuLinkButton:hover {
+        background: rgba(0, 0, 0, 0.05);
+        border-radius: 4px;
+    }
+
+    /* Menú de batería */
+    QLabel#BatteryPercent {
+        font-size: 24px;
+        font-weight: bold;
+        color: #333333;
+    }
+    QLabel#BatteryStatus {
+        color: #666666;
+    }
+    QWidget#BatteryInfoCard, QWidget#BatteryInfoCard QWidget {
+        background: rgba(0, 0, 0, 0.05);
+        border-radius: 8px;
+        padding: 8px;
+    }
+    QWidget#BatteryInfoCard QLabel {
+        color: #333333;
+        padding: 4px;
+    }
+
+    /* Tarjetas de dispositivos del menú de almacenamiento */
+    QWidget#DeviceCard, QWidget#DeviceCard QWidget {
+        background: rgba(0, 0, 0, 0.05);
+        border-radius: 8px;
+        padding: 8px;
+    }
+    QWidget#DeviceCard:hover, QWidget#DeviceCard QWidget:hover {
+        background: rgba(0, 0, 0, 0.08);
+    }
+    QWidget#DeviceCard QLabel#DeviceName {
+        color: #333333;
+    }
+    QWidget#DeviceCard QLabel#DeviceSize {
+        color: #666666;
+        font-size: 11px;
+    }
+    QWidget#DeviceCard QPushButton#OpenBtn {
+        background: #3daee9;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 8px;
+    }
+    QWidget#DeviceCard QPushButton#OpenBtn:hover {
+        background: #2196F3;
+    }
+    QWidget#DeviceCard QPushButton#EjectBtn {
+        background: transparent;
+        color: #333333;
+        border: 1px solid #cccccc;
+        border-radius: 4px;
+        padding: 4px 8px;
+    }
+    QWidget#DeviceCard QPushButton#EjectBtn:hover {
+        background: rgba(0, 0, 0, 0.05);
+    }
+
+    /* Menú de Bluetooth */
+    QPushButton#BluetoothPower {
+        background: transparent;
+        border: 1px solid #cccccc;
+        border-radius: 4px;
+        padding: 4px 8px;
+        color: #333333;
+    }
+    QPushButton#BluetoothPower:checked {
+        background: #3daee9;
+        color: white;
+        border: none;
+    }
+    QPushButton#BluetoothPower:hover {
+        background: #2196F3;
+        color: white;
+    }
+
+    /* Menú de volumen */
+    QLabel#VolumeTitle {
+        font-weight: bold;
+        color: #333333;
+        font-size: 13px;
+    }
+    QWidget#VolumeSliderCard, QWidget#VolumeSliderCard QWidget {
+        background: rgba(0, 0, 0, 0.05);
+        border-radius: 8px;
+        padding: 8px;
+    }
+    QSlider#VolumeSlider::groove:vertical {
+        background: #d0d0d0;
+        width: 6px;
+        border-radius: 3px;
+    }
+    QSlider#VolumeSlider::handle:vertical {
+        background: #3daee9;
+        border: none;
+        width: 20px;
+        height: 20px;
+        margin: 0 -7px;
+        border-radius: 10px;
+    }
+    QSlider#VolumeSlider::handle:vertical:hover {
+        background: #2196F3;
+    }
+    QSlider#VolumeSlider::sub-page:vertical {
+        background: #3daee9;
+        border-radius: 3px;
+    }
+    QSlider#VolumeSlider::add-page:vertical {
+        background: #d0d0d0;
+        border-radius: 3px;
+    }
+
+    /* Centro de notificaciones */
+    QPushButton#NotificationClearAll {
+        background: transparent;
+        border: none;
+        color: #666;
+        padding: 4px 8px;
+    }
+    QPushButton#NotificationClearAll:hover {
+        background: rgba(0, 0, 0, 0.1);
+        border-radius: 4px;
+    }
+    QPushButton#NotificationSettingsButton {
+        background: transparent;
+        border: 1px solid #cccccc;
+        border-radius: 4px;
+        padding: 8px;
+        color: #333333;
+    }
+    QPushButton#NotificationSettingsButton:hover {
+        background: rgba(0, 0, 0, 0.05);
+    }
+    QScrollArea#NotificationScroll {
+        border: none;
+        background: transparent;
+    }
+    QScrollArea#NotificationScroll QScrollBar:vertical {
+        border: none;
+        background: rgba(0, 0, 0, 0.1);
+        width: 8px;
+        border-radius: 4px;
+    }
+    QScrollArea#NotificationScroll QScrollBar::handle:vertical {
+        background: rgba(0, 0, 0, 0.2);
+        border-radius: 4px;
+    }
+    QScrollArea#NotificationScroll QScrollBar::handle:vertical:hover {
+        background: rgba(0, 0, 0, 0.3);
+    }
+    QWidget#NotificationCard, QWidget#NotificationCard QWidget {
+        background: rgba(0, 0, 0, 0.05);
+        border-radius: 8px;
+        padding: 8px;
+        margin: 2px 0;
+    }
+    QWidget#NotificationCard QLabel#NotificationTime {
+        color: #666;
+    }
+    QWidget#NotificationCard QPushButton#NotificationClose {
+        background: transparent;
+        border: none;
+        font-size: 16px;
+        font-weight: bold;
+        color: #666;
+    }
+    QWidget#NotificationCard QPushButton#NotificationClose:hover {
+        background: rgba(0, 0, 0, 0.1);
+        border-radius: 4px;
+        color: #333;
+    }
+
+    /* Diálogo de confirmación de las acciones de sesión */
+    QMessageBox#ConfirmBox QLabel {
+        color: #111;
+    }
+    QMessageBox#ConfirmBox QPushButton {
+        background: white;
+        color: #111;
+        border: 1px solid #bbb;
+        border-radius: 4px;
+        padding: 4px 16px;
+    }
+    QMessageBox#ConfirmBox QPushButton:hover {
+        background: #f0f0f0;
+    }
+"""
+
+# Hoja del diálogo de configuración: el mismo objeto str en cada apertura del diálogo
+_SETTINGS_QSS = """
+    QDialog {
+        background-color: #3e3e3e;
+        color: white;
+    }
+    QGroupBox {
+        font-weight: bold;
+        border: 1px solid #555;
+        margin-top: 10px;
+        padding-top: 5px;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px 0 5px;
+    }
+    QPushButton {
+        background-color: #505050;
+        border: 1px solid #666;
+        padding: 5px 15px;
+        border-radius: 3px;
+    }
+    QPushButton:hover {
+        background-color: #606060;
+    }
+"""
+
+# Tamaños de icono compartidos (se reutilizan en lugar de crear un QSize en cada llamada)
+_ICON_SIZE_20 = QSize(20, 20)
+_ICON_SIZE_22 = QSize(22, 22)
+_ICON_SIZE_24 = QSize(24, 24)
+_ICON_SIZE_28 = QSize(28, 28)
+_ICON_SIZE_32 = QSize(32, 32)
+
+def _themed_icon(name):
+    """Buscar un icono del tema una sola vez por nombre (puede devolver un icono nulo)"""
+    # La clave incluye el tema actual: si el usuario lo cambia, se vuelve a buscar
+    return _themed_icon_cached(QIcon.themeName(), name)
+
+@functools.lru_cache(maxsize=512)
+def _themed_icon_cached(theme, name):
+    return QIcon.fromTheme(name)
+
+# Iconos fijos que se consultan en cada refresco del panel (volumen, red, Bluetooth, lanzadores)
+_PREWARM_ICONS = (
+    "audio-volume-muted", "audio-volume-high", "audio-volume-medium", "audio-volume-low",
+    "network-wireless-signal-excellent", "network-wireless-signal-good",
+    "network-wireless-signal-ok", "network-wireless-signal-weak",
+    "network-wireless", "network-wireless-connected", "network-transmit-receive", "network-offline",
+    "network-wired", "network-wired-disconnected",
+    "bluetooth", "bluetooth-active", "bluetooth-offline", "bluetooth-disabled",
+    "start-here", "utilities-terminal", "system-file-manager",
+    "preferences-desktop-notification",
+)
+
+def _prewarm_icons():
+    """Cargar de antemano los iconos del tema usados en los refrescos periódicos"""
+    for name in _PREWARM_ICONS:
+        _themed_icon(name)
+    _fallback_icon()  # Con un tema incompleto, la reserva se usa desde el primer diálogo
+
+@functools.lru_cache(maxsize=256)
+def _wm_class_icon(theme, class_names):
+    """Icono del tema para un WM_CLASS; se recuerda también si no hay ninguno (None)"""
+    for name in reversed(class_names):  # Prioriza el segundo valor (la clase)
+        icon = _themed_icon(name)
+        if not icon.isNull():
+            return icon
+    return None
+
+@functools.lru_cache(maxsize=None)
+def _solid_icon(size, r, g, b):
+    """Icono de color liso, creado una sola vez por tamaño y color"""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(r, g, b))
+    return QIcon(pixmap)
+
+def _fallback_icon():
+    """Icono de reserva cuando el tema no tiene el nombre pedido (un único QIcon compartido)"""
+    return _solid_icon(32, 180, 200, 230)
+
+@functools.lru_cache(maxsize=None)
+def _which(command):
+    """shutil.which con caché: el PATH se recorre una sola vez por comando"""
+    return shutil.which(command)
+
+@functools.lru_cache(maxsize=None)
+def _sys_info_lines():
+    """Sistema, Python y PyQt para el diálogo de configuración: no cambian en toda la sesión"""
+    import platform
+    return (
+        f"Sistema: {platform.system()} {platform.release()}",
+        f"Python: {platform.python_version()}",
+        f"PyQt: {PYQT_VERSION}",
+    )
+
+def _throttled(ms, trailing=True):
+    """Decorador: ejecuta la primera llamada al instante y descarta las que lleguen en los
+    siguientes 'ms' milisegundos; con trailing=True la última descartada se ejecuta al final"""
+    interval_ns = ms * 1_000_000
+
+    def decorator(fn):
+        attr = f"_throttle_{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(self, *args):
+            state = self.__dict__.setdefault(attr, {"last": 0, "pending": None})
+            now = time.monotonic_ns()
+            if now - state["last"] < interval_ns:
+                if trailing:
+                    if state["pending"] is None:
+                        QTimer.singleShot(ms, lambda: flush(self, state))
+                    state["pending"] = args
+                return None
+            state["last"] = now
+            return fn(self, *args)
+
+        def flush(self, state):
+            args, state["pending"] = state["pending"], None
+            if args is not None:
+                state["last"] = time.monotonic_ns()
+                fn(self, *args)
+
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def _batched_updates(widget):
+    """Poblar un widget sin repintar ni emitir señales por cada hijo; se recalcula al final"""
+    widget.setUpdatesEnabled(False)
+    blocked = widget.blockSignals(True)
+    try:
+        yield widget
+    finally:
+        widget.blockSignals(blocked)
+        widget.setUpdatesEnabled(True)
+        widget.updateGeometry()
+
+@functools.lru_cache(maxsize=None)
+def _bluetoothctl_version():
+    """Versión de bluetoothctl como tupla, p. ej. (5, 66); (0,) si no se puede saber"""
+    try:
+        output = subprocess.check_output(['bluetoothctl', '--version'], universal_newlines=True,
+                                         stderr=subprocess.DEVNULL)
+        return tuple(int(n) for n in output.split()[-1].split('.'))
+    except Exception:
+        return (0,)
+
+def _spawn(args, **kwargs):
+    """Lanzar un programa desacoplado del panel: sesión propia y sin heredar descriptores"""
+    return subprocess.Popen(args, start_new_session=True, close_fds=True, **kwargs)
+
+class _TaskSignals(QObject):
+    """Señales de una tarea en segundo plano (deben vivir en un QObject)"""
+    done = pyqtSignal(object)
+
+class _Task(QRunnable):
+    """Ejecuta una función en el QThreadPool y emite su resultado con done"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = _TaskSignals()
+        self.done = self.signals.done
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            print(f"Error en tarea en segundo plano: {e}")
+            result = None
+        self.done.emit(result)
+
+class SystemState(QObject):
+    """Lee batería, volumen y red en una sola pasada por tick y reparte el resultado.
+    El panel llama a refresh() desde su timer de 1 s"""
+
+    stateChanged = pyqtSignal(dict)
+
+    BATTERY_EVERY = 5  # La batería cambia despacio: leerla cada 5 ticks
+    NETWORK_EVERY = 5  # El estado de las interfaces, también cada 5 ticks
+
+    def __init__(self, panel):
+        super().__init__(panel)
+        self.panel = panel
+        self._task = None
+        self._tick = 0
+        self.battery_every = self.BATTERY_EVERY
+
+    def refresh(self):
+        if self._task is not None:
+            return  # La lectura anterior todavía no ha terminado
+        # battery_every = 0: la batería llega por eventos y solo se lee en el primer tick
+        with_battery = (self._tick == 0 if not self.battery_every
+                        else self._tick % self.battery_every == 0)
+        with_network = self._tick % self.NETWORK_EVERY == 0
+        self._tick += 1
+        self._task = _Task(self._read_state, with_battery, with_network)
+        self._task.done.connect(self._on_state_read)
+        QThreadPool.globalInstance().start(self._task)
+
+    def _read_state(self, with_battery, with_network):
+        """Se ejecuta en el QThreadPool: no tocar widgets aquí"""
+        state = {'volume': self.panel.get_volume_info()}
+        if with_battery:
+            state['battery'] = self.panel.get_battery_info()
+        if with_network:
+            state['network'] = self.panel.read_network_connected()
+        return state
+
+    def _on_state_read(self, state):
+        self._task = None
+        if state:
+            self.stateChanged.emit(state)
+
+class SystemEvents(QObject):
+    """Escucha señales D-Bus de UPower, UDisks2 y BlueZ para actualizar solo cuando algo cambia"""
+
+    batteryChanged = pyqtSignal()
+    storageChanged = pyqtSignal()
+    bluetoothChanged = pyqtSignal()
+
+    FALLBACK_INTERVAL = 30000  # Sondeo de seguridad cuando llegan señales (ms)
+
+    PROPERTIES = 'org.freedesktop.DBus.Properties'
+    OBJECT_MANAGER = 'org.freedesktop.DBus.ObjectManager'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Indican qué subsistemas avisan por D-Bus (los demás siguen sondeándose)
+        self.battery = self.storage = self.bluetooth = False
+        if not QTDBUS_AVAILABLE:
+            return
+        bus = QDBusConnection.systemBus()
+        if not bus.isConnected():
+            return
+
+        if self._has_service(bus, 'org.freedesktop.UPower'):
+            self.battery = bus.connect('org.freedesktop.UPower',
+                                       '/org/freedesktop/UPower/devices/DisplayDevice',
+                                       self.PROPERTIES, 'PropertiesChanged', self._on_battery)
+
+        if self._has_service(bus, 'org.freedesktop.UDisks2'):
+            self.storage = all([
+                bus.connect('org.freedesktop.UDisks2', '/org/freedesktop/UDisks2',
+                            self.OBJECT_MANAGER, signal, self._on_storage)
+                for signal in ('InterfacesAdded', 'InterfacesRemoved')
+            ] + [
+                # Montajes y desmontajes llegan como cambios de MountPoints
+                bus.connect('org.freedesktop.UDisks2', '', self.PROPERTIES,
+                            'PropertiesChanged', self._on_storage)
+            ])
+
+        if self._has_service(bus, 'org.bluez'):
+            # Ruta vacía: cualquier objeto de BlueZ (adaptadores y dispositivos)
+            self.bluetooth = all([
+                bus.connect('org.bluez', '', self.PROPERTIES, 'PropertiesChanged', self._on_bluetooth),
+                bus.connect('org.bluez', '/', self.OBJECT_MANAGER, 'InterfacesAdded', self._on_bluetooth),
+                bus.connect('org.bluez', '/', self.OBJECT_MANAGER, 'InterfacesRemoved', self._on_bluetooth),
+            ])
+
+    @staticmethod
+    def _has_service(bus, name):
+        reply = bus.interface().isServiceRegistered(name)
+        return reply.isValid() and bool(reply.value())
+
+    @pyqtSlot()
+    def _on_battery(self):
+        self.batteryChanged.emit()
+
+    @pyqtSlot()
+    def _on_storage(self):
+        self.storageChanged.emit()
+
+    @pyqtSlot()
+    @_throttled(500)
+    def _on_bluetooth(self):
+        # BlueZ emite ráfagas (RSSI, descubrimiento): se agrupan en una sola actualización
+        self.bluetoothChanged.emit()
+
+class NotificationEvents(QObject):
+    """Señales internas de NotificationServer hacia el panel. Van en un QObject aparte:
+    QtDBus publicaría en el bus cualquier señal declarada en el adaptador"""
+
+    notificationReceived = pyqtSignal(object, bool)  # NotificationItem, sustituye a otra
+    closeRequested = pyqtSignal('uint')  # Una aplicación pidió cerrar su notificación
+
+if QTDBUS_AVAILABLE:
+    @pyqtClassInfo('D-Bus Interface', 'org.freedesktop.Notifications')
+    class NotificationServer(QDBusAbstractAdaptor):
+        """Servidor org.freedesktop.Notifications del panel: cada Notify llega por el bucle
+        de eventos de Qt con su contenido real, sin procesos ni análisis de texto"""
+
+        # Solo las señales de la especificación: el adaptador las reenvía al bus
+        NotificationClosed = pyqtSignal('uint', 'uint')
+        ActionInvoked = pyqtSignal('uint', str)
+
+        SERVICE = 'org.freedesktop.Notifications'
+        PATH = '/org/freedesktop/Notifications'
+
+        def __init__(self, parent):
+            super().__init__(parent)
+            self._next_id = 1  # La notificación de prueba del panel usa el id 0
+            self.events = NotificationEvents(self)
+
+        @classmethod
+        def register(cls, parent):
+            """Publicar el servicio en el bus de sesión si ningún otro demonio lo tiene.
+            Devuelve el servidor o None"""
+            bus = QDBusConnection.sessionBus()
+            if not bus.isConnected() or SystemEvents._has_service(bus, cls.SERVICE):
+                return None
+            server = cls(parent)
+            if bus.registerObject(cls.PATH, parent) and bus.registerService(cls.SERVICE):
+                return server
+            bus.unregisterObject(cls.PATH)
+            server.deleteLater()
+            return None
+
+        @pyqtSlot(result='QStringList')
+        def GetCapabilities(self):
+            return ['body']
+
+        @pyqtSlot(QDBusMessage)
+        def GetServerInformation(self, message):
+            # Cuatro valores de salida: la respuesta se construye a mano
+            message.setDelayedReply(True)
+            QDBusConnection.sessionBus().send(
+                message.createReply(['desktop-panel', 'Panel de Escritorio', '1.0', '1.2']))
+
+        @pyqtSlot(str, 'uint', str, str, str, 'QStringList', 'QVariantMap', int, result='uint')
+        def Notify(self, app_name, replaces_id, app_icon, summary, body, actions, hints, expire_timeout):
+            notification_id = replaces_id
+            if not notification_id:
+                notification_id = self._next_id
+                self._next_id += 1
+            self.events.notificationReceived.emit(NotificationItem(
+                notification_id, app_name, app_icon or "dialog-information", summary, body),
+                bool(replaces_id))
+            return notification_id
+
+        @pyqtSlot('uint')
+        def CloseNotification(self, notification_id):
+            self.events.closeRequested.emit(notification_id)
+            self.NotificationClosed.emit(notification_id, 3)  # 3 = cerrada por CloseNotification
+
+_BLUEZ = 'org.bluez'
+_DBUS_NODE_RE = re.compile(r'<node name="([^"/][^"]*)"')
+
+@functools.lru_cache(maxsize=None)
+def _bluez_registered():
+    if not QTDBUS_AVAILABLE:
+        return False
+    bus = QDBusConnection.systemBus()
+    return bus.isConnected() and SystemEvents._has_service(bus, _BLUEZ)
+
+def _bluez_available():
+    """BlueZ está en el bus del sistema y se puede consultar sin bluetoothctl. Solo se
+    recuerda el sí: al iniciar la sesión bluetoothd puede no estar aún, y cada lectura
+    que cae en bluetoothctl vuelve a preguntar al bus"""
+    if _bluez_registered():
+        return True
+    _bluez_registered.cache_clear()
+    return False
+
+def _bluez_call(path, interface, method, *args):
+    """Llamada síncrona a BlueZ (QDBusConnection es seguro desde el QThreadPool)"""
+    msg = QDBusMessage.createMethodCall(_BLUEZ, path, interface, method)
+    if args:
+        msg.setArguments(list(args))
+    reply = QDBusConnection.systemBus().call(msg)
+    if reply.type() == QDBusMessage.MessageType.ErrorMessage:
+        raise RuntimeError(reply.errorMessage())
+    return reply.arguments()
+
+def _bluez_children(path):
+    """Rutas hijas de un objeto de BlueZ (adaptadores bajo /org/bluez, dispositivos bajo hciN)"""
+    xml = _bluez_call(path, 'org.freedesktop.DBus.Introspectable', 'Introspect')[0]
+    return [f"{path}/{name}" for name in _DBUS_NODE_RE.findall(xml)]
+
+def _bluez_properties(path, interface):
+    """Todas las propiedades de 'interface' en 'path' como dict"""
+    return _bluez_call(path, SystemEvents.PROPERTIES, 'GetAll', interface)[0]
+
+# Umbrales (mayor o igual que) -> icono del tema, de mayor a menor
+_WIFI_SIGNAL_BUCKETS = (
+    (75, "network-wireless-signal-excellent"),
+    (50, "network-wireless-signal-good"),
+    (25, "network-wireless-signal-ok"),
+    (0, "network-wireless-signal-weak"),
+)
+# Aquí el volumen tiene que superar el umbral (mayor que)
+_VOLUME_BUCKETS = (
+    (70, "audio-volume-high"),
+    (30, "audio-volume-medium"),
+    (-1, "audio-volume-low"),
+)
+
+def _wifi_signal_icon_name(signal):
+    """Nombre del icono del tema según la intensidad de la señal WiFi"""
+    return next((name for threshold, name in _WIFI_SIGNAL_BUCKETS if signal >= threshold),
+                "network-wireless-signal-weak")
+
+def _volume_icon_name(volume, muted):
+    """Nombre del icono del tema para el volumen (el mismo en el panel y en el menú)"""
+    if muted:
+        return "audio-volume-muted"
+    return next((name for threshold, name in _VOLUME_BUCKETS if volume > threshold),
+                "audio-volume-low")
+
+class WifiNetworksModel(QAbstractListModel):
+    """Redes WiFi de nmcli; la vista solo pide los datos de las filas visibles"""
+
+    SsidRole = Qt.ItemDataRole.UserRole + 1
+    SignalRole = Qt.ItemDataRole.UserRole + 2
+    SecurityRole = Qt.ItemDataRole.UserRole + 3
+    InUseRole = Qt.ItemDataRole.UserRole + 4
+
+    def __init__(self, networks=None, parent=None):
+        super().__init__(parent)
+        self._networks = list(networks or [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._networks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        net = self._networks[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{net.ssid} ({net.signal}%) - {net.security}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            if net.in_use:
+                return _themed_icon("network-wireless-connected")
+            return _themed_icon(_wifi_signal_icon_name(net.signal))
+        if role == self.SsidRole:
+            return net.ssid
+        if role == self.SignalRole:
+            return net.signal
+        if role == self.SecurityRole:
+            return net.security
+        if role == self.InUseRole:
+            return net.in_use
+        return None
+
+class WifiNetworkDelegate(QStyledItemDelegate):
+    """Pinta cada red (icono + texto) directamente con QPainter, sin widgets hijos"""
+
+    ROW_HEIGHT = 28
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(rect, QColor(0, 0, 0, 20))
+
+        icon = index.data(Qt.ItemDataRole.DecorationRole)
+        if icon is not None and not icon.isNull():
+            # Sobrecarga con enteros: no crea un QRect por fila en cada repintado
+            icon.paint(painter, rect.left() + 6, rect.top() + (rect.height() - 20) // 2, 20, 20)
+
+        font = QFont(option.font)
+        font.setBold(bool(index.data(WifiNetworksModel.InUseRole)))
+        painter.setFont(font)
+        painter.setPen(QColor("#333333"))
+        text_rect = rect.adjusted(34, 0, -6, 0)
+        text = painter.fontMetrics().elidedText(index.data(Qt.ItemDataRole.DisplayRole),
+                                                Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+class BluetoothDevicesModel(QAbstractListModel):
+    """Dispositivos Bluetooth vinculados (id, nombre, icono y si está conectado)"""
+
+    IdRole = Qt.ItemDataRole.UserRole + 1
+    ConnectedRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, devices=None, parent=None):
+        super().__init__(parent)
+        self._devices = list(devices or [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._devices)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        device = self._devices[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return device['name']
+        if role == Qt.ItemDataRole.DecorationRole:
+            return _themed_icon(device['icon'])
+        if role == self.IdRole:
+            return device['id']
+        if role == self.ConnectedRole:
+            return device['connected']
+        return None
+
+class BluetoothDeviceDelegate(QStyledItemDelegate):
+    """Tarjeta de dispositivo pintada con QPainter; el botón Conectar/Desconectar es un rectángulo"""
+
+    # (id del dispositivo, conectado actualmente)
+    connectClicked = pyqtSignal(str, bool)
+
+    ROW_HEIGHT = 52
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    @staticmethod
+    def _button_text(index):
+        return "Desconectar" if index.data(BluetoothDevicesModel.ConnectedRole) else "Conectar"
+
+    def _button_rect(self, option, index):
+        card = option.rect.adjusted(0, 2, 0, -2)
+        width = option.fontMetrics.horizontalAdvance(self._button_text(index)) + 16
+        return QRect(card.right() - 8 - width, card.center().y() - 12, width, 24)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        card = option.rect.adjusted(0, 2, 0, -2)
+        hover = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 20 if hover else 13))
+        painter.drawRoundedRect(QRectF(card), 8, 8)
+
+        icon = index.data(Qt.ItemDataRole.DecorationRole)
+        if icon is not None and not icon.isNull():
+            icon.paint(painter, card.left() + 8, card.center().y() - 12, 24, 24)
+
+        button = self._button_rect(option, index)
+        text_rect = QRect(card.left() + 40, card.top() + 6, button.left() - card.left() - 48, card.height() - 12)
+        name_font = QFont(option.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.setPen(QColor("#333333"))
+        name = painter.fontMetrics().elidedText(index.data(Qt.ItemDataRole.DisplayRole),
+                                                Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, name)
+
+        status_font = QFont(option.font)
+        status_font.setPixelSize(11)
+        painter.setFont(status_font)
+        painter.setPen(QColor("#666666"))
+        status = "Conectado" if index.data(BluetoothDevicesModel.ConnectedRole) else "Desconectado"
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft, status)
+
+        painter.setFont(option.font)
+        painter.setPen(QColor("#cccccc"))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(QRectF(button).adjusted(0.5, 0.5, -0.5, -0.5), 4, 4)
+        painter.setPen(QColor("#333333"))
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, self._button_text(index))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            pos = event.position().toPoint() if PYQT_VERSION == 6 else event.pos()
+            if self._button_rect(option, index).contains(pos):
+                self.connectClicked.emit(index.data(BluetoothDevicesModel.IdRole),
+                                         bool(index.data(BluetoothDevicesModel.ConnectedRole)))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+def _menu_list_view(model, delegate, max_height=300):
+    """QListView para incrustar en un menú: filas uniformes, disposición por lotes y scroll propio"""
+    view = QListView()
+    view.setModel(model)
+    view.setItemDelegate(delegate)
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.LayoutMode.Batched)
+    view.setBatchSize(20)
+    view.setMouseTracking(True)
+    view.setFrameShape(QFrame.Shape.NoFrame)
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+    view.setObjectName("MenuList")
+    rows = max(model.rowCount(), 1)
+    view.setFixedHeight(min(rows * delegate.ROW_HEIGHT + 2, max_height))
+    return view
+
 class SystemTray(QSystemTrayIcon):
     """Icono en la bandeja del sistema"""
     
@@ -69,10 +1140,7 @@ class SystemTray(QSystemTrayIcon):
     def setup_tray(self):
         """Configurar el icono de la bandeja"""
         # Crear un icono simple si no hay uno disponible
-        pixmap = QPixmap(16, 16)
-        pixmap.fill(QColor(100, 150, 200))
-        icon = QIcon(pixmap)
-        self.setIcon(icon)
+        self.setIcon(_solid_icon(16, 100, 150, 200))
         
         # Crear menú contextual
         menu = QMenu()
@@ -99,8 +1167,16 @@ class SystemTray(QSystemTrayIcon):
 class ApplicationMenu(QWidget):
     """Menú de aplicaciones con soporte de temas"""
 
+    SETTINGS_FILE = os.path.expanduser("~/.config/desktop-panel/menu_settings.json")
+    # Archivos antiguos, solo se leen para migrar a SETTINGS_FILE
     FAVORITES_FILE = os.path.expanduser("~/.config/desktop-panel/favorites.json")
     THEME_FILE = os.path.expanduser("~/.config/desktop-panel/menu_theme.json")
+    APPS_CACHE_FILE = os.path.expanduser("~/.config/desktop-panel/apps_cache.json")
+    DESKTOP_DIRS = [
+        "/usr/share/applications",
+        "/usr/local/share/applications",
+        os.path.expanduser("~/.local/share/applications")
+    ]
     THEMES = {
         "claro": "theme_light.css",
         "oscuro": "theme_dark.css",
@@ -127,15 +1203,23 @@ class ApplicationMenu(QWidget):
         ("Terminal", "utilities-terminal", "terminal"),
     ]
 
+    TERMINALS = ['xfce4-terminal', 'gnome-terminal', 'konsole', 'xterm', 'alacritty']
+
+    _css_cache = {}  # Contenido de los archivos de tema ya leídos
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
-        self.load_favorites()
-        self.theme = self.load_theme()
+        self._settings = self._load_settings()
+        self.favorites = self._settings.get("favorites", self.DEFAULT_FAVORITES.copy())
+        self.theme = self._settings.get("theme", "claro")
+        self.applications = []
+        self.applications_loaded = False
+        self._terminal = next((t for t in self.TERMINALS if _which(t)), None)
         self.setup_ui()
-        self.load_applications()
         self.show_favorites()
         self.apply_theme(self.theme)
+        self.load_applications()
 
     def setup_ui(self):
         self.resize(600, 480)
@@ -154,7 +1238,8 @@ class ApplicationMenu(QWidget):
         left_layout = QVBoxLayout()
         left_layout.setSpacing(6)
         self.left_list = QListWidget()
-        self.left_list.setIconSize(QSize(32, 32))
+        self.left_list.setIconSize(_ICON_SIZE_32)
+        self.left_list.setUniformItemSizes(True)
         self.left_list.itemClicked.connect(self.launch_left_item)
         self.left_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.left_list.customContextMenuRequested.connect(self.left_context_menu)
@@ -168,7 +1253,7 @@ class ApplicationMenu(QWidget):
         # Botón de configuración de tema (solo icono pequeño)
         self.theme_btn = QPushButton()
         self.theme_btn.setIcon(self.get_icon("preferences-desktop-theme"))
-        self.theme_btn.setIconSize(QSize(20, 20))
+        self.theme_btn.setIconSize(_ICON_SIZE_20)
         self.theme_btn.setFixedSize(32, 32)
         self.theme_btn.setToolTip("Configuración del Panel")
         self.theme_btn.setStyleSheet("border: none; background: transparent;")
@@ -179,24 +1264,31 @@ class ApplicationMenu(QWidget):
 
         # === DERECHA: Accesos directos ===
         right_widget = QWidget()
-        right_widget.setStyleSheet("background: transparent;")
-        right_layout = QVBoxLayout(right_widget)
-        right_layout.setContentsMargins(0, 0, 0, 0)
-        right_layout.setSpacing(4)
-        for name, icon, action in self.SHORTCUTS:
-            btn = QPushButton(name)
-            btn.setIcon(self.get_icon(icon))
-            btn.setIconSize(QSize(28, 28))
-            btn.setStyleSheet("""
+        # Una sola hoja de estilo para todos los accesos directos
+        right_widget.setStyleSheet("""
+            QWidget {
                 background: transparent;
+            }
+            QPushButton {
                 text-align: left;
                 padding: 8px;
                 font-size: 13px;
                 border: none;
-            """)
-            btn.clicked.connect(lambda checked, act=action: self.launch_shortcut(act))
+            }
+        """)
+        right_layout = QVBoxLayout(right_widget)
+        right_layout.setContentsMargins(0, 0, 0, 0)
+        right_layout.setSpacing(4)
+        self._shortcut_buttons = []
+        for name, icon, action in self.SHORTCUTS:
+            btn = QPushButton(name)
+            btn.setIconSize(_ICON_SIZE_28)
+            btn.clicked.connect(functools.partial(self.launch_shortcut, action))
             right_layout.addWidget(btn)
+            self._shortcut_buttons.append((btn, icon))
         right_layout.addStretch()
+        # Los iconos se resuelven después del primer pintado
+        QTimer.singleShot(0, self._load_shortcut_icons)
         fondo_layout.addWidget(right_widget, 1)
 
         layout = QVBoxLayout(self)
@@ -205,16 +1297,22 @@ class ApplicationMenu(QWidget):
 
         self.showing_favorites = True
 
+    def _load_shortcut_icons(self):
+        for btn, icon in self._shortcut_buttons:
+            btn.setIcon(self.get_icon(icon))
+
+    @pyqtSlot()
     def show_theme_menu(self):
         menu = QMenu(self)
         claro = menu.addAction("Tema claro")
         oscuro = menu.addAction("Tema oscuro")
         sistema = menu.addAction("Tema del sistema")
-        claro.triggered.connect(lambda: self.set_theme("claro"))
-        oscuro.triggered.connect(lambda: self.set_theme("oscuro"))
-        sistema.triggered.connect(lambda: self.set_theme("sistema"))
+        claro.triggered.connect(functools.partial(self.set_theme, "claro"))
+        oscuro.triggered.connect(functools.partial(self.set_theme, "oscuro"))
+        sistema.triggered.connect(functools.partial(self.set_theme, "sistema"))
         menu.exec(self.theme_btn.mapToGlobal(self.theme_btn.rect().bottomLeft()))
 
+    @pyqtSlot(str)
     def set_theme(self, theme_name):
         self.theme = theme_name
         self.apply_theme(theme_name)
@@ -223,10 +1321,9 @@ class ApplicationMenu(QWidget):
     def apply_theme(self, theme_name):
         css_file = self.THEMES.get(theme_name)
         if css_file:
-            css_path = os.path.join(os.path.dirname(__file__), css_file)
-            if os.path.exists(css_path):
-                with open(css_path, "r") as f:
-                    self.setStyleSheet(f.read())
+            css = self.load_theme_css(css_file)
+            if css is not None:
+                self.setStyleSheet(css)
         else:
             # Forzar fondo claro y texto oscuro para evitar transparencia
             self.setStyleSheet("""
@@ -241,102 +1338,233 @@ class ApplicationMenu(QWidget):
                 }
             """)
 
+    @classmethod
+    def load_theme_css(cls, css_file):
+        """Leer un archivo de tema una sola vez por proceso (None si no existe)"""
+        if css_file not in cls._css_cache:
+            css_path = os.path.join(os.path.dirname(__file__), css_file)
+            try:
+                with open(css_path, "r") as f:
+                    cls._css_cache[css_file] = f.read()
+            except OSError:
+                cls._css_cache[css_file] = None
+        return cls._css_cache[css_file]
+
     def save_theme(self, theme_name):
+        self._save_settings({"theme": theme_name})
+
+    def save_favorites(self):
+        self._save_settings({"favorites": self.favorites})
+
+    @classmethod
+    def _load_settings(cls):
+        """Leer favoritos y tema del menú desde un único archivo"""
         try:
-            os.makedirs(os.path.dirname(self.THEME_FILE), exist_ok=True)
-            with open(self.THEME_FILE, "w") as f:
-                json.dump({"theme": theme_name}, f)
-        except Exception as e:
-            print("No se pudo guardar el tema:", e)
+            with open(cls.SETTINGS_FILE, "rb") as f:
+                return _json_loads(f.read())
+        except FileNotFoundError:
+            return cls._load_legacy_settings()
+        except Exception:
+            return {}
 
-    def load_theme(self):
+    @classmethod
+    def _load_legacy_settings(cls):
+        """Migrar los antiguos favorites.json y menu_theme.json"""
+        settings = {}
         try:
-            if os.path.exists(self.THEME_FILE):
-                with open(self.THEME_FILE, "r") as f:
-                    data = json.load(f)
-                    return data.get("theme", "claro")
+            with open(cls.FAVORITES_FILE, "rb") as f:
+                settings["favorites"] = _json_loads(f.read())
         except Exception:
             pass
-        return "claro"
-
-    def load_favorites(self):
         try:
-            if os.path.exists(self.FAVORITES_FILE):
-                with open(self.FAVORITES_FILE, "r") as f:
-                    self.favorites = json.load(f)
-            else:
-                self.favorites = self.DEFAULT_FAVORITES.copy()
+            with open(cls.THEME_FILE, "rb") as f:
+                settings["theme"] = _json_loads(f.read()).get("theme", "claro")
         except Exception:
-            self.favorites = self.DEFAULT_FAVORITES.copy()
+            pass
+        return settings
 
-    def save_favorites(self):
+    def _save_settings(self, patch):
+        """Actualizar la configuración en memoria y reescribir el archivo"""
+        self._settings.update(patch)
+        self._write_settings(self._settings)
+
+    @classmethod
+    def _write_settings(cls, settings):
+        """Reescribir el archivo de configuración de forma atómica"""
         try:
-            os.makedirs(os.path.dirname(self.FAVORITES_FILE), exist_ok=True)
-            with open(self.FAVORITES_FILE, "w") as f:
-                json.dump(self.favorites, f)
+            os.makedirs(os.path.dirname(cls.SETTINGS_FILE), exist_ok=True)
+            tmp_path = cls.SETTINGS_FILE + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_json_dumps(settings))
+            os.replace(tmp_path, cls.SETTINGS_FILE)
         except Exception as e:
-            print("No se pudo guardar favoritos:", e)
+            print("No se pudo guardar la configuración del menú:", e)
+
+    @classmethod
+    def store_theme(cls, theme_name):
+        """Guardar el tema sin crear el menú (se aplica cuando se abra por primera vez)"""
+        settings = cls._load_settings()
+        settings["theme"] = theme_name
+        cls._write_settings(settings)
 
     def load_applications(self):
-        """Cargar aplicaciones del sistema desde archivos .desktop"""
-        self.applications = []
-        import configparser
-        desktop_dirs = [
-            "/usr/share/applications",
-            "/usr/local/share/applications",
-            os.path.expanduser("~/.local/share/applications")
-        ]
-        for d in desktop_dirs:
-            if os.path.isdir(d):
-                for fname in os.listdir(d):
-                    if fname.endswith(".desktop"):
-                        path = os.path.join(d, fname)
-                        config = configparser.ConfigParser(interpolation=None)
-                        try:
-                            config.read(path, encoding="utf-8")
-                            if "Desktop Entry" in config:
-                                entry = config["Desktop Entry"]
-                                if entry.get("NoDisplay", "false").lower() == "true":
-                                    continue
-                                name = entry.get("Name")
-                                exec_cmd = entry.get("Exec")
-                                icon = entry.get("Icon", "")
-                                if name and exec_cmd:
-                                    exec_cmd_clean = exec_cmd.split()[0]
-                                    self.applications.append((name, exec_cmd_clean, icon))
-                        except Exception:
+        """Cargar las aplicaciones en el QThreadPool sin bloquear la interfaz"""
+        self._app_scanner = _Task(self.scan_applications)
+        self._app_scanner.done.connect(self.on_applications_loaded)
+        QThreadPool.globalInstance().start(self._app_scanner)
+
+    def on_applications_loaded(self, applications):
+        self.applications = applications or []
+        self.applications_loaded = True
+        self._app_scanner = None
+        if not self.showing_favorites:
+            self.show_all_apps()
+
+    def scan_applications(self):
+        """Leer los archivos .desktop (con caché en disco). Se ejecuta fuera del hilo de la GUI"""
+        mtimes = self._desktop_dirs_mtimes()
+        cached = self._load_apps_cache()
+        if cached is not None and cached.get("mtimes") == mtimes:
+            applications = [tuple(app) for app in cached.get("apps", [])]
+            applications.sort(key=self._app_sort_key)  # El caché pudo guardarse con otro idioma
+            return applications
+
+        applications = []
+        for d in self.DESKTOP_DIRS:
+            try:
+                entries = os.scandir(d)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if not entry.name.endswith(".desktop"):
+                        continue
+                    try:
+                        if not entry.is_file():
                             continue
+                        app = self.parse_desktop_file(entry.path)
+                    except Exception:
+                        continue
+                    if app:
+                        applications.append(app)
+        applications.sort(key=self._app_sort_key)  # Se ordena una sola vez; show_all_apps no vuelve a ordenar
+        self._save_apps_cache(mtimes, applications)
+        return applications
+
+    @staticmethod
+    def _app_sort_key(app):
+        """Ordenar por nombre según el idioma del usuario (acentos y mayúsculas incluidos)"""
+        return locale.strxfrm(app[0])
+
+    def _desktop_dirs_mtimes(self):
+        """Obtener el mtime de cada directorio de aplicaciones (None si no existe)"""
+        mtimes = {}
+        for d in self.DESKTOP_DIRS:
+            try:
+                mtimes[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                mtimes[d] = None
+        return mtimes
+
+    def _load_apps_cache(self):
+        try:
+            with open(self.APPS_CACHE_FILE, "r") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _save_apps_cache(self, mtimes, applications):
+        try:
+            os.makedirs(os.path.dirname(self.APPS_CACHE_FILE), exist_ok=True)
+            tmp_path = self.APPS_CACHE_FILE + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"mtimes": mtimes, "apps": applications}, f)
+            os.replace(tmp_path, self.APPS_CACHE_FILE)
+        except Exception as e:
+            print("No se pudo guardar la caché de aplicaciones:", e)
+
+    @staticmethod
+    def parse_desktop_file(path):
+        """Leer solo la sección [Desktop Entry] y devolver (nombre, comando, icono) o None"""
+        name = exec_cmd = None
+        icon = b""
+        in_entry = False
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.lstrip()
+                if line.startswith(b"["):
+                    if in_entry:
+                        break  # Empieza otra sección: ya tenemos todo lo necesario
+                    in_entry = line.rstrip() == b"[Desktop Entry]"
+                    continue
+                if not in_entry:
+                    continue
+                # Se admite "Clave = valor"; solo se decodifican los valores que se guardan
+                key, _, value = line.partition(b"=")
+                key = key.strip()
+                if key == b"Name":
+                    name = value.strip()
+                elif key == b"Exec":
+                    exec_cmd = value.strip()
+                elif key == b"Icon":
+                    icon = value.strip()
+                elif key == b"NoDisplay" and value.strip().lower() == b"true":
+                    return None
+        if name and exec_cmd:
+            return (name.decode("utf-8", "replace"),
+                    exec_cmd.split()[0].decode("utf-8", "replace"),
+                    icon.decode("utf-8", "replace"))
+        return None
 
     def show_favorites(self):
-        self.left_list.clear()
-        for name, command, icon in self.favorites:
-            item = QListWidgetItem(self.get_icon(icon), name)
-            item.setData(Qt.ItemDataRole.UserRole, (name, command, icon))
-            self.left_list.addItem(item)
+        self._fill_left_list(self.favorites)
         self.showing_favorites = True
         self.todas_btn.setText("Todas las aplicaciones")
 
     def show_all_apps(self):
-        self.left_list.clear()
-        for name, command, icon in sorted(self.applications):
-            item = QListWidgetItem(self.get_icon(icon), name)
-            item.setData(Qt.ItemDataRole.UserRole, (name, command, icon))
-            self.left_list.addItem(item)
+        placeholder = None if self.applications_loaded else "Cargando aplicaciones…"
+        self._fill_left_list(self.applications, placeholder)
         self.showing_favorites = False
         self.todas_btn.setText("Favoritos")
 
+    def _fill_left_list(self, entries, placeholder=None):
+        """Rellenar la lista izquierda sin repintar ni emitir señales por cada elemento"""
+        self.left_list.setUpdatesEnabled(False)
+        self.left_list.blockSignals(True)
+        try:
+            self.left_list.clear()
+            if placeholder:
+                loading = QListWidgetItem(placeholder)
+                loading.setFlags(Qt.ItemFlag.NoItemFlags)
+                self.left_list.addItem(loading)
+            for name, command, icon in entries:
+                item = QListWidgetItem(self.get_icon(icon), name)
+                item.setData(Qt.ItemDataRole.UserRole, (name, command, icon))
+                self.left_list.addItem(item)
+        finally:
+            self.left_list.blockSignals(False)
+            self.left_list.setUpdatesEnabled(True)
+
+    @pyqtSlot()
     def toggle_left_list(self):
         if self.showing_favorites:
             self.show_all_apps()
         else:
             self.show_favorites()
 
+    @pyqtSlot(QListWidgetItem)
     def launch_left_item(self, item):
-        name, command, icon = item.data(Qt.ItemDataRole.UserRole)
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if not data:
+            return  # Fila "Cargando aplicaciones…"
+        name, command, icon = data
         self.launch_command(command)
 
+    @pyqtSlot(QPoint)
     def left_context_menu(self, pos):
         item = self.left_list.itemAt(pos)
+        if item and not item.data(Qt.ItemDataRole.UserRole):
+            item = None
         menu = QMenu(self)
         if self.showing_favorites:
             if item:
@@ -367,36 +1595,34 @@ class ApplicationMenu(QWidget):
             if self.parent:
                 self.parent.show_settings()
         elif command == "store":
-            subprocess.Popen(["xdg-open", "https://flathub.org/"])
+            _spawn(["xdg-open", "https://flathub.org/"])
         elif command == "terminal":
-            terminals = ['xfce4-terminal', 'gnome-terminal', 'konsole', 'xterm', 'alacritty']
-            for terminal in terminals:
-                try:
-                    subprocess.Popen([terminal])
-                    break
-                except FileNotFoundError:
-                    continue
+            if self._terminal:
+                _spawn([self._terminal])
         elif os.path.isdir(command):
-            subprocess.Popen(['xdg-open', command])
+            _spawn(['xdg-open', command])
         else:
             try:
-                subprocess.Popen([command], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                _spawn([command], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"No se pudo lanzar: {command}\n{e}")
         self.hide()
 
+    @pyqtSlot(str)
     def launch_shortcut(self, action):
         self.launch_command(action)
 
-    def get_icon(self, icon_name):
-        if hasattr(QIcon, 'fromTheme'):
-            icon = QIcon.fromTheme(icon_name)
-            if not icon.isNull():
-                return icon
-        pixmap = QPixmap(32, 32)
-        pixmap.fill(QColor(180, 200, 230))
-        return QIcon(pixmap)
+    @staticmethod
+    def get_icon(icon_name):
+        """Icono del tema o uno liso de reserva. Ambos salen de cachés (_themed_icon, por
+        tema y nombre, recuerda también los nulos; _fallback_icon se crea una sola vez):
+        repetir un nombre, exista o no en el tema, no vuelve a recorrerlo"""
+        icon = _themed_icon(icon_name)
+        if not icon.isNull():
+            return icon
+        return _fallback_icon()
 
+    @pyqtSlot()
     def open_panel_settings(self):
         """Abrir la ventana de configuración del panel"""
         if self.parent:
@@ -418,25 +1644,23 @@ class WindowButton(QPushButton):
         if icon:
             self.setIcon(icon)
         else:
-            self.setIcon(QIcon.fromTheme("application-x-executable"))
-        self.setIconSize(QSize(24, 24))
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #505050;
-                border: 1px solid #666;
-                border-radius: 5px;
-                padding: 0;
-            }
-            QPushButton:hover {
-                background-color: #606060;
-            }
-            QPushButton:pressed {
-                background-color: #404040;
-            }
-        """)
+            self.setIcon(_themed_icon("application-x-executable"))
+        self.setIconSize(_ICON_SIZE_24)
+        self.setObjectName("WindowButton")  # Estilo en _PANEL_QSS
 
     def get_window_icon(self):
-        # Intenta obtener el icono de la ventana usando xprop y ambos valores de WM_CLASS
+        # Intenta obtener el icono de la ventana usando ambos valores de WM_CLASS
+        return _wm_class_icon(QIcon.themeName(), tuple(self.get_wm_class()))
+
+    def get_wm_class(self):
+        """Obtener los valores de WM_CLASS de la ventana (Xlib o xprop)"""
+        disp = _x_display()
+        if disp is not None:
+            try:
+                win = disp.create_resource_object('window', int(self.window_id, 16))
+                return list(win.get_wm_class() or ())
+            except Exception:
+                return []
         try:
             output = subprocess.check_output([
                 'xprop', '-id', self.window_id, 'WM_CLASS'
@@ -444,18 +1668,34 @@ class WindowButton(QPushButton):
             # WM_CLASS(STRING) = "Navigator", "firefox"
             if 'WM_CLASS' in output:
                 parts = output.strip().split('=')[-1].split(',')
-                class_names = [p.replace('"', '').strip() for p in parts]
-                # Probar ambos valores de WM_CLASS
-                for name in reversed(class_names):  # Prioriza el segundo
-                    icon = QIcon.fromTheme(name)
-                    if not icon.isNull():
-                        return icon
+                return [p.replace('"', '').strip() for p in parts]
         except Exception:
             pass
-        return None
-    
+        return []
+
+    def _focus_window_xlib(self, disp):
+        """Minimizar/restaurar la ventana enviando mensajes EWMH directamente"""
+        win = disp.create_resource_object('window', int(self.window_id, 16))
+        state = win.get_full_property(disp.intern_atom('_NET_WM_STATE'), Xatom.ATOM)
+        hidden = disp.intern_atom('_NET_WM_STATE_HIDDEN')
+        if state is not None and hidden in state.value:
+            # _NET_ACTIVE_WINDOW con origen "pager" (2) restaura y activa
+            _x_send_client_message(disp, win, '_NET_ACTIVE_WINDOW', [2, X.CurrentTime])
+        else:
+            # WM_CHANGE_STATE con IconicState (3) minimiza, igual que xdotool
+            _x_send_client_message(disp, win, 'WM_CHANGE_STATE', [3])
+
+    @pyqtSlot()
+    @_throttled(100, trailing=False)
     def focus_window(self):
         """Alternar minimizar/restaurar ventana"""
+        disp = _x_display()
+        if disp is not None:
+            try:
+                self._focus_window_xlib(disp)
+                return
+            except Exception as e:
+                print(f"Error manejando ventana con Xlib: {e}")
         try:
             # Primero intentar obtener el estado de la ventana
             window_state = subprocess.check_output(
@@ -527,12 +1767,15 @@ class DesktopPanel(QMainWindow):
             ]
             
             for cmd in commands:
+                # Verificar si el comando principal existe
+                main_cmd = cmd[-1] if cmd[0] == "pkexec" else cmd[0]
+                if cmd[0] == "pkexec" and not _which("pkexec"):
+                    continue
+                if not _which(main_cmd):
+                    continue
                 try:
-                    # Verificar si el comando principal existe
-                    main_cmd = cmd[-1] if cmd[0] == "pkexec" else cmd[0]
-                    if subprocess.run(["which", main_cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
-                        subprocess.Popen(cmd, env=env)
-                        return
+                    _spawn(cmd, env=env)
+                    return
                 except Exception as e:
                     print(f"Error al ejecutar {cmd}: {str(e)}")
                     continue
@@ -542,7 +1785,71 @@ class DesktopPanel(QMainWindow):
             QMessageBox.warning(self, "Error", f"Error al abrir la configuración de red: {str(e)}")
 
     def get_volume_info(self):
-        """Obtener información del volumen usando pactl o amixer"""
+        """Obtener información del volumen (caché si pactl subscribe está activo)"""
+        if self._volume_proc is None:
+            # Sin eventos: reutilizar una lectura de hace menos de 200 ms (menú + tick seguidos)
+            now = time.monotonic()
+            cache = self._volume_cache
+            if cache is not None and now - cache[0] < 0.2:
+                return cache[1]
+            info = self.query_volume_info()
+            self._volume_cache = (now, info)
+            return info
+        if self._volume is None:
+            self._volume = self.query_volume_info()
+        return self._volume
+
+    def start_volume_monitor(self):
+        """Mantener abierto 'pactl subscribe' para enterarse de los cambios de volumen"""
+        if not _which("pactl"):
+            return
+        try:
+            self._volume_proc = subprocess.Popen(["pactl", "subscribe"], stdout=subprocess.PIPE,
+                                                 stderr=subprocess.DEVNULL, bufsize=0)
+        except OSError:
+            self._volume_proc = None
+            return
+        self._volume_notifier = QSocketNotifier(self._volume_proc.stdout.fileno(),
+                                                QSocketNotifier.Type.Read, self)
+        self._volume_notifier.activated.connect(self.on_volume_event)
+
+    def stop_volume_monitor(self):
+        """Cerrar el proceso de pactl subscribe y volver a consultar por sondeo"""
+        if self._volume_proc is None:
+            return
+        self._volume_notifier.setEnabled(False)
+        self._volume_notifier.deleteLater()
+        if self._volume_proc.poll() is None:
+            self._volume_proc.terminate()
+        self._volume_proc.stdout.close()
+        self._volume_proc = None
+        self._volume = None
+
+    def on_volume_event(self, *_):
+        """Leer los eventos pendientes de pactl y refrescar el volumen si cambió un sink"""
+        try:
+            data = os.read(self._volume_proc.stdout.fileno(), 4096)
+        except OSError:
+            data = b""
+        if not data:
+            # pactl terminó (p. ej. se reinició PulseAudio)
+            self.stop_volume_monitor()
+            return
+        # Varios eventos en un mismo lote se resuelven con una sola consulta
+        if b"on sink #" in data or b"on server" in data:
+            self._volume = self.query_volume_info()
+            self.apply_volume_info(*self._volume)
+
+    def query_volume_info(self):
+        """Consultar el volumen usando pulsectl, pactl o amixer"""
+        found = _pulse_default_sink()
+        if found is not None:
+            pulse, sink = found
+            try:
+                return round(pulse.volume_get_all_chans(sink) * 100), bool(sink.mute)
+            except Exception as e:
+                print(f"Error consultando el volumen con pulsectl: {e}")
+                _pulse_reset(pulse)
         try:
             # Intentar primero con PulseAudio (pactl)
             output = subprocess.check_output(["pactl", "get-sink-volume", "@DEFAULT_SINK@"], 
@@ -567,7 +1874,16 @@ class DesktopPanel(QMainWindow):
                 return 0, True
 
     def get_battery_info(self):
-        """Obtener información detallada de la batería"""
+        """Obtener información detallada de la batería (caché de 2 segundos)"""
+        now = time.monotonic()
+        cache = self._battery_cache
+        if cache is not None and now - cache[0] < 2.0:
+            return cache[1]
+        info = self._read_battery_info()
+        self._battery_cache = (now, info)
+        return info
+
+    def _read_battery_info(self):
         try:
             if not PSUTIL_AVAILABLE:
                 return None
@@ -576,51 +1892,56 @@ class DesktopPanel(QMainWindow):
             if battery is None:
                 return None
 
-            # Obtener información adicional del sistema
-            power_supply_path = "/sys/class/power_supply"
-            bat_path = None
-            
-            # Buscar la batería en el sistema
-            for path in os.listdir(power_supply_path):
-                if path.startswith("BAT"):
-                    bat_path = os.path.join(power_supply_path, path)
-                    break
-            
-            if bat_path:
-                # Leer información adicional
-                try:
-                    with open(os.path.join(bat_path, "manufacturer"), 'r') as f:
-                        manufacturer = f.read().strip()
-                except:
-                    manufacturer = "Desconocido"
-                
-                try:
-                    with open(os.path.join(bat_path, "model_name"), 'r') as f:
-                        model = f.read().strip()
-                except:
-                    model = "Batería"
-                
-                try:
-                    with open(os.path.join(bat_path, "cycle_count"), 'r') as f:
-                        cycles = int(f.read().strip())
-                except:
-                    cycles = 0
-            else:
-                manufacturer = "Desconocido"
-                model = "Batería"
-                cycles = 0
+            if self._static_battery is None:
+                self._static_battery = self._read_static_battery_info()
 
-            return {
-                'percent': battery.percent,
-                'power_plugged': battery.power_plugged,
-                'time_left': battery.secsleft if battery.secsleft > 0 else None,
-                'manufacturer': manufacturer,
-                'model': model,
-                'cycles': cycles
-            }
+            return BatteryInfo(
+                battery.percent,
+                battery.power_plugged,
+                battery.secsleft if battery.secsleft > 0 else None,
+                *self._static_battery
+            )
         except:
             return None
 
+    def _read_static_battery_info(self):
+        """Fabricante, modelo y ciclos: se leen de sysfs una sola vez"""
+        bat_path = self._bat_path
+        manufacturer = "Desconocido"
+        model = "Batería"
+        cycles = 0
+        if bat_path:
+            try:
+                with open(os.path.join(bat_path, "manufacturer"), 'r') as f:
+                    manufacturer = f.read().strip()
+            except:
+                pass
+
+            try:
+                with open(os.path.join(bat_path, "model_name"), 'r') as f:
+                    model = f.read().strip()
+            except:
+                pass
+
+            try:
+                with open(os.path.join(bat_path, "cycle_count"), 'r') as f:
+                    cycles = int(f.read().strip())
+            except:
+                pass
+
+        return manufacturer, model, cycles
+
+    def _find_battery_path(self):
+        """Buscar la batería en /sys/class/power_supply"""
+        power_supply_path = "/sys/class/power_supply"
+        try:
+            for path in os.listdir(power_supply_path):
+                if path.startswith("BAT"):
+                    return os.path.join(power_supply_path, path)
+        except OSError:
+            pass
+        return None
+
     def format_time(self, seconds):
         """Formatear tiempo en segundos a formato legible"""
         if seconds < 0:
@@ -634,60 +1955,107 @@ class DesktopPanel(QMainWindow):
         else:
             return f"{minutes}m"
 
+    @_throttled(100)
     def update_battery_status(self):
-        """Actualizar el ícono y estado de la batería"""
-        info = self.get_battery_info()
-        
+        """Leer el estado de la batería en el QThreadPool y actualizar el ícono al terminar.
+        Sin sondeo de respaldo nada más la vuelve a leer: la última llamada agrupada se
+        ejecuta al final y, con una lectura en curso, se repite una más al terminar"""
+        if getattr(self, '_battery_task', None) is not None:
+            self._battery_dirty = True  # Lo leído puede ser anterior al cambio
+            return
+        self._battery_task = _Task(self.get_battery_info)
+        self._battery_task.done.connect(self._on_battery_read)
+        QThreadPool.globalInstance().start(self._battery_task)
+
+    def _on_battery_read(self, info):
+        self._battery_task = None
+        self.apply_battery_info(info)
+        if self._battery_dirty:
+            self._battery_dirty = False
+            self._battery_cache = None  # La lectura en curso volvió a llenarlo
+            self.update_battery_status()
+
+    def apply_battery_info(self, info):
+        """Actualizar el ícono y estado de la batería (solo toca widgets)"""
         if info is None:
             # No hay batería o no se puede detectar
-            icon = QIcon.fromTheme("ac-adapter")
+            icon = _themed_icon("ac-adapter")
             if icon.isNull():
                 self.battery_button.setText("🔌")
             else:
                 self.battery_button.setIcon(icon)
-                self.battery_button.setIconSize(QSize(22, 22))
+                self.battery_button.setIconSize(_ICON_SIZE_22)
             self.battery_button.setToolTip("Sin batería detectada")
             return
 
         # Seleccionar ícono basado en el estado
         icon_name = "battery"
-        if info['power_plugged']:
-            if info['percent'] >= 99:
+        if info.power_plugged:
+            if info.percent >= 99:
                 icon_name = "battery-full-charged"
             else:
                 icon_name = "battery-full-charging"
         else:
-            if info['percent'] <= 20:
+            if info.percent <= 20:
                 icon_name = "battery-caution"
-            elif info['percent'] <= 40:
+            elif info.percent <= 40:
                 icon_name = "battery-low"
-            elif info['percent'] <= 80:
+            elif info.percent <= 80:
                 icon_name = "battery-good"
             else:
                 icon_name = "battery-full"
 
-        icon = QIcon.fromTheme(icon_name)
+        icon = _themed_icon(icon_name)
         if icon.isNull():
             # Fallback a emojis
-            if info['power_plugged']:
+            if info.power_plugged:
                 self.battery_button.setText("🔌")
             else:
                 battery_icons = ["🪫", "🔋", "🔋", "🔋", "🔋"]  # 0-20, 20-40, 40-60, 60-80, 80-100
-                idx = min(4, info['percent'] // 20)
+                idx = min(4, info.percent // 20)
                 self.battery_button.setText(battery_icons[idx])
         else:
             self.battery_button.setIcon(icon)
-            self.battery_button.setIconSize(QSize(22, 22))
+            self.battery_button.setIconSize(_ICON_SIZE_22)
 
         # Actualizar tooltip
-        status = "Cargando" if info['power_plugged'] else "Descargando"
-        if info['time_left'] and not info['power_plugged']:
-            time_left = self.format_time(info['time_left'])
-            tooltip = f"{info['percent']}% - {time_left} restantes"
+        status = "Cargando" if info.power_plugged else "Descargando"
+        if info.time_left and not info.power_plugged:
+            time_left = self.format_time(info.time_left)
+            tooltip = f"{info.percent}% - {time_left} restantes"
         else:
-            tooltip = f"{info['percent']}% - {status}"
+            tooltip = f"{info.percent}% - {status}"
         self.battery_button.setToolTip(tooltip)
 
+    def _start_menu_timer(self, name, menu, interval, slot):
+        """Arrancar el timer persistente 'name' mientras 'menu' siga abierto.
+        Se crea una sola vez; en cada apertura solo se cambia el slot conectado"""
+        timer = self._menu_timers.get(name)
+        if timer is None:
+            timer = self._menu_timers[name] = QTimer(self)
+            timer.setTimerType(Qt.TimerType.CoarseTimer)
+        # Solo queda conectado el slot del menú abierto ahora
+        with contextlib.suppress(TypeError, RuntimeError):
+            timer.timeout.disconnect()
+        timer.timeout.connect(slot)
+        menu.aboutToHide.connect(timer.stop)
+        timer.start(interval)
+        return timer
+
+    def _stop_menu_timers(self, state):
+        """Al perder el foco la aplicación no hace falta refrescar ningún menú"""
+        if state != Qt.ApplicationState.ApplicationActive:
+            for timer in self._menu_timers.values():
+                timer.stop()
+
+    def _tick_battery_menu(self, percent_label, status_label):
+        """Refrescar el menú de batería con una sola lectura por tick"""
+        info = self.get_battery_info()
+        self.apply_battery_info(info)
+        if info is not None:
+            percent_label.setText(f"{info.percent}%")
+            status_label.setText("Conectado" if info.power_plugged else "Usando batería")
+
     def show_battery_menu(self):
         """Mostrar menú detallado de la batería"""
         info = self.get_battery_info()
@@ -710,18 +2078,18 @@ class DesktopPanel(QMainWindow):
 
         # Ícono grande de batería
         icon_label = QLabel()
-        icon = QIcon.fromTheme("battery")
+        icon = _themed_icon("battery")
         if not icon.isNull():
             icon_label.setPixmap(icon.pixmap(32, 32))
         header_layout.addWidget(icon_label)
 
         # Información principal
-        percent_label = QLabel(f"{info['percent']}%")
-        percent_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #333333;")
+        percent_label = QLabel(f"{info.percent}%")
+        percent_label.setObjectName("BatteryPercent")
         header_layout.addWidget(percent_label)
         
-        status_label = QLabel("Conectado" if info['power_plugged'] else "Usando batería")
-        status_label.setStyleSheet("color: #666666;")
+        status_label = QLabel("Conectado" if info.power_plugged else "Usando batería")
+        status_label.setObjectName("BatteryStatus")
         header_layout.addWidget(status_label)
         header_layout.addStretch()
 
@@ -729,52 +2097,30 @@ class DesktopPanel(QMainWindow):
 
         # Contenedor de información con fondo estilizado
         info_container = QWidget()
-        info_container.setStyleSheet("""
-            QWidget {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 8px;
-                padding: 8px;
-            }
-            QLabel {
-                color: #333333;
-                padding: 4px;
-            }
-        """)
+        info_container.setObjectName("BatteryInfoCard")
         info_layout = QVBoxLayout(info_container)
         
         # Detalles de la batería
-        if info['time_left'] and not info['power_plugged']:
-            time_left = self.format_time(info['time_left'])
+        if info.time_left and not info.power_plugged:
+            time_left = self.format_time(info.time_left)
             info_layout.addWidget(QLabel(f"Tiempo restante: {time_left}"))
 
-        info_layout.addWidget(QLabel(f"Fabricante: {info['manufacturer']}"))
-        info_layout.addWidget(QLabel(f"Modelo: {info['model']}"))
-        if info['cycles'] > 0:
-            info_layout.addWidget(QLabel(f"Ciclos de carga: {info['cycles']}"))
+        info_layout.addWidget(QLabel(f"Fabricante: {info.manufacturer}"))
+        info_layout.addWidget(QLabel(f"Modelo: {info.model}"))
+        if info.cycles > 0:
+            info_layout.addWidget(QLabel(f"Ciclos de carga: {info.cycles}"))
 
         main_layout.addWidget(info_container)
 
         # Separador
         separator = QFrame()
         separator.setFrameShape(QFrame.Shape.HLine)
-        separator.setStyleSheet("background: rgba(0, 0, 0, 0.1); margin: 4px 0;")
+        separator.setObjectName("MenuSeparator")
         main_layout.addWidget(separator)
 
         # Botón de configuración de energía
-        power_button = QPushButton(QIcon.fromTheme("preferences-system-power"), " Configuración de energía")
-        power_button.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                padding: 8px;
-                text-align: left;
-                color: #333333;
-            }
-            QPushButton:hover {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 4px;
-            }
-        """)
+        power_button = QPushButton(_themed_icon("preferences-system-power"), " Configuración de energía")
+        power_button.setObjectName("MenuLinkButton")
         power_button.clicked.connect(self.open_power_settings)
         main_layout.addWidget(power_button)
 
@@ -784,99 +2130,185 @@ class DesktopPanel(QMainWindow):
         menu.addAction(action)
 
         # Estilo del menú
-        menu.setStyleSheet("""
-            QMenu {
-                background: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                padding: 4px;
-            }
-        """)
+        menu.setObjectName("PanelPopup")
 
         # Timer para actualización en tiempo real
-        timer = QTimer(menu)
-        timer.timeout.connect(lambda: (
-            self.update_battery_status(),
-            percent_label.setText(f"{self.get_battery_info()['percent']}%"),
-            status_label.setText("Conectado" if self.get_battery_info()['power_plugged'] else "Usando batería")
-        ))
-        timer.start(1000)
-        menu.aboutToHide.connect(timer.stop)
+        self._start_menu_timer('battery', menu, 2000, functools.partial(self._tick_battery_menu, percent_label, status_label))
 
         # Mostrar el menú justo fuera del panel, no sobre él
-        position = self.settings.get('position', 'top')
-        btn_rect = self.battery_button.rect()
-        menu_size = menu.sizeHint()
+        menu.exec(self._position_menu(self.battery_button, menu))
+
+    def _position_menu(self, button, menu):
+        """Punto donde abrir 'menu' junto a 'button', fuera del panel.
+        Un solo mapToGlobal y un solo sizeHint; el resto es aritmética"""
+        position = self.panel_position
+        origin = button.mapToGlobal(QPoint(0, 0))
+        x, y = origin.x(), origin.y()
+        width, height = button.width(), button.height()
         if position == 'top':
-            pos = self.battery_button.mapToGlobal(btn_rect.bottomLeft())
-            pos.setY(pos.y() + self.battery_button.height())
-        elif position == 'bottom':
-            pos = self.battery_button.mapToGlobal(btn_rect.topLeft())
-            pos.setY(pos.y() - menu_size.height())
-        elif position == 'left':
-            pos = self.battery_button.mapToGlobal(btn_rect.topRight())
-        elif position == 'right':
-            pos = self.battery_button.mapToGlobal(btn_rect.topLeft())
-            pos.setX(pos.x() - menu_size.width())
-        else:
-            pos = self.battery_button.mapToGlobal(btn_rect.bottomLeft())
-        menu.exec(pos)
+            return QPoint(x, y + 2 * height - 1)
+        if position == 'left':
+            return QPoint(x + width - 1, y)
+        if position in ('bottom', 'right'):
+            menu_size = menu.sizeHint()
+            if position == 'bottom':
+                return QPoint(x, y - menu_size.height())
+            return QPoint(x - menu_size.width(), y)
+        return QPoint(x, y + height - 1)
 
     def get_storage_devices(self):
-        """Obtener lista de dispositivos de almacenamiento externos"""
+        """Obtener lista de dispositivos de almacenamiento externos (caché de 3 segundos)"""
+        now = time.monotonic()
+        cache = self._storage_cache
+        if cache is not None and now - cache[0] < 3.0:
+            return cache[1]
+        devices = self._read_storage_devices()
+        self._storage_cache = (now, devices)
+        return devices
+
+    _EXT_TYPES = {'disk', 'part'}
+    # Mayores de bloque a listar: 8 = sd* (USB/SATA), 179 = mmcblk* (lectores SD), 259 = nvme*
+    _LSBLK_MAJORS = '8,179,259'
+
+    def _read_storage_devices(self):
         devices = []
         try:
-            # Obtener información de lsblk en formato JSON
+            # Obtener información de lsblk en formato JSON, en lista plana (-l) para incluir
+            # particiones y solo con los mayores de interés (-I): sin loop, zram, etc.
+            # Tamaños en bytes (-b); la salida se decodifica a mano por si trae bytes no UTF-8
             output = subprocess.check_output([
-                'lsblk', '-Jpo', 'NAME,LABEL,TYPE,SIZE,MOUNTPOINT,VENDOR,MODEL,HOTPLUG,RM,TRAN'
-            ], universal_newlines=True)
+                'lsblk', '-JbplI', self._LSBLK_MAJORS,
+                '-o', 'NAME,PKNAME,LABEL,TYPE,SIZE,MOUNTPOINT,HOTPLUG,RM,TRAN'
+            ])
             
-            data = json.loads(output)
-            if 'blockdevices' in data:
-                for device in data['blockdevices']:
-                    # Verificar si es un dispositivo de almacenamiento externo
-                    if (device.get('type') in ['disk', 'part'] and 
-                        (device.get('rm') == '1' or  # Removible
-                         device.get('hotplug') == '1' or  # Hot-plug
-                         device.get('tran') == 'usb') and  # USB
-                        device.get('mountpoint')):  # Está montado
-                        
-                        # Obtener nombre descriptivo
-                        name = device.get('label', '')
-                        if not name:
-                            vendor = device.get('vendor', '').strip()
-                            model = device.get('model', '').strip()
-                            if vendor or model:
-                                name = f"{vendor} {model}".strip()
-                            else:
-                                name = os.path.basename(device['mountpoint'])
-                        
-                        # Agregar dispositivo a la lista
-                        devices.append({
-                            'name': name,
-                            'path': device['name'],
-                            'size': device.get('size', 'Desconocido'),
-                            'mountpoint': device['mountpoint'],
-                            'vendor': device.get('vendor', ''),
-                            'model': device.get('model', '')
-                        })
+            data = _json_loads(output.decode('utf-8', errors='replace'))
+            # Verificar si es un dispositivo de almacenamiento externo
+            external = [
+                device for device in data.get('blockdevices', [])
+                if (device.get('type') in self._EXT_TYPES and
+                    (self._lsblk_flag(device.get('rm')) or  # Removible
+                     self._lsblk_flag(device.get('hotplug')) or  # Hot-plug
+                     device.get('tran') == 'usb') and  # USB
+                    device.get('mountpoint'))  # Está montado
+            ]
+
+            # Fabricante y modelo solo hacen falta para los que no tienen etiqueta:
+            # se piden en una única llamada sobre sus discos
+            unlabeled = {device.get('pkname') or device['name'] for device in external if not device.get('label')}
+            models = self._lsblk_vendor_model(unlabeled) if unlabeled else {}
+
+            for device in external:
+                vendor, model = models.get(device.get('pkname') or device['name'], ('', ''))
+
+                # Obtener nombre descriptivo
+                name = device.get('label', '')
+                if not name:
+                    if vendor or model:
+                        name = f"{vendor} {model}".strip()
+                    else:
+                        name = os.path.basename(device['mountpoint'])
+                
+                # Agregar dispositivo a la lista
+                devices.append({
+                    'name': name,
+                    'path': device['name'],
+                    'size': self.format_size(device.get('size')),
+                    'size_bytes': device.get('size'),
+                    'mountpoint': device['mountpoint'],
+                    'vendor': vendor,
+                    'model': model
+                })
         except Exception as e:
             print(f"Error al obtener dispositivos de almacenamiento: {str(e)}")
         
         return devices
 
+    @staticmethod
+    def _lsblk_vendor_model(disks):
+        """Obtener {disco: (fabricante, modelo)} para los discos indicados con una sola llamada"""
+        try:
+            output = subprocess.check_output(['lsblk', '-Jdpo', 'NAME,VENDOR,MODEL', *sorted(disks)])
+            data = _json_loads(output.decode('utf-8', errors='replace'))
+        except Exception:
+            return {}
+        return {
+            disk['name']: ((disk.get('vendor') or '').strip(), (disk.get('model') or '').strip())
+            for disk in data.get('blockdevices', [])
+        }
+
+    @staticmethod
+    def _lsblk_flag(value):
+        """RM/HOTPLUG llegan como "1"/"0" en lsblk antiguos y como booleanos en los nuevos"""
+        return str(value).lower() in ('1', 'true')
+
+    @staticmethod
+    def format_size(n_bytes):
+        """Formatear un tamaño en bytes como lo hace lsblk (1.8G, 512M...)"""
+        try:
+            size = float(n_bytes)
+        except (TypeError, ValueError):
+            return "Desconocido"
+        for unit in ('B', 'K', 'M', 'G', 'T'):
+            if size < 1024:
+                break
+            size /= 1024
+        else:
+            unit = 'P'
+        if unit == 'B':
+            return f"{int(size)}B"
+        return f"{size:.1f}".rstrip('0').rstrip('.') + unit
+
+    @staticmethod
+    def _read_mounts_stamp():
+        """Contenido de /proc/self/mounts: en procfs el mtime no cambia, pero leerlo no lanza
+        ningún proceso y basta para saber si algo se montó o desmontó"""
+        try:
+            with open('/proc/self/mounts', 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
     def update_storage_status(self):
-        """Actualizar el ícono y estado de los dispositivos de almacenamiento"""
-        devices = self.get_storage_devices()
-        
+        """Leer los dispositivos en el QThreadPool (lsblk) y actualizar el ícono al terminar"""
+        cache = self._storage_cache
+        if cache is not None and time.monotonic() - cache[0] < 3.0:
+            self.apply_storage_status(cache[1])
+            return
+        if self._storage_task is not None:
+            return  # Ya hay una lectura en curso
+        # Solo se listan dispositivos montados: con la misma tabla de montajes, lsblk
+        # devolvería lo mismo (los eventos de UDisks2 vacían el caché y fuerzan la lectura)
+        stamp = self._read_mounts_stamp()
+        if cache is not None and stamp is not None and stamp == self._mounts_stamp:
+            self._storage_cache = (time.monotonic(), cache[1])
+            self.apply_storage_status(cache[1])
+            return
+        self._mounts_stamp = stamp
+        self._storage_task = _Task(self._read_storage_devices)
+        self._storage_task.done.connect(self._on_storage_read)
+        QThreadPool.globalInstance().start(self._storage_task)
+
+    def _on_storage_read(self, devices):
+        self._storage_task = None
+        devices = devices or []
+        self._storage_cache = (time.monotonic(), devices)
+        self.apply_storage_status(devices)
+
+    def apply_storage_status(self, devices):
+        """Actualizar el ícono y estado de los dispositivos de almacenamiento (solo toca widgets)"""
+        sig = tuple((d['path'], d['mountpoint'], d['size']) for d in devices)
+        if sig == self._last_storage_sig:
+            return  # Mismos dispositivos: no hace falta tocar el botón
+        self._last_storage_sig = sig
+
         if devices:
             # Usar ícono de dispositivo USB si está disponible
-            icon = QIcon.fromTheme("drive-removable-media-usb")
+            icon = _themed_icon("drive-removable-media-usb")
             if icon.isNull():
-                icon = QIcon.fromTheme("drive-removable-media")
+                icon = _themed_icon("drive-removable-media")
             tooltip = f"{len(devices)} dispositivo{'s' if len(devices) != 1 else ''} conectado{'s' if len(devices) != 1 else ''}"
         else:
-            icon = QIcon.fromTheme("drive-removable-media-symbolic")
+            icon = _themed_icon("drive-removable-media-symbolic")
             tooltip = "No hay dispositivos conectados"
 
         if icon.isNull():
@@ -884,7 +2316,7 @@ class DesktopPanel(QMainWindow):
             self.storage_button.setText("💾")
         else:
             self.storage_button.setIcon(icon)
-            self.storage_button.setIconSize(QSize(22, 22))
+            self.storage_button.setIconSize(_ICON_SIZE_22)
         
         self.storage_button.setToolTip(tooltip)
 
@@ -901,7 +2333,7 @@ class DesktopPanel(QMainWindow):
 
         # Título
         header = QLabel("Dispositivos de Almacenamiento")
-        header.setStyleSheet("font-weight: bold; color: #333333; font-size: 14px;")
+        header.setObjectName("MenuTitle")
         main_layout.addWidget(header)
 
         if devices:
@@ -917,87 +2349,48 @@ class DesktopPanel(QMainWindow):
             devices_layout.setSpacing(4)
             devices_layout.setContentsMargins(0, 0, 0, 0)
 
-            for device in devices:
-                # Contenedor para cada dispositivo
-                device_widget = QWidget()
-                device_widget.setStyleSheet("""
-                    QWidget {
-                        background: rgba(0, 0, 0, 0.05);
-                        border-radius: 8px;
-                        padding: 8px;
-                    }
-                    QWidget:hover {
-                        background: rgba(0, 0, 0, 0.08);
-                    }
-                """)
-                device_layout = QVBoxLayout(device_widget)
-                device_layout.setSpacing(4)
-                device_layout.setContentsMargins(8, 8, 8, 8)
-
-                # Nombre y tamaño
-                name_label = QLabel(f"<b>{device['name']}</b>")
-                name_label.setStyleSheet("color: #333333;")
-                device_layout.addWidget(name_label)
-
-                size_label = QLabel(f"Tamaño: {device['size']}")
-                size_label.setStyleSheet("color: #666666; font-size: 11px;")
-                device_layout.addWidget(size_label)
-
-                # Botones de acción
-                buttons_widget = QWidget()
-                buttons_layout = QHBoxLayout(buttons_widget)
-                buttons_layout.setContentsMargins(0, 4, 0, 0)
-                buttons_layout.setSpacing(4)
-
-                # Botón Abrir
-                open_btn = QPushButton(QIcon.fromTheme("folder"), "Abrir")
-                open_btn.setStyleSheet("""
-                    QPushButton {
-                        background: #3daee9;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 4px 8px;
-                    }
-                    QPushButton:hover {
-                        background: #2196F3;
-                    }
-                """)
-                open_btn.clicked.connect(
-                    lambda checked, path=device['mountpoint']: 
-                    QDesktopServices.openUrl(QUrl.fromLocalFile(path))
-                )
-                buttons_layout.addWidget(open_btn)
-
-                # Botón Expulsar
-                eject_btn = QPushButton(QIcon.fromTheme("media-eject"), "Expulsar")
-                eject_btn.setStyleSheet("""
-                    QPushButton {
-                        background: transparent;
-                        color: #333333;
-                        border: 1px solid #cccccc;
-                        border-radius: 4px;
-                        padding: 4px 8px;
-                    }
-                    QPushButton:hover {
-                        background: rgba(0, 0, 0, 0.05);
-                    }
-                """)
-                eject_btn.clicked.connect(
-                    lambda checked, path=device['path']: 
-                    self.eject_device(path)
-                )
-                buttons_layout.addWidget(eject_btn)
+            with _batched_updates(devices_widget):
+                for device in devices:
+                    # Una tarjeta por dispositivo con una sola rejilla: nombre y tamaño
+                    # arriba, botones debajo (sin widgets ni layouts intermedios)
+                    device_widget = QWidget()
+                    device_widget.setObjectName("DeviceCard")
+                    device_layout = QGridLayout(device_widget)
+                    device_layout.setHorizontalSpacing(4)
+                    device_layout.setVerticalSpacing(4)
+                    device_layout.setContentsMargins(8, 8, 8, 8)
+
+                    # Nombre y tamaño
+                    name_label = QLabel(f"<b>{device['name']}</b>")
+                    name_label.setObjectName("DeviceName")
+                    device_layout.addWidget(name_label, 0, 0, 1, 2)
+
+                    size_label = QLabel(f"Tamaño: {device['size']}")
+                    size_label.setObjectName("DeviceSize")
+                    device_layout.addWidget(size_label, 1, 0, 1, 2)
+
+                    # Botón Abrir
+                    open_btn = QPushButton(_themed_icon("folder"), "Abrir")
+                    open_btn.setObjectName("OpenBtn")
+                    open_btn.setProperty("dev_mount", device['mountpoint'])
+                    open_btn.clicked.connect(self._on_storage_open_clicked)
+                    device_layout.addWidget(open_btn, 2, 0)
+
+                    # Botón Expulsar
+                    eject_btn = QPushButton(_themed_icon("media-eject"), "Expulsar")
+                    eject_btn.setObjectName("EjectBtn")
+                    eject_btn.setProperty("dev_path", device['path'])
+                    eject_btn.clicked.connect(self._on_storage_eject_clicked)
+                    device_layout.addWidget(eject_btn, 2, 1)
 
-                device_layout.addWidget(buttons_widget)
-                devices_layout.addWidget(device_widget)
+                    devices_layout.addWidget(device_widget)
 
             scroll.setWidget(devices_widget)
             main_layout.addWidget(scroll)
         else:
             # Mensaje cuando no hay dispositivos
             no_devices = QLabel("No hay dispositivos de almacenamiento conectados")
-            no_devices.setStyleSheet("color: #666666; padding: 20px;")
+            no_devices.setObjectName("MenuEmpty")
             no_devices.setAlignment(Qt.AlignmentFlag.AlignCenter)
             main_layout.addWidget(no_devices)
 
@@ -1007,45 +2400,25 @@ class DesktopPanel(QMainWindow):
         menu.addAction(action)
 
         # Estilo del menú
-        menu.setStyleSheet("""
-            QMenu {
-                background: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                padding: 4px;
-            }
-        """)
+        menu.setObjectName("PanelPopup")
 
         # Timer para actualización en tiempo real
-        timer = QTimer(menu)
-        timer.timeout.connect(self.update_storage_status)
-        timer.start(2000)
-        menu.aboutToHide.connect(timer.stop)
+        self._start_menu_timer('storage', menu, 5000, self.update_storage_status)
 
         # Mostrar el menú justo fuera del panel, no sobre él
-        position = self.settings.get('position', 'top')
-        btn_rect = self.storage_button.rect()
-        menu_size = menu.sizeHint()
-        if position == 'top':
-            pos = self.storage_button.mapToGlobal(btn_rect.bottomLeft())
-            pos.setY(pos.y() + self.storage_button.height())
-        elif position == 'bottom':
-            pos = self.storage_button.mapToGlobal(btn_rect.topLeft())
-            pos.setY(pos.y() - menu_size.height())
-        elif position == 'left':
-            pos = self.storage_button.mapToGlobal(btn_rect.topRight())
-        elif position == 'right':
-            pos = self.storage_button.mapToGlobal(btn_rect.topLeft())
-            pos.setX(pos.x() - menu_size.width())
-        else:
-            pos = self.storage_button.mapToGlobal(btn_rect.bottomLeft())
-        menu.exec(pos)
+        menu.exec(self._position_menu(self.storage_button, menu))
 
     def get_bluetooth_status(self):
         """Obtener el estado del Bluetooth y dispositivos conectados"""
+        if _bluez_available():
+            try:
+                return self._read_bluez_status()
+            except Exception as e:
+                _bluez_registered.cache_clear()  # bluetoothd pudo haberse ido del bus
+                print(f"Error leyendo BlueZ por D-Bus, se usará bluetoothctl: {e}")
         try:
             # Verificar si bluetoothctl está disponible
-            if subprocess.run(['which', 'bluetoothctl'], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode != 0:
+            if not _which('bluetoothctl'):
                 return {'error': 'bluetoothctl no está instalado'}
 
             # Obtener estado del controlador
@@ -1055,46 +2428,18 @@ class DesktopPanel(QMainWindow):
             if not powered:
                 return {'powered': False, 'devices': []}
 
-            # Obtener dispositivos conectados
+            # Obtener dispositivos vinculados y cuáles están conectados
+            paired, connected = self._bluetooth_paired_and_connected()
             devices = []
-            paired_devices = subprocess.check_output(['bluetoothctl', 'paired-devices'], universal_newlines=True)
-            for line in paired_devices.splitlines():
-                if line.strip():
-                    try:
-                        dev_id = line.split()[1]
-                        dev_name = ' '.join(line.split()[2:])
-                        
-                        # Obtener información adicional del dispositivo
-                        info = subprocess.check_output(['bluetoothctl', 'info', dev_id], universal_newlines=True)
-                        connected = 'Connected: yes' in info
-                        
-                        # Determinar el tipo de dispositivo
-                        dev_type = 'other'
-                        icon_name = 'bluetooth'
-                        
-                        if any(kw in dev_name.lower() for kw in ['mouse', 'ratón']):
-                            dev_type = 'mouse'
-                            icon_name = 'input-mouse'
-                        elif any(kw in dev_name.lower() for kw in ['keyboard', 'teclado']):
-                            dev_type = 'keyboard'
-                            icon_name = 'input-keyboard'
-                        elif any(kw in dev_name.lower() for kw in ['headset', 'headphone', 'auricular', 'speaker']):
-                            dev_type = 'audio'
-                            icon_name = 'audio-headset'
-                        elif any(kw in dev_name.lower() for kw in ['phone', 'móvil', 'android', 'iphone']):
-                            dev_type = 'phone'
-                            icon_name = 'phone'
-                        
-                        devices.append({
-                            'id': dev_id,
-                            'name': dev_name,
-                            'connected': connected,
-                            'type': dev_type,
-                            'icon': icon_name
-                        })
-                        
-                    except Exception as e:
-                        print(f"Error al procesar dispositivo Bluetooth: {str(e)}")
+            for dev_id, dev_name in paired.items():
+                dev_type, icon_name = self._bluetooth_device_kind(dev_name)
+                devices.append({
+                    'id': dev_id,
+                    'name': dev_name,
+                    'connected': dev_id in connected,
+                    'type': dev_type,
+                    'icon': icon_name
+                })
 
             return {
                 'powered': True,
@@ -1104,23 +2449,134 @@ class DesktopPanel(QMainWindow):
         except Exception as e:
             return {'error': str(e)}
 
+    def _read_bluez_status(self):
+        """Mismo resultado que get_bluetooth_status, leído de BlueZ por D-Bus sin procesos"""
+        for adapter in _bluez_children('/org/bluez'):
+            try:
+                adapter_props = _bluez_properties(adapter, 'org.bluez.Adapter1')
+            except RuntimeError:
+                continue  # No es un adaptador
+            break
+        else:
+            return {'error': 'No se encontró ningún adaptador Bluetooth'}
+
+        if not adapter_props.get('Powered'):
+            return {'powered': False, 'devices': []}
+
+        devices = []
+        for path in _bluez_children(adapter):
+            try:
+                props = _bluez_properties(path, 'org.bluez.Device1')
+            except RuntimeError:
+                continue
+            if not props.get('Paired'):
+                continue
+            dev_id = props.get('Address', '')
+            dev_name = props.get('Alias') or props.get('Name') or dev_id
+            dev_type, icon_name = self._bluetooth_device_kind(dev_name)
+            devices.append({
+                'id': dev_id,
+                'path': path,
+                'name': dev_name,
+                'connected': bool(props.get('Connected')),
+                'type': dev_type,
+                'icon': icon_name
+            })
+        return {'powered': True, 'devices': devices}
+
+    def _bluetooth_paired_and_connected(self):
+        """Dispositivos vinculados (MAC -> nombre) y el conjunto de MACs conectadas.
+        Con BlueZ >= 5.65 son dos llamadas en total; antes, una 'info' por dispositivo"""
+        if _bluetoothctl_version() >= (5, 65):
+            paired = self._bluetoothctl_devices(['devices', 'Paired'])
+            connected = set(self._bluetoothctl_devices(['devices', 'Connected']))
+            return paired, connected
+
+        paired = self._bluetoothctl_devices(['paired-devices'])
+        connected = set()
+        for dev_id in paired:
+            try:
+                info = subprocess.check_output(['bluetoothctl', 'info', dev_id], universal_newlines=True)
+            except Exception as e:
+                print(f"Error al procesar dispositivo Bluetooth: {str(e)}")
+                continue
+            if 'Connected: yes' in info:
+                connected.add(dev_id)
+        return paired, connected
+
+    @staticmethod
+    def _bluetoothctl_devices(args):
+        """Ejecutar un listado de bluetoothctl y devolver {MAC: nombre}"""
+        output = subprocess.check_output(['bluetoothctl', *args], universal_newlines=True)
+        devices = {}
+        for line in output.splitlines():
+            parts = line.split(maxsplit=2)
+            if len(parts) >= 2 and parts[0] == 'Device':
+                devices[parts[1]] = parts[2] if len(parts) > 2 else parts[1]
+        return devices
+
+    # Palabra clave -> (tipo, icono), en orden de prioridad
+    _BT_KEYWORDS = {
+        'mouse': ('mouse', 'input-mouse'), 'ratón': ('mouse', 'input-mouse'),
+        'keyboard': ('keyboard', 'input-keyboard'), 'teclado': ('keyboard', 'input-keyboard'),
+        'headset': ('audio', 'audio-headset'), 'headphone': ('audio', 'audio-headset'),
+        'auricular': ('audio', 'audio-headset'), 'speaker': ('audio', 'audio-headset'),
+        'phone': ('phone', 'phone'), 'móvil': ('phone', 'phone'),
+        'android': ('phone', 'phone'), 'iphone': ('phone', 'phone'),
+    }
+    _BT_PRIORITY = {kind: i for i, kind in enumerate(dict.fromkeys(t for t, _ in _BT_KEYWORDS.values()))}
+    # Una sola pasada por el nombre; las palabras más largas primero (headphone antes que phone)
+    _BT_KEYWORDS_RE = re.compile("|".join(map(re.escape, sorted(_BT_KEYWORDS, key=len, reverse=True))))
+
+    @classmethod
+    def _bluetooth_device_kind(cls, dev_name):
+        """Determinar el tipo de dispositivo y su icono a partir del nombre"""
+        hits = [cls._BT_KEYWORDS[kw] for kw in cls._BT_KEYWORDS_RE.findall(dev_name.lower())]
+        if not hits:
+            return 'other', 'bluetooth'
+        return min(hits, key=lambda hit: cls._BT_PRIORITY[hit[0]])
+
     def update_bluetooth_status(self):
-        """Actualizar el ícono y estado del Bluetooth"""
-        status = self.get_bluetooth_status()
-        
+        """Leer el estado del Bluetooth (BlueZ o bluetoothctl) en el QThreadPool y actualizar el ícono"""
+        if self._bluetooth_task is not None:
+            return  # Ya hay una lectura en curso
+        self._bluetooth_task = _Task(self.get_bluetooth_status)
+        self._bluetooth_task.done.connect(self._on_bluetooth_read)
+        QThreadPool.globalInstance().start(self._bluetooth_task)
+
+    def _on_bluetooth_read(self, status):
+        self._bluetooth_task = None
+        if status is None:
+            status = {'error': 'No se pudo leer el estado del Bluetooth'}
+        self._bluetooth_status = status
+        self.apply_bluetooth_status(status)
+
+        # Un menú abierto antes de la primera lectura espera este resultado
+        pending, self._bluetooth_pending_menu = self._bluetooth_pending_menu, None
+        if pending is not None and pending[0].isVisible():
+            self._populate_bluetooth_menu(*pending)
+
+    def apply_bluetooth_status(self, status):
+        """Actualizar el ícono y estado del Bluetooth (solo toca widgets)"""
+        sig = ('error' in status, status.get('powered'),
+               tuple((d['id'], d['connected']) for d in status.get('devices', [])))
+        if sig == self._last_bt_sig:
+            return  # Sin cambios desde la última lectura
+        self._last_bt_sig = sig
+
         if 'error' in status:
-            icon = QIcon.fromTheme("bluetooth-disabled")
+            icon = _themed_icon("bluetooth-disabled")
             tooltip = "Bluetooth no disponible"
         elif not status['powered']:
-            icon = QIcon.fromTheme("bluetooth-offline")
+            icon = _themed_icon("bluetooth-offline")
             tooltip = "Bluetooth desactivado"
         else:
             connected_devices = [d for d in status['devices'] if d['connected']]
             if connected_devices:
-                icon = QIcon.fromTheme("bluetooth-active")
+                icon = _themed_icon("bluetooth-active")
                 tooltip = f"{len(connected_devices)} dispositivo{'s' if len(connected_devices) != 1 else ''} conectado{'s' if len(connected_devices) != 1 else ''}"
             else:
-                icon = QIcon.fromTheme("bluetooth")
+                icon = _themed_icon("bluetooth")
                 tooltip = "Bluetooth activado"
 
         if icon.isNull():
@@ -1131,7 +2587,7 @@ class DesktopPanel(QMainWindow):
                 self.bluetooth_button.setText("📶")
         else:
             self.bluetooth_button.setIcon(icon)
-            self.bluetooth_button.setIconSize(QSize(22, 22))
+            self.bluetooth_button.setIconSize(_ICON_SIZE_22)
         
         self.bluetooth_button.setToolTip(tooltip)
 
@@ -1149,8 +2605,36 @@ class DesktopPanel(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error al cambiar estado del Bluetooth: {str(e)}")
 
+    @pyqtSlot(str, bool)
+    def _on_bluetooth_device_clicked(self, device_id, connected):
+        """Botón Conectar/Desconectar de una fila de la lista de dispositivos"""
+        if connected:
+            self.disconnect_bluetooth_device(device_id)
+        else:
+            self.connect_bluetooth_device(device_id)
+
+    def _bluez_device_call(self, device_id, method):
+        """Connect/Disconnect por D-Bus sin bloquear la interfaz; False si hay que usar bluetoothctl"""
+        devices = (self._bluetooth_status or {}).get('devices', [])
+        path = next((d.get('path') for d in devices if d['id'] == device_id), None)
+        if path is None or not _bluez_available():
+            return False
+        msg = QDBusMessage.createMethodCall(_BLUEZ, path, 'org.bluez.Device1', method)
+        watcher = QDBusPendingCallWatcher(QDBusConnection.systemBus().asyncCall(msg), self)
+        watcher.finished.connect(functools.partial(self._on_bluez_device_reply, method))
+        return True
+
+    def _on_bluez_device_reply(self, method, watcher):
+        watcher.deleteLater()
+        if watcher.isError():
+            action = "conectar" if method == 'Connect' else "desconectar"
+            QMessageBox.warning(self, "Error", f"Error al {action} dispositivo: {watcher.error().message()}")
+        self.update_bluetooth_status()
+
     def connect_bluetooth_device(self, device_id):
         """Conectar a un dispositivo Bluetooth"""
+        if self._bluez_device_call(device_id, 'Connect'):
+            return
         try:
             subprocess.run(['bluetoothctl', 'connect', device_id], check=True)
             self.update_bluetooth_status()
@@ -1159,6 +2643,8 @@ class DesktopPanel(QMainWindow):
 
     def disconnect_bluetooth_device(self, device_id):
         """Desconectar un dispositivo Bluetooth"""
+        if self._bluez_device_call(device_id, 'Disconnect'):
+            return
         try:
             subprocess.run(['bluetoothctl', 'disconnect', device_id], check=True)
             self.update_bluetooth_status()
@@ -1168,6 +2654,26 @@ class DesktopPanel(QMainWindow):
     def show_notifications_menu(self):
         """Mostrar menú del centro de notificaciones"""
         print(f"Mostrando menú de notificaciones. Total: {len(self.notifications)}")  # Debug
+        if self.notification_menu is None:
+            self._build_notifications_menu()
+        self._populate_notifications_menu()
+        menu = self.notification_menu
+
+        # Calcular posición del menú
+        button_pos = self.notification_button.mapToGlobal(self.notification_button.rect().topLeft())
+        menu_x = button_pos.x() - menu.sizeHint().width() + self.notification_button.width()
+        
+        # Si el panel está en la parte superior, mostrar abajo
+        if self.y() == 0:
+            menu_y = self.height()
+        else:
+            # Si el panel está en la parte inferior, mostrar arriba
+            menu_y = button_pos.y() - menu.sizeHint().height()
+        
+        menu.exec(QPoint(menu_x, menu_y))
+
+    def _build_notifications_menu(self):
+        """Crear una sola vez el menú de notificaciones; las filas se reutilizan entre aperturas"""
         menu = QMenu(self)
         self.notification_menu = menu  # Guardar referencia para poder cerrarlo
         
@@ -1183,25 +2689,13 @@ class DesktopPanel(QMainWindow):
         header_layout.setContentsMargins(0, 0, 0, 0)
 
         title = QLabel("Centro de Notificaciones")
-        title.setStyleSheet("font-weight: bold; color: #333333; font-size: 14px;")
+        title.setObjectName("MenuTitle")
         header_layout.addWidget(title)
 
-        if self.notifications:
-            clear_all_btn = QPushButton("Limpiar todo")
-            clear_all_btn.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    color: #666;
-                    padding: 4px 8px;
-                }
-                QPushButton:hover {
-                    background: rgba(0, 0, 0, 0.1);
-                    border-radius: 4px;
-                }
-            """)
-            clear_all_btn.clicked.connect(self.clear_all_notifications)
-            header_layout.addWidget(clear_all_btn)
+        self._notif_clear_btn = QPushButton("Limpiar todo")
+        self._notif_clear_btn.setObjectName("NotificationClearAll")
+        self._notif_clear_btn.clicked.connect(self.clear_all_notifications)
+        header_layout.addWidget(self._notif_clear_btn)
 
         main_layout.addWidget(header_widget)
 
@@ -1211,74 +2705,11 @@ class DesktopPanel(QMainWindow):
         scroll_layout.setSpacing(8)
         scroll_layout.setContentsMargins(0, 0, 0, 0)
 
-        if self.notifications:
-            for idx, notif in enumerate(self.notifications[:10]):
-                # Contenedor para cada notificación
-                notif_widget = QWidget()
-                notif_widget.setMinimumHeight(50)  # Altura mínima para cada notificación
-                notif_widget.setStyleSheet("""
-                    QWidget {
-                        background: rgba(0, 0, 0, 0.05);
-                        border-radius: 8px;
-                        padding: 8px;
-                        margin: 2px 0;
-                    }
-                """)
-                notif_layout = QVBoxLayout(notif_widget)
-                notif_layout.setSpacing(4)
-
-                # Encabezado: App + Timestamp + Botón cerrar
-                header_widget = QWidget()
-                header_layout = QHBoxLayout(header_widget)
-                header_layout.setContentsMargins(0, 0, 0, 0)
-
-                app_label = QLabel(f"<b>{notif.app_name}</b>")
-                header_layout.addWidget(app_label)
-
-                time_label = QLabel(notif.timestamp.strftime("%H:%M"))
-                time_label.setStyleSheet("color: #666;")
-                header_layout.addWidget(time_label)
-
-                close_btn = QPushButton("×")
-                close_btn.setFixedSize(24, 24)
-                close_btn.setStyleSheet("""
-                    QPushButton {
-                        background: transparent;
-                        border: none;
-                        font-size: 16px;
-                        font-weight: bold;
-                        color: #666;
-                    }
-                    QPushButton:hover {
-                        background: rgba(0, 0, 0, 0.1);
-                        border-radius: 4px;
-                        color: #333;
-                    }
-                """)
-                close_btn.clicked.connect(lambda checked, i=idx: self.remove_notification(i))
-                header_layout.addWidget(close_btn)
-
-                notif_layout.addWidget(header_widget)
-
-                # Título
-                if notif.summary:
-                    summary_label = QLabel(f"<b>{notif.summary}</b>")
-                    notif_layout.addWidget(summary_label)
-
-                # Contenido
-                if notif.body:
-                    body_label = QLabel(notif.body)
-                    body_label.setWordWrap(True)
-                    notif_layout.addWidget(body_label)
-
-                scroll_layout.addWidget(notif_widget)
-        else:
-            empty_label = QLabel("No hay notificaciones")
-            empty_label.setStyleSheet("color: #666; padding: 20px;")
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            scroll_layout.addWidget(empty_label)
+        self._notif_empty_label = QLabel("No hay notificaciones")
+        self._notif_empty_label.setObjectName("MenuEmpty")
+        self._notif_empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        scroll_layout.addWidget(self._notif_empty_label)
 
-        # Crear scroll area
         # Crear scroll area
         scroll = QScrollArea()
         scroll.setWidget(scroll_widget)
@@ -1286,82 +2717,135 @@ class DesktopPanel(QMainWindow):
         scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         scroll.setMinimumWidth(350)  # Un poco más ancho para mejor legibilidad
-        
-        # Calcular altura basada en el contenido
-        screen = QApplication.primaryScreen().geometry()
-        content_height = scroll_widget.sizeHint().height()
-        max_height = screen.height() * 0.7  # 70% de la altura de la pantalla
-        
-        # Si el contenido es menor que el máximo, usar el tamaño del contenido
-        if content_height < max_height:
-            scroll.setMaximumHeight(content_height + 30)  # +30 para margen
-        else:
-            scroll.setMaximumHeight(int(max_height))
-            
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: rgba(0, 0, 0, 0.1);
-                width: 8px;
-                border-radius: 4px;
-            }
-            QScrollBar::handle:vertical {
-                background: rgba(0, 0, 0, 0.2);
-                border-radius: 4px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: rgba(0, 0, 0, 0.3);
-            }
-        """)
+        scroll.setObjectName("NotificationScroll")
+        main_layout.addWidget(scroll)
 
         # Configuración
         settings_btn = QPushButton("Configuración de notificaciones")
-        settings_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: 1px solid #cccccc;
-                border-radius: 4px;
-                padding: 8px;
-                color: #333333;
-            }
-            QPushButton:hover {
-                background: rgba(0, 0, 0, 0.05);
-            }
-        """)
+        settings_btn.setObjectName("NotificationSettingsButton")
         settings_btn.clicked.connect(self.show_notification_settings)
         main_layout.addWidget(settings_btn)
 
         # Aplicar el widget al menú
-        action = QWidgetAction(menu)
-        action.setDefaultWidget(main_widget)
-        menu.addAction(action)
+        self._notif_action = QWidgetAction(menu)
+        self._notif_action.setDefaultWidget(main_widget)
+        menu.addAction(self._notif_action)
 
         # Estilo del menú
-        menu.setStyleSheet("""
-            QMenu {
-                background: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                padding: 4px;
-            }
-        """)
+        menu.setObjectName("PanelPopup")
 
-        # Calcular posición del menú
-        button_pos = self.notification_button.mapToGlobal(self.notification_button.rect().topLeft())
-        menu_x = button_pos.x() - menu.sizeHint().width() + self.notification_button.width()
+        self._notif_scroll = scroll
+        self._notif_scroll_widget = scroll_widget
+        self._notif_layout = scroll_layout
+
+    def _notification_row(self, index):
+        """Devolver la fila 'index' del pool, creándola solo si todavía no existe"""
+        if index < len(self._notif_rows):
+            return self._notif_rows[index]
+
+        # Contenedor para cada notificación
+        row = QWidget()
+        row.setMinimumHeight(50)  # Altura mínima para cada notificación
+        row.setObjectName("NotificationCard")
+        row_layout = QVBoxLayout(row)
+        row_layout.setSpacing(4)
+
+        # Encabezado: App + Timestamp + Botón cerrar
+        header_widget = QWidget()
+        header_layout = QHBoxLayout(header_widget)
+        header_layout.setContentsMargins(0, 0, 0, 0)
+
+        row.app_label = QLabel()
+        header_layout.addWidget(row.app_label)
+
+        row.time_label = QLabel()
+        row.time_label.setObjectName("NotificationTime")
+        header_layout.addWidget(row.time_label)
+
+        row.close_btn = QPushButton("×")
+        row.close_btn.setFixedSize(24, 24)
+        row.close_btn.setObjectName("NotificationClose")
+        row.close_btn.clicked.connect(self._on_notification_close_clicked)
+        header_layout.addWidget(row.close_btn)
+
+        row_layout.addWidget(header_widget)
+
+        # Título
+        row.summary_label = QLabel()
+        row_layout.addWidget(row.summary_label)
+
+        # Contenido
+        row.body_label = QLabel()
+        row.body_label.setWordWrap(True)
+        row_layout.addWidget(row.body_label)
+
+        self._notif_layout.addWidget(row)
+        self._notif_rows.append(row)
+        return row
+
+    @pyqtSlot()
+    def _on_notification_close_clicked(self):
+        self.remove_notification(self.sender().property("notif_idx"))
+
+    def _fill_notification_row(self, idx, notif):
+        """Mostrar 'notif' en la fila 'idx' del pool"""
+        row = self._notification_row(idx)
+        row.close_btn.setProperty("notif_idx", idx)
+        row.app_label.setText(f"<b>{notif.app_name}</b>")
+        row.time_label.setText(notif.timestamp.strftime("%H:%M"))
+        row.summary_label.setText(f"<b>{notif.summary}</b>" if notif.summary else "")
+        row.summary_label.setVisible(bool(notif.summary))
+        row.body_label.setText(notif.body or "")
+        row.body_label.setVisible(bool(notif.body))
+        row.show()
+
+    def _populate_notifications_menu(self):
+        """Volcar las notificaciones actuales en las filas del pool y ajustar la altura"""
+        shown = list(itertools.islice(self.notifications, 10))
+        with _batched_updates(self._notif_scroll_widget):
+            for idx, notif in enumerate(shown):
+                self._fill_notification_row(idx, notif)
+            for row in self._notif_rows[len(shown):]:
+                row.hide()
+        self._fit_notifications_menu()
+
+    def _remove_notification_row(self, index):
+        """Quitar la fila 'index' del menú abierto sin volver a rellenar las demás: la fila
+        pasa al final del pool y solo se escribe la notificación que entra en la décima"""
+        rows = self._notif_rows
+        if index >= len(rows):
+            return
+        with _batched_updates(self._notif_scroll_widget):
+            row = rows.pop(index)
+            row.hide()
+            self._notif_layout.removeWidget(row)
+            self._notif_layout.addWidget(row)
+            rows.append(row)
+            for idx in range(index, len(rows)):
+                rows[idx].close_btn.setProperty("notif_idx", idx)
+            if len(self.notifications) >= 10:
+                self._fill_notification_row(9, self.notifications[9])
+        self._fit_notifications_menu()
+
+    def _fit_notifications_menu(self):
+        """Ajustar el texto vacío, el botón de limpiar y la altura al contenido actual"""
+        self._notif_empty_label.setVisible(not self.notifications)
+        self._notif_clear_btn.setVisible(bool(self.notifications))
+
+        # Calcular altura basada en el contenido
+        screen = QApplication.primaryScreen().geometry()
+        content_height = self._notif_scroll_widget.sizeHint().height()
+        max_height = screen.height() * 0.7  # 70% de la altura de la pantalla
         
-        # Si el panel está en la parte superior, mostrar abajo
-        if self.y() == 0:
-            menu_y = self.height()
+        # Si el contenido es menor que el máximo, usar el tamaño del contenido
+        if content_height < max_height:
+            self._notif_scroll.setMaximumHeight(content_height + 30)  # +30 para margen
         else:
-            # Si el panel está en la parte inferior, mostrar arriba
-            menu_y = button_pos.y() - menu.sizeHint().height()
-        
-        menu.exec(QPoint(menu_x, menu_y))
+            self._notif_scroll.setMaximumHeight(int(max_height))
+
+        # QMenu guarda el tamaño de sus acciones: avisarle de que el contenido cambió
+        self._notif_action.setVisible(False)
+        self._notif_action.setVisible(True)
 
     def show_notification_settings(self):
         """Mostrar configuración de notificaciones"""
@@ -1425,227 +2909,156 @@ class DesktopPanel(QMainWindow):
         dialog.exec()
 
     def show_bluetooth_menu(self):
-        """Mostrar menú de Bluetooth"""
+        """Mostrar menú de Bluetooth (el contenido se construye al abrirse)"""
         menu = QMenu(self)
-        
-        # Widget principal
+
+        # Contenedor fijo de la QWidgetAction; su contenido se sustituye al llegar datos
+        box = QWidget()
+        box_layout = QVBoxLayout(box)
+        box_layout.setContentsMargins(0, 0, 0, 0)
+        action = QWidgetAction(menu)
+        action.setDefaultWidget(box)
+        menu.addAction(action)
+        menu.aboutToShow.connect(lambda: self._populate_bluetooth_menu(menu, action, box))
+
+        # Estilo del menú
+        menu.setObjectName("PanelPopup")
+
+        # Timer para actualización en tiempo real
+        self._start_menu_timer('bluetooth', menu, 5000, self.update_bluetooth_status)
+
+        menu.exec(self.bluetooth_button.mapToGlobal(self.bluetooth_button.rect().bottomLeft()))
+
+    def _populate_bluetooth_menu(self, menu, action, box):
+        """Rellenar el menú con el último estado leído en segundo plano"""
+        status = self._bluetooth_status
+        if status is None:
+            # Aún no hay lectura: mostrar el marcador y completar cuando termine
+            self._bluetooth_pending_menu = (menu, action, box)
+            self.update_bluetooth_status()
+
+        layout = box.layout()
+        old = layout.takeAt(0)
+        if old is not None and old.widget() is not None:
+            old.widget().deleteLater()
+        layout.addWidget(self._bluetooth_menu_widget(menu, status))
+
+        # QMenu guarda el tamaño de sus acciones: avisarle de que el contenido cambió
+        action.setVisible(False)
+        action.setVisible(True)
+        if menu.isVisible():
+            menu.adjustSize()
+
+    def _bluetooth_menu_widget(self, menu, status):
+        """Contenido del menú de Bluetooth para 'status' (None mientras se busca)"""
         main_widget = QWidget()
         main_layout = QVBoxLayout(main_widget)
         main_layout.setSpacing(8)
         main_layout.setContentsMargins(12, 12, 12, 12)
 
-        # Estado actual
-        status = self.get_bluetooth_status()
-
         # Encabezado con switch de poder
         header_widget = QWidget()
         header_layout = QHBoxLayout(header_widget)
         header_layout.setContentsMargins(0, 0, 0, 8)
 
         header_label = QLabel("Bluetooth")
-        header_label.setStyleSheet("font-weight: bold; color: #333333; font-size: 14px;")
+        header_label.setObjectName("MenuTitle")
         header_layout.addWidget(header_label)
 
         power_btn = QPushButton()
-        if 'error' in status:
+        if status is None:
+            power_btn.setText("Buscando…")
+            power_btn.setEnabled(False)
+        elif 'error' in status:
             power_btn.setText("No disponible")
             power_btn.setEnabled(False)
         else:
             power_btn.setText("Activado" if status.get('powered', False) else "Desactivado")
             power_btn.setCheckable(True)
             power_btn.setChecked(status.get('powered', False))
-            power_btn.clicked.connect(lambda: self.toggle_bluetooth(power_btn.isChecked()))
+            power_btn.toggled.connect(self.toggle_bluetooth)
         
-        power_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: 1px solid #cccccc;
-                border-radius: 4px;
-                padding: 4px 8px;
-                color: #333333;
-            }
-            QPushButton:checked {
-                background: #3daee9;
-                color: white;
-                border: none;
-            }
-            QPushButton:hover {
-                background: #2196F3;
-                color: white;
-            }
-        """)
+        power_btn.setObjectName("BluetoothPower")
         header_layout.addWidget(power_btn)
         main_layout.addWidget(header_widget)
 
-        if not 'error' in status and status.get('powered', False):
+        if status is None:
+            searching = QLabel("Buscando dispositivos…")
+            searching.setObjectName("MenuEmpty")
+            searching.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            main_layout.addWidget(searching)
+        elif not 'error' in status and status.get('powered', False):
             devices = status.get('devices', [])
             if devices:
-                # Contenedor con scroll
-                scroll = QScrollArea()
-                scroll.setWidgetResizable(True)
-                scroll.setFrameShape(QFrame.Shape.NoFrame)
-                scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-                scroll.setMaximumHeight(300)
-
-                devices_widget = QWidget()
-                devices_layout = QVBoxLayout(devices_widget)
-                devices_layout.setSpacing(4)
-                devices_layout.setContentsMargins(0, 0, 0, 0)
-
-                for device in devices:
-                    # Contenedor para cada dispositivo
-                    device_widget = QWidget()
-                    device_widget.setStyleSheet("""
-                        QWidget {
-                            background: rgba(0, 0, 0, 0.05);
-                            border-radius: 8px;
-                            padding: 8px;
-                        }
-                        QWidget:hover {
-                            background: rgba(0, 0, 0, 0.08);
-                        }
-                    """)
-                    device_layout = QHBoxLayout(device_widget)
-                    device_layout.setSpacing(8)
-                    device_layout.setContentsMargins(8, 8, 8, 8)
-
-                    # Ícono del dispositivo
-                    icon_label = QLabel()
-                    icon = QIcon.fromTheme(device['icon'])
-                    if not icon.isNull():
-                        icon_label.setPixmap(icon.pixmap(24, 24))
-                    device_layout.addWidget(icon_label)
-
-                    # Información del dispositivo
-                    info_widget = QWidget()
-                    info_layout = QVBoxLayout(info_widget)
-                    info_layout.setSpacing(0)
-                    info_layout.setContentsMargins(0, 0, 0, 0)
-
-                    name_label = QLabel(device['name'])
-                    name_label.setStyleSheet("font-weight: bold; color: #333333;")
-                    info_layout.addWidget(name_label)
-
-                    status_label = QLabel("Conectado" if device['connected'] else "Desconectado")
-                    status_label.setStyleSheet("color: #666666; font-size: 11px;")
-                    info_layout.addWidget(status_label)
-
-                    device_layout.addWidget(info_widget)
-                    device_layout.addStretch()
-
-                    # Botón de conexión/desconexión
-                    connect_btn = QPushButton()
-                    if device['connected']:
-                        connect_btn.setText("Desconectar")
-                        connect_btn.clicked.connect(
-                            lambda checked, dev_id=device['id']: 
-                            self.disconnect_bluetooth_device(dev_id)
-                        )
-                    else:
-                        connect_btn.setText("Conectar")
-                        connect_btn.clicked.connect(
-                            lambda checked, dev_id=device['id']: 
-                            self.connect_bluetooth_device(dev_id)
-                        )
-                    
-                    connect_btn.setStyleSheet("""
-                        QPushButton {
-                            background: transparent;
-                            border: 1px solid #cccccc;
-                            border-radius: 4px;
-                            padding: 4px 8px;
-                            color: #333333;
-                        }
-                        QPushButton:hover {
-                            background: rgba(0, 0, 0, 0.05);
-                        }
-                    """)
-                    device_layout.addWidget(connect_btn)
-
-                    devices_layout.addWidget(device_widget)
-
-                scroll.setWidget(devices_widget)
-                main_layout.addWidget(scroll)
+                # Lista virtualizada: solo se pintan las filas visibles
+                model = BluetoothDevicesModel(devices, menu)
+                delegate = BluetoothDeviceDelegate(menu)
+                delegate.connectClicked.connect(self._on_bluetooth_device_clicked)
+                main_layout.addWidget(_menu_list_view(model, delegate))
             else:
                 no_devices = QLabel("No hay dispositivos vinculados")
-                no_devices.setStyleSheet("color: #666666; padding: 20px;")
+                no_devices.setObjectName("MenuEmpty")
                 no_devices.setAlignment(Qt.AlignmentFlag.AlignCenter)
                 main_layout.addWidget(no_devices)
 
         # Separador
         separator = QFrame()
         separator.setFrameShape(QFrame.Shape.HLine)
-        separator.setStyleSheet("background: rgba(0, 0, 0, 0.1); margin: 4px 0;")
+        separator.setObjectName("MenuSeparator")
         main_layout.addWidget(separator)
 
         # Botón de configuración
-        settings_btn = QPushButton(QIcon.fromTheme("preferences-system-bluetooth"), " Configuración de Bluetooth")
-        settings_btn.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                padding: 8px;
-                text-align: left;
-                color: #333333;
-            }
-            QPushButton:hover {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 4px;
-            }
-        """)
+        settings_btn = QPushButton(_themed_icon("preferences-system-bluetooth"), " Configuración de Bluetooth")
+        settings_btn.setObjectName("MenuLinkButton")
         settings_btn.clicked.connect(self.open_bluetooth_settings)
         main_layout.addWidget(settings_btn)
-
-        # Aplicar el widget al menú
-        action = QWidgetAction(menu)
-        action.setDefaultWidget(main_widget)
-        menu.addAction(action)
-
-        # Estilo del menú
-        menu.setStyleSheet("""
-            QMenu {
-                background: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                padding: 4px;
-            }
-        """)
-
-        # Timer para actualización en tiempo real
-        timer = QTimer(menu)
-        timer.timeout.connect(self.update_bluetooth_status)
-        timer.start(2000)
-        menu.aboutToHide.connect(timer.stop)
-
-        menu.exec(self.bluetooth_button.mapToGlobal(self.bluetooth_button.rect().bottomLeft()))
+        return main_widget
+
+    @staticmethod
+    def _launch_first_available(candidates):
+        """Lanzar el primer comando instalado de 'candidates'; False si no hay ninguno"""
+        for cmd in candidates:
+            if _which(cmd[0]):
+                _spawn(list(cmd))
+                return True
+        return False
+
+    @classmethod
+    def _prewarm_settings_commands(cls):
+        """Resolver de antemano en el PATH las herramientas de configuración, los comandos
+        de sesión, la terminal y el gestor de archivos"""
+        for candidates in (cls._BLUETOOTH_SETTINGS_CMDS, cls._POWER_SETTINGS_CMDS, cls._SOUND_SETTINGS_CMDS,
+                           cls._SUSPEND_CMDS, cls._REBOOT_CMDS, cls._SHUTDOWN_CMDS, cls._LOCK_CMDS,
+                           cls._SWITCH_USER_CMDS, cls._LOGOUT_CMDS, cls._TERMINAL_CMDS,
+                           cls._FILE_MANAGER_CMDS):
+            for cmd in candidates:
+                _which(cmd[0])
 
     def open_bluetooth_settings(self):
         """Abrir la configuración de Bluetooth del sistema"""
         try:
             # Intentar varios comandos comunes para la configuración de Bluetooth
-            for cmd in [
-                ["gnome-control-center", "bluetooth"],  # GNOME
-                ["systemsettings5", "kcm_bluetooth"],  # KDE
-                ["blueman-manager"],  # Blueman
-                ["blueberry"],  # Cinnamon/MATE
-                ["xfce4-settings-manager", "--dialog=bluetooth"]  # XFCE
-            ]:
-                try:
-                    if subprocess.run(["which", cmd[0]], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
-                        subprocess.Popen(cmd)
-                        return
-                except:
-                    continue
+            if self._launch_first_available(self._BLUETOOTH_SETTINGS_CMDS):
+                return
             
             QMessageBox.warning(self, "Error", "No se encontró ningún gestor de Bluetooth instalado")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error al abrir la configuración de Bluetooth: {str(e)}")
 
+    @pyqtSlot()
+    def _on_storage_open_clicked(self):
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.sender().property("dev_mount")))
+
+    @pyqtSlot()
+    def _on_storage_eject_clicked(self):
+        self.eject_device(self.sender().property("dev_path"))
+
     def eject_device(self, device_path):
         """Expulsar un dispositivo de forma segura"""
         try:
             # Intentar desmontar usando udisksctl
             subprocess.run(['udisksctl', 'unmount', '-b', device_path], check=True)
+            self._storage_cache = None
             self.update_storage_status()
             QMessageBox.information(self, "Éxito", "El dispositivo se ha expulsado correctamente")
         except subprocess.CalledProcessError as e:
@@ -1655,19 +3068,8 @@ class DesktopPanel(QMainWindow):
         """Abrir la configuración de energía del sistema"""
         try:
             # Intentar varios comandos comunes para abrir la configuración de energía
-            for cmd in [
-                ["gnome-control-center", "power"],  # GNOME
-                ["systemsettings5", "kcm_powerdevilprofilesconfig"],  # KDE
-                ["xfce4-power-manager-settings"],  # XFCE
-                ["mate-power-preferences"],  # MATE
-                ["cinnamon-settings", "power"]  # Cinnamon
-            ]:
-                try:
-                    if subprocess.run(["which", cmd[0]], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
-                        subprocess.Popen(cmd)
-                        return
-                except:
-                    continue
+            if self._launch_first_available(self._POWER_SETTINGS_CMDS):
+                return
             
             QMessageBox.warning(self, "Error", "No se pudo abrir la configuración de energía")
         except Exception as e:
@@ -1676,18 +3078,12 @@ class DesktopPanel(QMainWindow):
     def update_volume_status(self):
         """Actualizar el ícono de volumen según el estado"""
         volume, muted = self.get_volume_info()
-        
-        if muted:
-            icon = QIcon.fromTheme("audio-volume-muted")
-            tooltip = "Audio muteado"
-        else:
-            if volume > 70:
-                icon = QIcon.fromTheme("audio-volume-high")
-            elif volume > 30:
-                icon = QIcon.fromTheme("audio-volume-medium")
-            else:
-                icon = QIcon.fromTheme("audio-volume-low")
-            tooltip = f"Volumen: {volume}%"
+        self.apply_volume_info(volume, muted)
+
+    def apply_volume_info(self, volume, muted):
+        """Actualizar el ícono de volumen (solo toca widgets)"""
+        icon = _themed_icon(_volume_icon_name(volume, muted))
+        tooltip = "Audio muteado" if muted else f"Volumen: {volume}%"
 
         if icon.isNull():
             # Fallback a emojis si no hay íconos del tema
@@ -1697,34 +3093,53 @@ class DesktopPanel(QMainWindow):
                 self.volume_button.setText("🔊")
         else:
             self.volume_button.setIcon(icon)
-            self.volume_button.setIconSize(QSize(22, 22))
+            self.volume_button.setIconSize(_ICON_SIZE_22)
         
         self.volume_button.setToolTip(tooltip)
 
+    @staticmethod
+    def _pulse_sink_call(action):
+        """Aplicar action(pulse, sink) al sink por defecto; False si hay que usar pactl/amixer"""
+        found = _pulse_default_sink()
+        if found is None:
+            return False
+        try:
+            action(*found)
+            return True
+        except Exception as e:
+            print(f"Error cambiando el volumen con pulsectl: {e}")
+            _pulse_reset(found[0])
+            return False
+
+    @_throttled(100)
     def set_volume(self, volume):
         """Establecer el volumen del sistema"""
-        try:
-            # Intentar con PulseAudio
-            subprocess.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{volume}%"])
-        except:
+        if not self._pulse_sink_call(lambda pulse, sink: pulse.volume_set_all_chans(sink, volume / 100.0)):
             try:
-                # Fallback a ALSA
-                subprocess.run(["amixer", "set", "Master", f"{volume}%"])
+                # Intentar con PulseAudio
+                subprocess.run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{volume}%"])
             except:
-                pass
+                try:
+                    # Fallback a ALSA
+                    subprocess.run(["amixer", "set", "Master", f"{volume}%"])
+                except:
+                    pass
+        self._volume_cache = None  # El valor guardado ya no vale
         self.update_volume_status()
 
     def toggle_mute(self):
         """Alternar el estado de mute"""
-        try:
-            # Intentar con PulseAudio
-            subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"])
-        except:
+        if not self._pulse_sink_call(lambda pulse, sink: pulse.mute(sink, not sink.mute)):
             try:
-                # Fallback a ALSA
-                subprocess.run(["amixer", "set", "Master", "toggle"])
+                # Intentar con PulseAudio
+                subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"])
             except:
-                pass
+                try:
+                    # Fallback a ALSA
+                    subprocess.run(["amixer", "set", "Master", "toggle"])
+                except:
+                    pass
+        self._volume_cache = None  # El valor guardado ya no vale
         self.update_volume_status()
 
     def show_volume_menu(self):
@@ -1744,19 +3159,11 @@ class DesktopPanel(QMainWindow):
         header_layout.setContentsMargins(0, 0, 0, 8)
         
         volume_icon = QLabel()
-        if muted:
-            icon = QIcon.fromTheme("audio-volume-muted")
-        elif volume > 70:
-            icon = QIcon.fromTheme("audio-volume-high")
-        elif volume > 30:
-            icon = QIcon.fromTheme("audio-volume-medium")
-        else:
-            icon = QIcon.fromTheme("audio-volume-low")
-        volume_icon.setPixmap(icon.pixmap(24, 24))
+        volume_icon.setPixmap(_themed_icon(_volume_icon_name(volume, muted)).pixmap(24, 24))
         header_layout.addWidget(volume_icon)
 
         volume_label = QLabel(f"Volumen {volume}%")
-        volume_label.setStyleSheet("font-weight: bold; color: #333333; font-size: 13px;")
+        volume_label.setObjectName("VolumeTitle")
         header_layout.addWidget(volume_label)
         header_layout.addStretch()
 
@@ -1764,13 +3171,7 @@ class DesktopPanel(QMainWindow):
 
         # Container para el slider con fondo estilizado
         slider_container = QWidget()
-        slider_container.setStyleSheet("""
-            QWidget {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 8px;
-                padding: 8px;
-            }
-        """)
+        slider_container.setObjectName("VolumeSliderCard")
         slider_layout = QVBoxLayout(slider_container)
         slider_layout.setContentsMargins(8, 8, 8, 8)
 
@@ -1781,74 +3182,25 @@ class DesktopPanel(QMainWindow):
         slider.setValue(volume)
         slider.setFixedHeight(150)
         slider.valueChanged.connect(lambda v: (self.set_volume(v), volume_label.setText(f"Volumen {v}%")))
-        slider.setStyleSheet("""
-            QSlider::groove:vertical {
-                background: #d0d0d0;
-                width: 6px;
-                border-radius: 3px;
-            }
-            QSlider::handle:vertical {
-                background: #3daee9;
-                border: none;
-                width: 20px;
-                height: 20px;
-                margin: 0 -7px;
-                border-radius: 10px;
-            }
-            QSlider::handle:vertical:hover {
-                background: #2196F3;
-            }
-            QSlider::sub-page:vertical {
-                background: #3daee9;
-                border-radius: 3px;
-            }
-            QSlider::add-page:vertical {
-                background: #d0d0d0;
-                border-radius: 3px;
-            }
-        """)
+        slider.setObjectName("VolumeSlider")
         slider_layout.addWidget(slider)
         main_layout.addWidget(slider_container)
 
         # Botón de mute estilizado
         mute_button = QPushButton("🔇 Silenciar" if not muted else "🔊 Activar sonido")
-        mute_button.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                padding: 8px;
-                text-align: left;
-                color: #333333;
-            }
-            QPushButton:hover {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 4px;
-            }
-        """)
+        mute_button.setObjectName("MenuLinkButton")
         mute_button.clicked.connect(self.toggle_mute)
         main_layout.addWidget(mute_button)
 
         # Separador estilizado
         separator = QFrame()
         separator.setFrameShape(QFrame.Shape.HLine)
-        separator.setStyleSheet("background: rgba(0, 0, 0, 0.1); margin: 4px 0;")
+        separator.setObjectName("MenuSeparator")
         main_layout.addWidget(separator)
 
         # Botón del mezclador estilizado
-        mixer_button = QPushButton(QIcon.fromTheme("preferences-system-sound"), " Configuración de sonido")
-        mixer_button.setStyleSheet("""
-            QPushButton {
-                background: transparent;
-                border: none;
-                padding: 8px;
-                text-align: left;
-                color: #333333;
-            }
-            QPushButton:hover {
-                background: rgba(0, 0, 0, 0.05);
-                border-radius: 4px;
-            }
-        """)
+        mixer_button = QPushButton(_themed_icon("preferences-system-sound"), " Configuración de sonido")
+        mixer_button.setObjectName("MenuLinkButton")
         mixer_button.clicked.connect(self.open_sound_settings)
         main_layout.addWidget(mixer_button)
 
@@ -1858,56 +3210,18 @@ class DesktopPanel(QMainWindow):
         menu.addAction(action)
 
         # Estilo general del menú
-        menu.setStyleSheet("""
-            QMenu {
-                background: #ffffff;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                padding: 4px;
-            }
-        """)
+        menu.setObjectName("PanelPopup")
 
-        # Timer para actualizar el estado
-        timer = QTimer(menu)
-        timer.timeout.connect(self.update_volume_status)
-        timer.start(1000)
-
-        menu.aboutToHide.connect(timer.stop)
+        # El ícono ya se refresca con SystemState (cada segundo, fuera del hilo de la interfaz)
         # Mostrar el menú justo fuera del panel, no sobre él
-        position = self.settings.get('position', 'top')
-        btn_rect = self.volume_button.rect()
-        menu_size = menu.sizeHint()
-        if position == 'top':
-            pos = self.volume_button.mapToGlobal(btn_rect.bottomLeft())
-            pos.setY(pos.y() + self.volume_button.height())
-        elif position == 'bottom':
-            pos = self.volume_button.mapToGlobal(btn_rect.topLeft())
-            pos.setY(pos.y() - menu_size.height())
-        elif position == 'left':
-            pos = self.volume_button.mapToGlobal(btn_rect.topRight())
-        elif position == 'right':
-            pos = self.volume_button.mapToGlobal(btn_rect.topLeft())
-            pos.setX(pos.x() - menu_size.width())
-        else:
-            pos = self.volume_button.mapToGlobal(btn_rect.bottomLeft())
-        menu.exec(pos)
+        menu.exec(self._position_menu(self.volume_button, menu))
 
     def open_sound_settings(self):
         """Abrir la configuración de sonido del sistema"""
         try:
             # Intentar varios comandos comunes para abrir la configuración de sonido
-            for cmd in [
-                ["pavucontrol"],  # PulseAudio Volume Control
-                ["gnome-control-center", "sound"],  # GNOME
-                ["systemsettings5", "kcm_pulseaudio"],  # KDE
-                ["xfce4-audio-settings"]  # XFCE
-            ]:
-                try:
-                    if subprocess.run(["which", cmd[0]], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
-                        subprocess.Popen(cmd)
-                        return
-                except:
-                    continue
+            if self._launch_first_available(self._SOUND_SETTINGS_CMDS):
+                return
             
             # Si ninguno funciona, mostrar mensaje
             QMessageBox.warning(self, "Error", "No se pudo abrir la configuración de sonido")
@@ -1916,39 +3230,41 @@ class DesktopPanel(QMainWindow):
 
     def update_network_status(self):
         """Actualizar el estado de la red y el ícono"""
-        if not PSUTIL_AVAILABLE:
-            self.network_button.setText("📶")  # Emoji fallback
-            return
+        self.apply_network_status(self.read_network_connected())
 
+    @staticmethod
+    def read_network_connected():
+        """True/False según haya alguna interfaz activa; None si no se puede saber.
+        Se ejecuta también en el QThreadPool: no tocar widgets aquí"""
+        if not PSUTIL_AVAILABLE:
+            return None
         try:
-            # Obtener información de red
-            net = psutil.net_if_stats()
-            connected = False
-            for interface, stats in net.items():
-                if interface != 'lo' and stats.isup:  # Ignorar loopback
-                    connected = True
-                    break
-
-            # Actualizar ícono según estado
-            if connected:
-                icon = QIcon.fromTheme("network-transmit-receive")
-                if not icon.isNull():
-                    self.network_button.setIcon(icon)
-                    self.network_button.setIconSize(QSize(22, 22))
-                else:
-                    self.network_button.setText("🌐")
-                self.network_button.setToolTip("Red conectada")
-            else:
-                icon = QIcon.fromTheme("network-offline")
-                if not icon.isNull():
-                    self.network_button.setIcon(icon)
-                    self.network_button.setIconSize(QSize(22, 22))
-                else:
-                    self.network_button.setText("❌")
-                self.network_button.setToolTip("Red desconectada")
-        except:
-            self.network_button.setText("📶")
+            # Ignorar loopback
+            return any(stats.isup for interface, stats in psutil.net_if_stats().items() if interface != 'lo')
+        except Exception:
+            return None
+
+    def apply_network_status(self, connected):
+        """Actualizar el ícono de red (solo toca widgets)"""
+        if connected is None:
+            self.network_button.setText("📶")  # Emoji fallback
             self.network_button.setToolTip("Estado de red desconocido")
+        elif connected:
+            icon = _themed_icon("network-transmit-receive")
+            if not icon.isNull():
+                self.network_button.setIcon(icon)
+                self.network_button.setIconSize(_ICON_SIZE_22)
+            else:
+                self.network_button.setText("🌐")
+            self.network_button.setToolTip("Red conectada")
+        else:
+            icon = _themed_icon("network-offline")
+            if not icon.isNull():
+                self.network_button.setIcon(icon)
+                self.network_button.setIconSize(_ICON_SIZE_22)
+            else:
+                self.network_button.setText("❌")
+            self.network_button.setToolTip("Red desconectada")
 
     def get_wifi_networks(self):
         """Obtener lista de redes WiFi disponibles usando nmcli"""
@@ -1957,18 +3273,17 @@ class DesktopPanel(QMainWindow):
             output = subprocess.check_output(["nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY,IN-USE", "device", "wifi", "list"], 
                                           universal_newlines=True)
             networks = []
-            for line in output.strip().split('\n'):
+            for line in output.splitlines():
                 if line:
-                    ssid, signal, security, in_use = line.split(':')
+                    # Solo el SSID puede contener ':' (escapado como '\:'): cortar desde la derecha
+                    ssid, signal, security, in_use = line.rsplit(':', 3)
                     if ssid:  # Ignorar SSIDs vacíos
-                        networks.append({
-                            'ssid': ssid,
-                            'signal': int(signal) if signal else 0,
-                            'security': security if security != '' else 'Abierta',
-                            'in_use': in_use == '*'
-                        })
+                        ssid = ssid.replace('\\:', ':').replace('\\\\', '\\')
+                        networks.append(WifiRow(ssid, int(signal) if signal else 0,
+                                                security or 'Abierta', in_use == '*'))
             # Ordenar por intensidad de señal
-            return sorted(networks, key=lambda x: x['signal'], reverse=True)
+            networks.sort(key=operator.attrgetter('signal'), reverse=True)
+            return networks
         except Exception as e:
             print(f"Error al obtener redes WiFi: {str(e)}")
             return []
@@ -1985,51 +3300,52 @@ class DesktopPanel(QMainWindow):
                     QLineEdit.EchoMode.Password
                 )
                 if ok and password:
-                    subprocess.Popen(["nmcli", "device", "wifi", "connect", ssid, "password", password])
+                    _spawn(["nmcli", "device", "wifi", "connect", ssid, "password", password])
             else:
                 # Para redes abiertas, conectar directamente
-                subprocess.Popen(["nmcli", "device", "wifi", "connect", ssid])
+                _spawn(["nmcli", "device", "wifi", "connect", ssid])
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error al conectar a {ssid}: {str(e)}")
 
+    def _populate_wifi_menu(self, wifi_menu, menu, networks):
+        """Sustituir el marcador «Buscando…» por las redes encontradas"""
+        wifi_menu.clear()
+        if networks:
+            # Lista virtualizada en lugar de una QAction por SSID
+            model = WifiNetworksModel(networks, wifi_menu)
+            view = _menu_list_view(model, WifiNetworkDelegate(wifi_menu))
+            view.setMinimumWidth(320)
+            view.clicked.connect(lambda index: self._on_wifi_network_clicked(index, menu))
+            action = QWidgetAction(wifi_menu)
+            action.setDefaultWidget(view)
+            wifi_menu.addAction(action)
+        else:
+            action = wifi_menu.addAction("No se encontraron redes")
+            action.setEnabled(False)
+        if wifi_menu.isVisible():
+            wifi_menu.adjustSize()
+
+    def _on_wifi_network_clicked(self, index, menu):
+        """Conectar a la red pulsada en la lista (la red en uso se ignora)"""
+        if index.data(WifiNetworksModel.InUseRole):
+            return
+        menu.close()
+        self.connect_to_wifi(index.data(WifiNetworksModel.SsidRole), index.data(WifiNetworksModel.SecurityRole))
+
     def show_network_menu(self):
         """Mostrar menú contextual de red"""
         menu = QMenu(self)
         
         # Sección de WiFi
         wifi_menu = QMenu("Redes WiFi", menu)
-        wifi_menu.setIcon(QIcon.fromTheme("network-wireless"))
+        wifi_menu.setIcon(_themed_icon("network-wireless"))
         
-        # Obtener y mostrar redes WiFi disponibles
-        networks = self.get_wifi_networks()
-        if networks:
-            for net in networks:
-                # Crear ícono según intensidad de señal
-                if net['signal'] >= 75:
-                    icon = QIcon.fromTheme("network-wireless-signal-excellent")
-                elif net['signal'] >= 50:
-                    icon = QIcon.fromTheme("network-wireless-signal-good")
-                elif net['signal'] >= 25:
-                    icon = QIcon.fromTheme("network-wireless-signal-ok")
-                else:
-                    icon = QIcon.fromTheme("network-wireless-signal-weak")
-                
-                # Crear acción para la red
-                action = wifi_menu.addAction(icon, f"{net['ssid']} ({net['signal']}%) - {net['security']}")
-                if net['in_use']:
-                    action.setIcon(QIcon.fromTheme("network-wireless-connected"))
-                    font = action.font()
-                    font.setBold(True)
-                    action.setFont(font)
-                else:
-                    # Conectar señal solo si no está en uso
-                    action.triggered.connect(
-                        lambda checked, ssid=net['ssid'], sec=net['security']: 
-                        self.connect_to_wifi(ssid, sec)
-                    )
-        else:
-            action = wifi_menu.addAction("No se encontraron redes")
-            action.setEnabled(False)
+        # El menú se abre ya con un marcador; nmcli se ejecuta en el QThreadPool
+        action = wifi_menu.addAction("Buscando…")
+        action.setEnabled(False)
+        task = _Task(self.get_wifi_networks)
+        task.done.connect(lambda networks: self._populate_wifi_menu(wifi_menu, menu, networks or []))
+        menu.aboutToShow.connect(lambda: QThreadPool.globalInstance().start(task))
 
         # Agregar submenú de WiFi al menú principal
         menu.addMenu(wifi_menu)
@@ -2041,7 +3357,7 @@ class DesktopPanel(QMainWindow):
                 for interface, stats in psutil.net_if_stats().items():
                     if interface != 'lo':  # Ignorar loopback
                         status = "Conectado" if stats.isup else "Desconectado"
-                        icon = QIcon.fromTheme("network-wired" if stats.isup else "network-wired-disconnected")
+                        icon = _themed_icon("network-wired" if stats.isup else "network-wired-disconnected")
                         action = menu.addAction(icon, f"{interface}: {status}")
                         action.setEnabled(False)
                 menu.addSeparator()
@@ -2049,75 +3365,88 @@ class DesktopPanel(QMainWindow):
                 pass
 
         # Botón para actualizar redes WiFi
-        refresh_action = menu.addAction(QIcon.fromTheme("view-refresh"), "Actualizar redes WiFi")
-        refresh_action.triggered.connect(lambda: self.show_network_menu())
+        refresh_action = menu.addAction(_themed_icon("view-refresh"), "Actualizar redes WiFi")
+        refresh_action.triggered.connect(self.show_network_menu)
 
         # Botón de configuración
-        config_action = menu.addAction(QIcon.fromTheme("preferences-system-network"), "Configuración de red")
+        config_action = menu.addAction(_themed_icon("preferences-system-network"), "Configuración de red")
         config_action.triggered.connect(self.open_network_settings)
         
         # Mostrar el menú justo fuera del panel, no sobre él
-        position = self.settings.get('position', 'top')
-        btn_rect = self.network_button.rect()
-        menu_size = menu.sizeHint()
-        if position == 'top':
-            pos = self.network_button.mapToGlobal(btn_rect.bottomLeft())
-            pos.setY(pos.y() + self.network_button.height())
-        elif position == 'bottom':
-            pos = self.network_button.mapToGlobal(btn_rect.topLeft())
-            pos.setY(pos.y() - menu_size.height())
-        elif position == 'left':
-            pos = self.network_button.mapToGlobal(btn_rect.topRight())
-        elif position == 'right':
-            pos = self.network_button.mapToGlobal(btn_rect.topLeft())
-            pos.setX(pos.x() - menu_size.width())
-        else:
-            pos = self.network_button.mapToGlobal(btn_rect.bottomLeft())
-        menu.exec(pos)
+        menu.exec(self._position_menu(self.network_button, menu))
 
     def update_panel_launchers(self):
-        # Elimina los lanzadores actuales
-        for i in reversed(range(self.left_layout.count())):
-            widget = self.left_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        # Vuelve a crear los lanzadores según la configuración
+        """Sincronizar los lanzadores con la configuración recreando solo los que cambiaron"""
         launchers = self.settings.get("panel_launchers", [
             {"name": "Menú", "command": None, "icon": "start-here"},
             {"name": "Terminal", "command": "terminal", "icon": "utilities-terminal"},
             {"name": "Archivos", "command": "file-manager", "icon": "system-file-manager"},
             {"name": "Red", "command": "network-settings", "icon": "network-wired"}
         ])
-        self.launcher_buttons = []
+        buttons = self.launcher_buttons
+        theme = QIcon.themeName()
+        retheme = theme != self._launchers_theme
         for idx, launcher in enumerate(launchers):
-            btn = QPushButton()
-            btn.setIcon(self.app_menu.get_icon(launcher["icon"]))
-            btn.setIconSize(QSize(24, 24))
-            btn.setToolTip(launcher["name"])
-            btn.setFixedSize(38, 38)
-            if idx == 0:
-                self.menu_button = btn  # Guardar referencia al primer botón (Menú)
-            if launcher["name"].lower() == "escritorio":
-                btn.clicked.connect(self.show_workspace_menu)
-            elif launcher["command"] == "terminal":
-                btn.clicked.connect(self.open_terminal)
-            elif launcher["command"] == "file-manager":
-                btn.clicked.connect(self.open_file_manager)
-            elif launcher["command"] or launcher["command"] is not None:
-                btn.clicked.connect(lambda checked, cmd=launcher["command"]: subprocess.Popen(cmd.split()) if cmd else None)
+            if idx < len(self._last_launchers) and self._last_launchers[idx] == launcher:
+                # Mismo lanzador en la misma posición: conservar el botón (con el icono
+                # del tema actual si este cambió)
+                if retheme:
+                    buttons[idx].setIcon(ApplicationMenu.get_icon(launcher["icon"]))
+                continue
+            btn = self._make_launcher_button(launcher)
+            if idx < len(buttons):
+                self.left_layout.replaceWidget(buttons[idx], btn)
+                buttons[idx].deleteLater()
+                buttons[idx] = btn
             else:
-                btn.clicked.connect(self.show_application_menu)
-            self.left_layout.addWidget(btn)
-            self.launcher_buttons.append(btn)
+                self.left_layout.addWidget(btn)
+                buttons.append(btn)
+        # Quitar los que sobran por el final
+        for btn in buttons[len(launchers):]:
+            self.left_layout.removeWidget(btn)
+            btn.deleteLater()
+        del buttons[len(launchers):]
+        if buttons:
+            self.menu_button = buttons[0]  # Guardar referencia al primer botón (Menú)
+        # Copia: el diálogo de configuración puede modificar los dicts en su sitio
+        self._last_launchers = [dict(launcher) for launcher in launchers]
+        self._launchers_theme = theme
+
+    def _make_launcher_button(self, launcher):
+        """Crear el botón de un lanzador del panel"""
+        btn = QPushButton()
+        btn.setIcon(ApplicationMenu.get_icon(launcher["icon"]))
+        btn.setIconSize(_ICON_SIZE_24)
+        btn.setToolTip(launcher["name"])
+        btn.setFixedSize(38, 38)
+        if launcher["name"].lower() == "escritorio":
+            btn.clicked.connect(self.show_workspace_menu)
+        elif launcher["command"] == "terminal":
+            btn.clicked.connect(self.open_terminal)
+        elif launcher["command"] == "file-manager":
+            btn.clicked.connect(self.open_file_manager)
+        elif launcher["command"] or launcher["command"] is not None:
+            btn.setProperty("launch_args", launcher["command"].split())
+            btn.clicked.connect(self._on_launcher_clicked)
+        else:
+            btn.clicked.connect(self.show_application_menu)
+        return btn
+
+    @pyqtSlot()
+    def _on_launcher_clicked(self):
+        """Un único slot para los lanzadores con comando propio (va en la propiedad launch_args)"""
+        args = self.sender().property("launch_args")
+        if args:
+            _spawn(list(args))
 
     def show_workspace_menu(self):
         """Mostrar menú para cambiar o crear escritorios virtuales"""
-        import subprocess
         menu = QMenu(self)
         # Obtener número de escritorios y escritorio actual
         try:
-            num = int(subprocess.check_output(['wmctrl', '-d']).decode().count('\n'))
+            # Una sola llamada: el número y el actual salen de la misma salida
             lines = subprocess.check_output(['wmctrl', '-d']).decode().splitlines()
+            num = len(lines)
             current = next((i for i, l in enumerate(lines) if '*' in l), 0)
         except Exception:
             num = 1
@@ -2129,7 +3458,8 @@ class DesktopPanel(QMainWindow):
                 font = action.font()
                 font.setBold(True)
                 action.setFont(font)
-            action.triggered.connect(lambda checked, idx=i: self.switch_workspace(idx))
+            action.setProperty("workspace_idx", i)
+            action.triggered.connect(self._on_workspace_action)
         menu.addSeparator()
         # Acción para crear un nuevo escritorio
         add_action = menu.addAction("Crear nuevo escritorio")
@@ -2142,15 +3472,17 @@ class DesktopPanel(QMainWindow):
             pos = self.mapToGlobal(self.rect().bottomLeft())
         menu.exec(pos)
 
+    @pyqtSlot()
+    def _on_workspace_action(self):
+        self.switch_workspace(self.sender().property("workspace_idx"))
+
     def switch_workspace(self, idx):
-        import subprocess
         try:
             subprocess.run(['wmctrl', '-s', str(idx)], check=False)
         except Exception:
             pass
 
     def create_new_workspace(self):
-        import subprocess
         try:
             # Obtener número actual de escritorios
             lines = subprocess.check_output(['wmctrl', '-d']).decode().splitlines()
@@ -2165,10 +3497,38 @@ class DesktopPanel(QMainWindow):
     update_clock_signal = pyqtSignal()
     update_system_signal = pyqtSignal(str)
     update_windows_signal = pyqtSignal(list)
+    windows_watcher_stopped = pyqtSignal()  # El hilo de Xlib terminó: volver a wmctrl
     
     def __init__(self):
         super().__init__()
+        # La configuración se escribe en el QThreadPool: un solo pendiente y una escritura a la vez
+        self._settings_lock = threading.Lock()
+        self._settings_write_lock = threading.Lock()
+        self._settings_pending = None
+        self._tray_visible = False  # Con icono en la bandeja, cerrar solo oculta el panel
         self.load_settings()  # <-- Asegura que self.settings exista antes de crear widgets
+        self._bat_path = self._find_battery_path()
+        self._static_battery = None
+        self._battery_cache = None
+        self._battery_dirty = False  # Llegó un evento con una lectura ya en curso
+        self._storage_cache = None
+        self._storage_task = None
+        self._confirm_box = None  # Diálogo de confirmación de sesión, creado al primer uso
+        self._last_clock = None
+        self._windows_task = None
+        self._mounts_stamp = None  # Tabla de montajes vista en la última lectura de lsblk
+        self._bluetooth_task = None
+        self._bluetooth_status = None
+        self._bluetooth_pending_menu = None
+        self._last_storage_sig = None
+        self._last_bt_sig = None
+        self._volume_proc = None
+        self._volume = None
+        self._volume_cache = None
+        self._apply_pending = False
+        self._applied_struts = None
+        self._menu_timers = {}
+        QApplication.instance().applicationStateChanged.connect(self._stop_menu_timers)
         self.setup_window()
         self.create_widgets()
         self.setup_system_tray()
@@ -2177,24 +3537,39 @@ class DesktopPanel(QMainWindow):
         self.connect_signals()
         # Asegura que los struts se apliquen tras mostrar la ventana
         QTimer.singleShot(100, self.apply_position)
+        # Cada comando de los menús cuesta un stat por directorio del PATH: resolverlos
+        # después del primer pintado para no retrasar la aparición del panel
+        QTimer.singleShot(0, self._prewarm_settings_commands)
 
     def showEvent(self, event):
         super().showEvent(event)
         # Reaplicar struts al mostrar el panel
-        self.apply_position()
+        self._request_apply_position()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         # Reaplicar struts al cambiar tamaño
-        self.apply_position()
+        self._request_apply_position()
 
     def moveEvent(self, event):
         super().moveEvent(event)
         # Reaplicar struts al mover el panel
-        self.apply_position()
+        self._request_apply_position()
     
-    def apply_position(self):
-        """Aplicar la posición configurada al panel"""
+    def _request_apply_position(self):
+        """Agrupar en una sola aplicación las peticiones seguidas de show/resize/move"""
+        if self._apply_pending:
+            return
+        self._apply_pending = True
+        QTimer.singleShot(0, self._do_apply_position)
+
+    def _do_apply_position(self):
+        self._apply_pending = False
+        self.apply_position()
+
+    def apply_position(self, window_type=None):
+        """Aplicar la posición configurada al panel. Con 'window_type' también se fija
+        _NET_WM_WINDOW_TYPE, en el mismo lote que los struts"""
         screen = QApplication.primaryScreen().geometry()
         panel_height = self.settings.get('height', 35)
         position = self.settings.get('position', 'top')
@@ -2209,41 +3584,54 @@ class DesktopPanel(QMainWindow):
         
         # Actualizar los struts cuando cambia la posición
         if hasattr(self, 'winId'):
+            win_id = str(int(self.winId()))
+            # Sin cambios de posición, tamaño, pantalla ni ventana nativa: no reescribir los struts
+            key = (position, panel_height, screen.width(), screen.height(), win_id)
+            if key == self._applied_struts and window_type is None:
+                return
             try:
-                import subprocess
                 if position == 'top':
-                    struts = f"0, 0, {panel_height}, 0"
-                    partial_struts = f"0, 0, {panel_height}, 0, 0, 0, 0, 0, 0, {screen.width()}, 0, 0"
+                    struts = [0, 0, panel_height, 0]
+                    partial_struts = [0, 0, panel_height, 0, 0, 0, 0, 0, 0, screen.width(), 0, 0]
                 elif position == 'bottom':
-                    struts = f"0, 0, 0, {panel_height}"
-                    partial_struts = f"0, 0, 0, {panel_height}, 0, 0, 0, 0, 0, {screen.width()}, 0, 0"
+                    struts = [0, 0, 0, panel_height]
+                    partial_struts = [0, 0, 0, panel_height, 0, 0, 0, 0, 0, screen.width(), 0, 0]
                 elif position == 'left':
-                    struts = f"{panel_height}, 0, 0, 0"
-                    partial_struts = f"{panel_height}, 0, 0, 0, 0, {screen.height()}, 0, 0, 0, 0, 0, 0"
+                    struts = [panel_height, 0, 0, 0]
+                    partial_struts = [panel_height, 0, 0, 0, 0, screen.height(), 0, 0, 0, 0, 0, 0]
                 elif position == 'right':
-                    struts = f"0, {panel_height}, 0, 0"
-                    partial_struts = f"0, {panel_height}, 0, 0, 0, {screen.height()}, 0, 0, 0, 0, 0, 0"
-                
-                subprocess.run([
-                    'xprop', '-id', str(int(self.winId())),
-                    '-f', '_NET_WM_STRUT', '32cccc',
-                    '-set', '_NET_WM_STRUT', struts
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                subprocess.run([
-                    'xprop', '-id', str(int(self.winId())),
-                    '-f', '_NET_WM_STRUT_PARTIAL', '32cccccccccccc',
-                    '-set', '_NET_WM_STRUT_PARTIAL', partial_struts
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    struts = [0, panel_height, 0, 0]
+                    partial_struts = [0, panel_height, 0, 0, 0, screen.height(), 0, 0, 0, 0, 0, 0]
+
+                # Todas las propiedades en un solo flush de Xlib; xprop solo si no hay Xlib
+                atoms = {'_NET_WM_WINDOW_TYPE': [window_type]} if window_type else None
+                if not _x_set_properties(int(win_id), {'_NET_WM_STRUT': struts,
+                                                       '_NET_WM_STRUT_PARTIAL': partial_struts},
+                                         atoms):
+                    if window_type:
+                        subprocess.run([
+                            'xprop', '-id', win_id,
+                            '-f', '_NET_WM_WINDOW_TYPE', '32a',
+                            '-set', '_NET_WM_WINDOW_TYPE', window_type
+                        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+                    subprocess.run([
+                        'xprop', '-id', win_id,
+                        '-f', '_NET_WM_STRUT', '32cccc',
+                        '-set', '_NET_WM_STRUT', ', '.join(map(str, struts))
+                    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+                    subprocess.run([
+                        'xprop', '-id', win_id,
+                        '-f', '_NET_WM_STRUT_PARTIAL', '32cccccccccccc',
+                        '-set', '_NET_WM_STRUT_PARTIAL', ', '.join(map(str, partial_struts))
+                    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                self._applied_struts = key
             except Exception as e:
                 print(f"Error actualizando struts: {e}")
 
     def setup_window(self):
         """Configurar ventana principal"""
-        # Obtener geometría de la pantalla
-        screen = QApplication.primaryScreen().geometry()
-        # Configurar tamaño y posición
-        self.apply_position()
         # Propiedades de la ventana
         self.setWindowTitle("Panel de Escritorio")
         self.setWindowFlags(
@@ -2252,79 +3640,12 @@ class DesktopPanel(QMainWindow):
             Qt.WindowType.Tool
         )
         
-        # Configurar como panel/dock y reservar espacio en X11
-        if hasattr(self, 'winId'):
-            try:
-                import subprocess
-                # Configurar como dock
-                subprocess.run([
-                    'xprop', '-id', str(int(self.winId())),
-                    '-f', '_NET_WM_WINDOW_TYPE', '32a',
-                    '-set', '_NET_WM_WINDOW_TYPE', '_NET_WM_WINDOW_TYPE_DOCK'
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                # Configurar struts para reservar espacio
-                panel_height = self.settings.get('height', 35)
-                position = self.settings.get('position', 'top')
-                screen = QApplication.primaryScreen().geometry()
-                
-                if position == 'top':
-                    struts = f"0, 0, {panel_height}, 0"  # left, right, top, bottom
-                elif position == 'bottom':
-                    struts = f"0, 0, 0, {panel_height}"
-                elif position == 'left':
-                    struts = f"{panel_height}, 0, 0, 0"
-                elif position == 'right':
-                    struts = f"0, {panel_height}, 0, 0"
-                
-                subprocess.run([
-                    'xprop', '-id', str(int(self.winId())),
-                    '-f', '_NET_WM_STRUT', '32cccc',
-                    '-set', '_NET_WM_STRUT', struts
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                
-                # Configurar struts parciales (más preciso)
-                if position == 'top':
-                    partial_struts = f"0, 0, {panel_height}, 0, 0, 0, 0, 0, 0, {screen.width()}, 0, 0"
-                elif position == 'bottom':
-                    partial_struts = f"0, 0, 0, {panel_height}, 0, 0, 0, 0, 0, {screen.width()}, 0, 0"
-                elif position == 'left':
-                    partial_struts = f"{panel_height}, 0, 0, 0, 0, {screen.height()}, 0, 0, 0, 0, 0, 0"
-                elif position == 'right':
-                    partial_struts = f"0, {panel_height}, 0, 0, 0, {screen.height()}, 0, 0, 0, 0, 0, 0"
-                
-                subprocess.run([
-                    'xprop', '-id', str(int(self.winId())),
-                    '-f', '_NET_WM_STRUT_PARTIAL', '32cccccccccccc',
-                    '-set', '_NET_WM_STRUT_PARTIAL', partial_struts
-                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            except Exception as e:
-                print(f"Error configurando struts: {e}")
+        # Tamaño y posición, y en X11 el tipo dock y los struts, todo en un único lote.
+        # Se hace tras setWindowFlags, que crea una ventana nativa nueva
+        self.apply_position(window_type='_NET_WM_WINDOW_TYPE_DOCK')
         
-        # Estilo general
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #2e2e2e;
-                border-bottom: 1px solid #555;
-            }
-            QPushButton {
-                background-color: #404040;
-                border: 1px solid #555;
-                color: white;
-                padding: 5px 10px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-            QPushButton:pressed {
-                background-color: #606060;
-            }
-            QLabel {
-                color: white;
-                padding: 5px;
-            }
-        """)
+        # Estilo general (incluye el de los menús desplegables)
+        self.setStyleSheet(_PANEL_QSS)
     
     def create_widgets(self):
         """Crear widgets del panel"""
@@ -2340,8 +3661,11 @@ class DesktopPanel(QMainWindow):
         self.left_layout = QHBoxLayout()
         
 
-    # Crear menú de aplicaciones antes de los lanzadores para poder usar get_icon
-        self.app_menu = ApplicationMenu(self)
+        # El menú de aplicaciones se crea al abrirlo por primera vez
+        self._app_menu = None
+        self.launcher_buttons = []
+        self._last_launchers = []
+        self._launchers_theme = None  # Tema de iconos con el que se crearon los botones
         self.update_panel_launchers()
         
         main_layout.addLayout(self.left_layout)
@@ -2349,6 +3673,10 @@ class DesktopPanel(QMainWindow):
         # === CENTRO - Lista de ventanas ===
         self.windows_layout = QHBoxLayout()
         self.windows_layout.setSpacing(3)
+        # Botones por id de ventana y un único espaciador final, reutilizados en cada refresco
+        self._win_buttons = {}
+        self._win_spacer = QSpacerItem(0, 0, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+        self.windows_layout.addItem(self._win_spacer)
         main_layout.addLayout(self.windows_layout, 1)  # Stretch factor 1
         
         # === LADO DERECHO ===
@@ -2356,12 +3684,12 @@ class DesktopPanel(QMainWindow):
         
         # Monitor del sistema
         self.system_label = QLabel("Sistema: --")
-        self.system_label.setStyleSheet("color: #00ff00; font-family: monospace;")
+        self.system_label.setObjectName("SystemLabel")
         right_layout.addWidget(self.system_label)
         
         # Reloj
         self.clock_label = QLabel("00:00:00")
-        self.clock_label.setStyleSheet("color: white; font-weight: bold; font-family: monospace; font-size: 12px;")
+        self.clock_label.setObjectName("ClockLabel")
         right_layout.addWidget(self.clock_label)
 
         # Indicador de Red
@@ -2369,7 +3697,6 @@ class DesktopPanel(QMainWindow):
         self.network_button.setObjectName("NetworkButton")
         self.network_button.setFixedSize(32, 32)
         self.network_button.setToolTip("Estado de la Red")
-        self.network_button.setStyleSheet("background: transparent; border: none;")
         self.network_button.clicked.connect(self.show_network_menu)
         self.update_network_status()  # Actualizar estado inicial
         right_layout.addWidget(self.network_button)
@@ -2379,7 +3706,6 @@ class DesktopPanel(QMainWindow):
         self.volume_button.setObjectName("VolumeButton")
         self.volume_button.setFixedSize(32, 32)
         self.volume_button.setToolTip("Control de Volumen")
-        self.volume_button.setStyleSheet("background: transparent; border: none;")
         self.volume_button.clicked.connect(self.show_volume_menu)
         self.volume_slider = None  # Se creará cuando se necesite
         self.update_volume_status()  # Actualizar estado inicial
@@ -2390,7 +3716,6 @@ class DesktopPanel(QMainWindow):
         self.battery_button.setObjectName("BatteryButton")
         self.battery_button.setFixedSize(32, 32)
         self.battery_button.setToolTip("Estado de la Batería")
-        self.battery_button.setStyleSheet("background: transparent; border: none;")
         self.battery_button.clicked.connect(self.show_battery_menu)
         self.update_battery_status()  # Actualizar estado inicial
         right_layout.addWidget(self.battery_button)
@@ -2400,7 +3725,6 @@ class DesktopPanel(QMainWindow):
         self.storage_button.setObjectName("StorageButton")
         self.storage_button.setFixedSize(32, 32)
         self.storage_button.setToolTip("Dispositivos de almacenamiento")
-        self.storage_button.setStyleSheet("background: transparent; border: none;")
         self.storage_button.clicked.connect(self.show_storage_menu)
         self.update_storage_status()  # Actualizar estado inicial
         right_layout.addWidget(self.storage_button)
@@ -2410,7 +3734,6 @@ class DesktopPanel(QMainWindow):
         self.bluetooth_button.setObjectName("BluetoothButton")
         self.bluetooth_button.setFixedSize(32, 32)
         self.bluetooth_button.setToolTip("Bluetooth")
-        self.bluetooth_button.setStyleSheet("background: transparent; border: none;")
         self.bluetooth_button.clicked.connect(self.show_bluetooth_menu)
         self.update_bluetooth_status()  # Actualizar estado inicial
         right_layout.addWidget(self.bluetooth_button)
@@ -2419,42 +3742,14 @@ class DesktopPanel(QMainWindow):
         self.notification_button = QPushButton()
         self.notification_button.setObjectName("NotificationButton")
         self.notification_button.setFixedSize(32, 32)
-        bell_icon = QIcon.fromTheme("preferences-desktop-notification")
+        bell_icon = _themed_icon("preferences-desktop-notification")
         if bell_icon.isNull():
             # Si no hay ícono del tema, usar emoji
             self.notification_button.setText("🔔")
-            self.notification_button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    font-size: 16px;
-                    padding: 4px;
-                }
-                QPushButton:hover {
-                    background: rgba(255, 255, 255, 0.1);
-                    border-radius: 4px;
-                }
-                QPushButton:pressed {
-                    background: rgba(255, 255, 255, 0.2);
-                }
-            """)
+            self.notification_button.setProperty("emoji", True)
         else:
             self.notification_button.setIcon(bell_icon)
-            self.notification_button.setIconSize(QSize(22, 22))
-            self.notification_button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    padding: 4px;
-                }
-                QPushButton:hover {
-                    background: rgba(255, 255, 255, 0.1);
-                    border-radius: 4px;
-                }
-                QPushButton:pressed {
-                    background: rgba(255, 255, 255, 0.2);
-                }
-            """)
+            self.notification_button.setIconSize(_ICON_SIZE_22)
         self.notification_button.setToolTip("Centro de Notificaciones")
         self.notification_button.clicked.connect(self.show_notifications_menu)
         right_layout.addWidget(self.notification_button)
@@ -2473,9 +3768,6 @@ class DesktopPanel(QMainWindow):
         right_layout.addWidget(self.user_button)
         
         main_layout.addLayout(right_layout)
-        
-        # Crear menú de aplicaciones
-        self.app_menu = ApplicationMenu(self)
 
     def show_user_menu(self):
         menu = QMenu(self)
@@ -2495,162 +3787,170 @@ class DesktopPanel(QMainWindow):
 
         menu.exec(self.user_button.mapToGlobal(self.user_button.rect().bottomLeft()))
 
+    # Comandos de sesión en orden de preferencia (se resuelven en el PATH una sola vez)
+    _SUSPEND_CMDS = (("systemctl", "suspend"), ("pm-suspend",))
+    _REBOOT_CMDS = (("systemctl", "reboot"), ("reboot",))
+    _SHUTDOWN_CMDS = (("systemctl", "poweroff"), ("shutdown", "-h", "now"), ("poweroff",))
+    _LOCK_CMDS = (
+        ("xdg-screensaver", "lock"),
+        ("dm-tool", "lock"),
+        ("gnome-screensaver-command", "-l"),
+        ("loginctl", "lock-session"),
+    )
+    _SWITCH_USER_CMDS = (
+        ("dm-tool", "switch-to-greeter"),
+        ("gdmflexiserver",),
+        ("lightdm", "--switch-to-greeter"),
+    )
+    _LOGOUT_CMDS = (
+        ("xfce4-session-logout", "--logout"),
+        ("gnome-session-quit", "--logout", "--no-prompt"),
+        ("openbox", "--exit"),
+        ("pkill", "-KILL", "-u", os.environ.get("USER", "")),
+    )
+    _TERMINAL_CMDS = tuple((t,) for t in ApplicationMenu.TERMINALS)
+    _FILE_MANAGER_CMDS = (("thunar",), ("nautilus",), ("dolphin",), ("pcmanfm",), ("nemo",))
+
+    # Herramientas de configuración por entorno de escritorio, en orden de preferencia
+    _BLUETOOTH_SETTINGS_CMDS = (
+        ("gnome-control-center", "bluetooth"),  # GNOME
+        ("systemsettings5", "kcm_bluetooth"),  # KDE
+        ("blueman-manager",),  # Blueman
+        ("blueberry",),  # Cinnamon/MATE
+        ("xfce4-settings-manager", "--dialog=bluetooth"),  # XFCE
+    )
+    _POWER_SETTINGS_CMDS = (
+        ("gnome-control-center", "power"),  # GNOME
+        ("systemsettings5", "kcm_powerdevilprofilesconfig"),  # KDE
+        ("xfce4-power-manager-settings",),  # XFCE
+        ("mate-power-preferences",),  # MATE
+        ("cinnamon-settings", "power"),  # Cinnamon
+    )
+    _SOUND_SETTINGS_CMDS = (
+        ("pavucontrol",),  # PulseAudio Volume Control
+        ("gnome-control-center", "sound"),  # GNOME
+        ("systemsettings5", "kcm_pulseaudio"),  # KDE
+        ("xfce4-audio-settings",),  # XFCE
+    )
+
+    def _confirm(self, text, commands):
+        """Preguntar con el diálogo de confirmación (se crea una sola vez) y, si se acepta,
+        lanzar el primero de 'commands' que esté instalado"""
+        box = self._confirm_box
+        if box is None:
+            box = self._confirm_box = QMessageBox(self)
+            box.setObjectName("ConfirmBox")
+            box.setIcon(QMessageBox.Question)
+            box.setWindowTitle("Confirmar")
+            box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
+            box.button(QMessageBox.Yes).setText("Aceptar")
+            box.button(QMessageBox.Cancel).setText("Cancelar")
+        box.setText(text)
+        if box.exec() == QMessageBox.Yes:
+            self._launch_first_available(commands)
+
     def suspend_system(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea suspender el equipo?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["systemctl suspend", "pm-suspend"]:
-                try:
-                    subprocess.Popen(cmd.split())
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea suspender el equipo?", self._SUSPEND_CMDS)
 
     def reboot_system(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea reiniciar el equipo?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["systemctl reboot", "reboot"]:
-                try:
-                    subprocess.Popen(cmd.split())
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea reiniciar el equipo?", self._REBOOT_CMDS)
 
     def shutdown_system(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea apagar el equipo?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["systemctl poweroff", "shutdown -h now", "poweroff"]:
-                try:
-                    subprocess.Popen(cmd.split())
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea apagar el equipo?", self._SHUTDOWN_CMDS)
 
     def lock_screen(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea bloquear la pantalla?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["xdg-screensaver lock", "dm-tool lock", "gnome-screensaver-command -l", "loginctl lock-session"]:
-                try:
-                    subprocess.Popen(cmd.split())
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea bloquear la pantalla?", self._LOCK_CMDS)
 
     def switch_user(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea cambiar de usuario?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["dm-tool switch-to-greeter", "gdmflexiserver", "lightdm --switch-to-greeter"]:
-                try:
-                    subprocess.Popen(cmd.split())
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea cambiar de usuario?", self._SWITCH_USER_CMDS)
 
     def logout_session(self):
-        box = QMessageBox(self)
-        box.setIcon(QMessageBox.Question)
-        box.setWindowTitle("Confirmar")
-        box.setText("¿Desea cerrar la sesión?")
-        box.setStandardButtons(QMessageBox.Yes | QMessageBox.Cancel)
-        box.button(QMessageBox.Yes).setText("Aceptar")
-        box.button(QMessageBox.Cancel).setText("Cancelar")
-        box.setStyleSheet("QLabel{color:#111;} QPushButton{background:white; color:#111; border:1px solid #bbb; border-radius:4px; padding:4px 16px;} QPushButton:hover{background:#f0f0f0;}")
-        reply = box.exec()
-        if reply == QMessageBox.Yes:
-            for cmd in ["xfce4-session-logout --logout", "gnome-session-quit --logout --no-prompt", "openbox --exit", "pkill -KILL -u $USER"]:
-                try:
-                    subprocess.Popen(cmd.split(), shell=False)
-                    break
-                except Exception:
-                    continue
+        self._confirm("¿Desea cerrar la sesión?", self._LOGOUT_CMDS)
     
     def setup_system_tray(self):
         """Configurar bandeja del sistema"""
         if QSystemTrayIcon.isSystemTrayAvailable():
             self.tray = SystemTray(self)
             self.tray.show()
+            self._tray_visible = True
     
     def setup_timers(self):
         """Configurar timers para actualizaciones"""
-        # Timer para el reloj (cada segundo)
+        # Un único timer de 1 s para todo el panel: reloj, SystemState y los sondeos de
+        # respaldo, que se reparten por múltiplos del tick ({nombre: [cada N ticks, slot]})
+        self._tick = 0
+        self._tick_jobs = {
+            'storage': [2, self.update_storage_status],
+            'bluetooth': [2, self.update_bluetooth_status],
+            'windows': [0, self.update_windows_threaded],  # 0 = desactivado
+        }
         self.clock_timer = QTimer()
-        self.clock_timer.timeout.connect(self.update_clock)
+        self.clock_timer.timeout.connect(self._on_tick)
         self.clock_timer.start(1000)
         
-        # Timer para información del sistema (cada 2 segundos)
-        self.system_timer = QTimer()
-        self.system_timer.timeout.connect(self.update_system_info_threaded)
-        self.system_timer.start(2000)
-
-        # Timer para el estado de la red (cada 5 segundos)
-        self.network_timer = QTimer()
-        self.network_timer.timeout.connect(self.update_network_status)
-        self.network_timer.start(5000)
-
-        # Timer para el estado del volumen (cada segundo)
-        self.volume_timer = QTimer()
-        self.volume_timer.timeout.connect(self.update_volume_status)
-        self.volume_timer.start(1000)
-
-        # Timer para el estado de la batería (cada 5 segundos)
-        self.battery_timer = QTimer()
-        self.battery_timer.timeout.connect(self.update_battery_status)
-        self.battery_timer.start(5000)
-
-        # Timer para el estado de dispositivos de almacenamiento (cada 2 segundos)
-        self.storage_timer = QTimer()
-        self.storage_timer.timeout.connect(self.update_storage_status)
-        self.storage_timer.start(2000)
-
-        # Timer para el estado del Bluetooth (cada 2 segundos)
-        self.bluetooth_timer = QTimer()
-        self.bluetooth_timer.timeout.connect(self.update_bluetooth_status)
-        self.bluetooth_timer.start(2000)
-        
-        # Timer para lista de ventanas (cada 3 segundos)
-        self.windows_timer = QTimer()
-        self.windows_timer.timeout.connect(self.update_windows_threaded)
-        self.windows_timer.start(3000)
+        # Información del sistema: un único hilo permanente que mide cada 2 s
+        self._sys_cache = {'text': 'Sistema: --'}
+        self._sys_stop = threading.Event()
+        threading.Thread(target=self._system_info_loop, daemon=True).start()
+
+        # Volumen (cada tick), batería y red (cada 5) en una sola lectura por tick,
+        # hecha en el QThreadPool
+        self.system_state = SystemState(self)
+        self.system_state.stateChanged.connect(self.on_system_state)
+        self.start_volume_monitor()
+
+        # Los eventos de udev/UDisks2 llegan en ráfagas: se agrupan en un solo refresco
+        self._storage_refresh_timer = QTimer(self)
+        self._storage_refresh_timer.setSingleShot(True)
+        self._storage_refresh_timer.setInterval(150)
+        self._storage_refresh_timer.timeout.connect(self.update_storage_status)
+
+        # Lista de ventanas: PropertyNotify de _NET_CLIENT_LIST; wmctrl cada 3 s si no hay Xlib
+        if not self.start_windows_watcher():
+            self._tick_jobs['windows'][0] = 3
+
+        # Con señales D-Bus los sondeos anteriores quedan solo como respaldo
+        self.system_events = SystemEvents(self)
+        fallback = SystemEvents.FALLBACK_INTERVAL // 1000
+        if self.system_events.battery:
+            # UPower avisa de cada cambio: sin sondeo de batería en reposo
+            self.system_events.batteryChanged.connect(self.on_battery_event)
+            self.system_state.battery_every = 0
+        if self.system_events.storage:
+            self.system_events.storageChanged.connect(self.on_storage_event)
+            self._tick_jobs['storage'][0] = fallback
+        if self.system_events.bluetooth:
+            self.system_events.bluetoothChanged.connect(self.update_bluetooth_status)
+            self._tick_jobs['bluetooth'][0] = fallback
+
+    def _on_tick(self):
+        """Tick de 1 s: reloj, lectura de SystemState y sondeos que tocan en este tick"""
+        self.update_clock()
+        self.system_state.refresh()
+        self._tick += 1
+        for every, slot in self._tick_jobs.values():
+            if every and self._tick % every == 0:
+                slot()
+
+    def on_storage_event(self):
+        """UDisks2 avisó de un cambio (disco o montaje): descartar el caché y volver a leer"""
+        self._storage_cache = None
+        self._storage_refresh_timer.start()  # Reiniciarlo agrupa los eventos seguidos
+
+    def on_battery_event(self):
+        """UPower avisó de un cambio: descartar el caché y volver a leer"""
+        self._battery_cache = None
+        self.update_battery_status()
     
+    def on_system_state(self, state):
+        """Repartir el estado leído por SystemState a los indicadores"""
+        if 'volume' in state:
+            self.apply_volume_info(*state['volume'])
+        if 'battery' in state:
+            self.apply_battery_info(state['battery'])
+        if 'network' in state:
+            self.apply_network_status(state['network'])
+
     def connect_signals(self):
         """Conectar señales personalizadas"""
         self.update_clock_signal.connect(self.update_clock)
@@ -2664,138 +3964,289 @@ class DesktopPanel(QMainWindow):
             "auto_hide": False,
             "position": "top",
             "height": 35,
-            "show_system_info": True
+            "show_system_info": True,
+            "show_seconds": True
         }
         
+        self._saved_settings_blob = None  # Último contenido escrito (o leído) del archivo
         try:
             if self.settings_file.exists():
                 with open(self.settings_file, 'r') as f:
                     saved_settings = json.load(f)
                     self.settings.update(saved_settings)
+                self._saved_settings_blob = json.dumps(self.settings, indent=2)
         except Exception as e:
             print(f"Error cargando configuración: {e}")
+        self.update_settings_state()
+
+    def update_settings_state(self):
+        """Recalcular los valores derivados de self.settings que se consultan a menudo"""
+        # La posición se consulta en cada apertura de menú: guardarla aparte
+        self.panel_position = self.settings.get('position', 'top')
+        # Igual el formato del reloj, que se consulta en cada tick
+        self._clock_format = "%H:%M:%S" if self.settings.get('show_seconds', True) else "%H:%M"
     
-    def save_settings(self):
-        """Guardar configuración"""
-        try:
-            self.settings_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
-        except Exception as e:
-            print(f"Error guardando configuración: {e}")
+    def save_settings(self, wait=False):
+        """Guardar configuración si cambió desde la última escritura. Se serializa aquí y se
+        escribe en el QThreadPool; con wait=True (al salir) se escribe en este hilo"""
+        blob = json.dumps(self.settings, indent=2)
+        with self._settings_lock:
+            changed = blob != self._saved_settings_blob
+            if changed:
+                self._saved_settings_blob = blob
+                queued = self._settings_pending is not None
+                self._settings_pending = blob  # Guardados seguidos: solo se escribe el último
+        if wait:
+            # Aunque no haya cambios: una escritura de este mismo contenido puede seguir en
+            # la cola del QThreadPool, que no sobrevive a la salida del intérprete
+            self._write_pending_settings()
+        elif changed and not queued:
+            QThreadPool.globalInstance().start(_Task(self._write_pending_settings))
+
+    def _write_pending_settings(self):
+        """Escribir de forma atómica la última configuración pendiente (cualquier hilo)"""
+        with self._settings_write_lock:
+            with self._settings_lock:
+                blob, self._settings_pending = self._settings_pending, None
+            if blob is None:
+                return  # Otra escritura ya se llevó este contenido
+            try:
+                self.settings_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.settings_file.with_suffix(".json.tmp")
+                with open(tmp_path, 'w') as f:
+                    f.write(blob)
+                os.replace(tmp_path, self.settings_file)
+            except Exception as e:
+                with self._settings_lock:
+                    self._saved_settings_blob = None  # Reintentar en el próximo guardado
+                print(f"Error guardando configuración: {e}")
     
     def update_clock(self):
-        """Actualizar reloj"""
-        current_time = datetime.datetime.now().strftime("%H:%M:%S")
+        """Actualizar reloj (sin segundos, el texto solo cambia una vez por minuto)"""
+        current_time = datetime.datetime.now().strftime(self._clock_format)
+        if current_time == self._last_clock:
+            return  # Mismo texto: evitar el repintado y el recálculo del QLabel
+        self._last_clock = current_time
         self.clock_label.setText(current_time)
     
-    def update_system_info_threaded(self):
-        """Actualizar información del sistema en hilo separado"""
-        def worker():
-            if PSUTIL_AVAILABLE:
-                try:
-                    cpu_percent = psutil.cpu_percent(interval=0.1)
-                    memory = psutil.virtual_memory()
-                    ram_percent = memory.percent
-                    
-                    system_text = f"CPU: {cpu_percent:.0f}% | RAM: {ram_percent:.0f}%"
-                    self.update_system_signal.emit(system_text)
-                except Exception:
-                    self.update_system_signal.emit("Sistema: Error")
-            else:
-                self.update_system_signal.emit("Sistema: N/A")
-        
-        threading.Thread(target=worker, daemon=True).start()
+    @staticmethod
+    def _read_cpu_times():
+        """(inactivo, total) en ticks desde la línea agregada de /proc/stat: coste fijo sin
+        importar cuántos núcleos haya. None si no se puede leer"""
+        try:
+            with open('/proc/stat', 'rb') as f:
+                # cpu user nice system idle iowait irq softirq steal
+                fields = [int(v) for v in f.readline().split()[1:9]]
+        except (OSError, ValueError):
+            return None
+        return fields[3] + fields[4], sum(fields)
+
+    def _cpu_percent(self, prev):
+        """Uso de CPU desde la muestra 'prev'; devuelve (porcentaje, nueva muestra).
+        Sin /proc/stat se recurre a psutil"""
+        sample = self._read_cpu_times()
+        if sample is None or prev is None:
+            return psutil.cpu_percent(interval=None), sample
+        idle, total = sample[0] - prev[0], sample[1] - prev[1]
+        return (100.0 * (1 - idle / total) if total > 0 else 0.0), sample
+
+    def _system_info_loop(self):
+        """Hilo de fondo: medir CPU y RAM cada 2 s y publicar el texto cacheado"""
+        if not PSUTIL_AVAILABLE:
+            self._sys_cache['text'] = "Sistema: N/A"
+            self.update_system_signal.emit(self._sys_cache['text'])
+            return
+        stop = self._sys_stop
+        # Primera muestra: fija el punto de partida (psutil solo si falta /proc/stat)
+        sample = self._read_cpu_times()
+        if sample is None:
+            with contextlib.suppress(Exception):
+                psutil.cpu_percent(interval=None)
+        # El ritmo lo marca la espera; cada lectura mide desde la anterior
+        while not stop.wait(2.0):
+            try:
+                cpu, sample = self._cpu_percent(sample)
+                mem = psutil.virtual_memory().percent
+                self._sys_cache['text'] = f"CPU: {cpu:.0f}% | RAM: {mem:.0f}%"
+            except Exception:
+                self._sys_cache['text'] = "Sistema: Error"
+            if not stop.is_set():
+                self.update_system_signal.emit(self._sys_cache['text'])
     
     def update_system_info_display(self, text):
         """Actualizar display de información del sistema"""
         self.system_label.setText(text)
     
-    def update_windows_threaded(self):
-        """Actualizar lista de ventanas en hilo separado"""
-        def worker():
+    def start_windows_watcher(self):
+        """Escuchar los cambios de _NET_CLIENT_LIST en un hilo con su propia conexión X.
+        Devuelve False si no hay Xlib o el gestor de ventanas no publica la lista"""
+        if not XLIB_AVAILABLE:
+            return False
+        try:
+            # Conexión aparte: next_event() bloquea y la compartida se usa desde la GUI
+            disp = xdisplay.Display()
+            root = disp.screen().root
+            if root.get_full_property(disp.intern_atom('_NET_CLIENT_LIST'), Xatom.WINDOW) is None:
+                disp.close()
+                return False
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+        except Exception as e:
+            print(f"No se pudo vigilar la lista de ventanas: {e}")
+            return False
+        # Conectada antes de arrancar el hilo: un fallo temprano no se pierde
+        self.windows_watcher_stopped.connect(self._on_windows_watcher_stopped)
+        threading.Thread(target=self._windows_event_loop, args=(disp,), daemon=True).start()
+        return True
+
+    def _on_windows_watcher_stopped(self):
+        """Sin hilo de Xlib la lista de ventanas vuelve al sondeo con wmctrl"""
+        self._tick_jobs['windows'][0] = 3
+        self.update_windows_threaded()
+
+    def _windows_event_loop(self, disp):
+        """Hilo de fondo: releer la lista solo cuando cambia la lista o el título de una ventana"""
+        root = disp.screen().root
+        client_list = disp.intern_atom('_NET_CLIENT_LIST')
+        titles = {disp.intern_atom('_NET_WM_NAME'), Xatom.WM_NAME}
+        watched = set()
+        last = None
+        while True:
             try:
-                result = subprocess.run(['wmctrl', '-l'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    windows = []
-                    lines = result.stdout.strip().split('\n')
-                    for line in lines:
-                        if line.strip():
-                            parts = line.split(None, 3)
-                            if len(parts) >= 4:
-                                window_id = parts[0]
-                                window_title = parts[3]
-                                # Filtrar ventanas del propio panel
-                                if "Panel de Escritorio" not in window_title:
-                                    windows.append((window_id, window_title))
-                    
+                # Filtrar ventanas sin título (como wmctrl) y las del propio panel
+                windows = [(window_id, title) for window_id, title in _x_client_list(disp, watched)
+                           if title and "Panel de Escritorio" not in title]
+                if windows != last:
+                    last = windows
                     self.update_windows_signal.emit(windows)
-            except Exception:
-                self.update_windows_signal.emit([])
-        
-        threading.Thread(target=worker, daemon=True).start()
+                while True:
+                    ev = disp.next_event()
+                    if ev.type != X.PropertyNotify:
+                        continue
+                    if (ev.window == root and ev.atom == client_list) or ev.atom in titles:
+                        break
+                # Los eventos ya en cola se atienden con la misma lectura
+                while disp.pending_events():
+                    disp.next_event()
+            except xerror.XError as e:
+                # Error de protocolo (p. ej. BadWindow de una ventana recién cerrada):
+                # la conexión sigue viva, se vuelve a leer la lista
+                print(f"Error leyendo la lista de ventanas: {e}")
+            except Exception as e:
+                print(f"Error vigilando la lista de ventanas, se usará wmctrl: {e}")
+                with contextlib.suppress(Exception):
+                    disp.close()
+                self.windows_watcher_stopped.emit()
+                return
+
+    def update_windows_threaded(self):
+        """Actualizar lista de ventanas con wmctrl en el QThreadPool (hilos reutilizados)"""
+        if self._windows_task is not None:
+            return  # La lectura anterior todavía no ha terminado
+        self._windows_task = _Task(self._read_wmctrl_windows)
+        self._windows_task.done.connect(self._on_windows_read)
+        QThreadPool.globalInstance().start(self._windows_task)
+
+    @staticmethod
+    def _read_wmctrl_windows():
+        """[(id, título)] según wmctrl -l; None si wmctrl falla. No tocar widgets aquí"""
+        try:
+            result = subprocess.run(['wmctrl', '-l'],
+                                    capture_output=True, text=True, timeout=5)
+        except Exception:
+            return []
+        if result.returncode != 0:
+            return None
+        # Una sola pasada de la regex sobre toda la salida; filtrar ventanas del propio panel
+        return [(window_id, window_title)
+                for window_id, window_title in _WMCTRL_RE.findall(result.stdout)
+                if "Panel de Escritorio" not in window_title]
+
+    def _on_windows_read(self, windows):
+        self._windows_task = None
+        if windows is not None:
+            self.update_windows_display(windows)
     
     def update_windows_display(self, windows):
-        """Actualizar display de ventanas"""
-        # Limpiar botones existentes
-        for i in reversed(range(self.windows_layout.count())):
-            child = self.windows_layout.takeAt(i)
-            if child.widget():
-                child.widget().deleteLater()
-        
-        # Crear nuevos botones para las ventanas
-        for window_id, window_title in windows[:8]:  # Máximo 8 ventanas
-            window_btn = WindowButton(window_id, window_title)
-            self.windows_layout.addWidget(window_btn)
-        
-        # Añadir espaciador si hay pocas ventanas
-        if len(windows) < 8:
-            spacer = QSpacerItem(0, 0, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-            self.windows_layout.addItem(spacer)
+        """Actualizar display de ventanas: solo se crean, quitan o retitulan las que cambiaron"""
+        windows = windows[:8]  # Máximo 8 ventanas
+        layout = self.windows_layout
+        buttons = self._win_buttons
+
+        # Quitar los botones de ventanas que ya no existen
+        new_ids = {window_id for window_id, _ in windows}
+        for window_id in [window_id for window_id in buttons if window_id not in new_ids]:
+            button = buttons.pop(window_id)
+            layout.removeWidget(button)
+            button.deleteLater()
+
+        # Crear los nuevos y mantener el orden de la lista; el espaciador queda al final
+        for i, (window_id, window_title) in enumerate(windows):
+            button = buttons.get(window_id)
+            if button is None:
+                button = buttons[window_id] = WindowButton(window_id, window_title)
+                layout.insertWidget(i, button)
+                continue
+            if button.window_title != window_title:
+                button.window_title = window_title
+                button.setToolTip(window_title)
+            if layout.indexOf(button) != i:
+                layout.removeWidget(button)
+                layout.insertWidget(i, button)
+
+        # El espaciador solo empuja los botones a la izquierda si hay pocas ventanas
+        policy = QSizePolicy.Policy.Expanding if len(windows) < 8 else QSizePolicy.Policy.Minimum
+        if self._win_spacer.sizePolicy().horizontalPolicy() != policy:
+            self._win_spacer.changeSize(0, 0, policy, QSizePolicy.Policy.Minimum)
+            layout.invalidate()
     
+    def _get_app_menu(self):
+        """Devolver el menú de aplicaciones, creándolo en el primer uso"""
+        if self._app_menu is None:
+            self._app_menu = ApplicationMenu(self)
+        return self._app_menu
+
+    def menu_theme(self):
+        """Tema del menú de aplicaciones, sin crear el menú si todavía no se abrió"""
+        if self._app_menu is not None:
+            return self._app_menu.theme
+        return ApplicationMenu._load_settings().get("theme", "claro")
+
+    def set_menu_theme(self, theme_name):
+        """Cambiar el tema del menú; si aún no existe solo se guarda"""
+        if self._app_menu is not None:
+            self._app_menu.set_theme(theme_name)
+        else:
+            ApplicationMenu.store_theme(theme_name)
+
     def show_application_menu(self):
         """Mostrar menú de aplicaciones ajustando la dirección según la posición del panel"""
-        position = self.settings.get('position', 'top')
-        btn_rect = self.menu_button.rect()
-        if position == 'top':
-            # Menú hacia abajo
-            pos = self.menu_button.mapToGlobal(btn_rect.bottomLeft())
-        elif position == 'bottom':
+        app_menu = self._get_app_menu()
+        position = self.panel_position
+        # Un solo mapToGlobal; a diferencia de los QMenu, este se pega al borde del botón
+        origin = self.menu_button.mapToGlobal(QPoint(0, 0))
+        x, y = origin.x(), origin.y()
+        if position == 'bottom':
             # Menú hacia arriba
-            pos = self.menu_button.mapToGlobal(btn_rect.topLeft())
-            pos.setY(pos.y() - self.app_menu.height())
+            pos = QPoint(x, y - app_menu.height())
         elif position == 'left':
             # Menú hacia la derecha
-            pos = self.menu_button.mapToGlobal(btn_rect.topRight())
+            pos = QPoint(x + self.menu_button.width() - 1, y)
         elif position == 'right':
             # Menú hacia la izquierda
-            pos = self.menu_button.mapToGlobal(btn_rect.topLeft())
-            pos.setX(pos.x() - self.app_menu.width())
+            pos = QPoint(x - app_menu.width(), y)
         else:
-            pos = self.menu_button.mapToGlobal(btn_rect.bottomLeft())
-        self.app_menu.move(pos)
-        self.app_menu.show()
+            # Menú hacia abajo
+            pos = QPoint(x, y + self.menu_button.height() - 1)
+        app_menu.move(pos)
+        app_menu.show()
     
     def open_terminal(self):
         """Abrir terminal"""
-        terminals = ['xfce4-terminal', 'gnome-terminal', 'konsole', 'xterm', 'alacritty']
-        for terminal in terminals:
-            try:
-                subprocess.Popen([terminal])
-                break
-            except FileNotFoundError:
-                continue
+        self._launch_first_available(self._TERMINAL_CMDS)
     
     def open_file_manager(self):
         """Abrir gestor de archivos"""
-        file_managers = ['thunar', 'nautilus', 'dolphin', 'pcmanfm', 'nemo']
-        for fm in file_managers:
-            try:
-                subprocess.Popen([fm])
-                break
-            except FileNotFoundError:
-                continue
+        self._launch_first_available(self._FILE_MANAGER_CMDS)
     
     def show_settings(self):
         """Mostrar ventana de configuración"""
@@ -2804,11 +4255,15 @@ class DesktopPanel(QMainWindow):
 
     def setup_notifications(self):
         """Configurar el servicio de notificaciones"""
-        self.notifications = []  # Inicializar lista de notificaciones
+        # Últimas 50 notificaciones, la más reciente primero; la cola descarta las viejas sola
+        self.notifications = collections.deque(maxlen=50)
+        self.notification_menu = None  # Se crea al abrirlo por primera vez
+        self._notif_rows = []  # Filas reutilizables del menú
         
         # Crear una notificación de prueba inicial
+        # Id 0: fuera de los que reparte NotificationServer (desde 1), nunca se confunde
         test_notification = NotificationItem(
-            1,
+            0,
             "Panel Qt",
             "dialog-information",
             "Sistema de notificaciones",
@@ -2817,6 +4272,16 @@ class DesktopPanel(QMainWindow):
         self.notifications.append(test_notification)
         self.update_notification_button()
 
+        # Si ningún demonio tiene org.freedesktop.Notifications, el panel recibe las
+        # llamadas Notify directamente por QtDBus
+        self.notification_server = NotificationServer.register(self) if QTDBUS_AVAILABLE else None
+        if self.notification_server is not None:
+            events = self.notification_server.events
+            events.notificationReceived.connect(self.on_notification_received)
+            events.closeRequested.connect(self.on_notification_close_requested)
+            print("Servicio de notificaciones iniciado correctamente")
+            return
+
         if not NOTIFY2_AVAILABLE:
             print("Notify2 no está disponible, las notificaciones no funcionarán")
             return
@@ -2833,10 +4298,10 @@ class DesktopPanel(QMainWindow):
             print(f"Error al configurar notificaciones: {e}")
     
     def start_notification_monitor(self):
-        """Iniciar el monitor de notificaciones en un hilo separado"""
+        """Iniciar el monitor de notificaciones en un hilo separado (otro demonio tiene el
+        servicio: Notify es una llamada a método y solo dbus-monitor puede observarla)"""
         def monitor():
             try:
-                import subprocess
                 proc = subprocess.Popen(['dbus-monitor', 'interface=org.freedesktop.Notifications'],
                                       stdout=subprocess.PIPE, universal_newlines=True)
                 for line in proc.stdout:
@@ -2847,120 +4312,104 @@ class DesktopPanel(QMainWindow):
         
         threading.Thread(target=monitor, daemon=True).start()
             
-    def on_notification_received(self, *args):
-        """Callback cuando se recibe una notificación"""
+    def on_notification_received(self, notification=None, replaces=False):
+        """Callback cuando se recibe una notificación (con su contenido si viene de
+        NotificationServer; genérica si solo se observó con dbus-monitor)"""
         try:
             print("Notificación recibida")  # Debug
-            notification = NotificationItem(
-                len(self.notifications) + 1,
-                "Sistema",
-                "dialog-information",
-                "Nueva notificación",
-                "Se ha recibido una nueva notificación"
-            )
+            if notification is None:
+                notification = NotificationItem(
+                    len(self.notifications) + 1,
+                    "Sistema",
+                    "dialog-information",
+                    "Nueva notificación",
+                    "Se ha recibido una nueva notificación"
+                )
+            elif replaces:
+                # replaces_id: la nueva sustituye a la anterior con el mismo id
+                for i, old in enumerate(self.notifications):
+                    if old.id == notification.id:
+                        del self.notifications[i]
+                        break
             self.add_notification(notification)
             print(f"Notificación agregada. Total: {len(self.notifications)}")  # Debug
         except Exception as e:
             print(f"Error al procesar notificación: {e}")
 
-    def remove_notification(self, index):
-        """Eliminar una notificación específica"""
-        try:
-            if 0 <= index < len(self.notifications):
-                del self.notifications[index]
-                self.update_notification_button()
-                # Refrescar el menú de notificaciones
-                if hasattr(self, 'notification_menu'):
-                    self.notification_menu.close()
-                    self.show_notifications_menu()
-        except Exception as e:
-            print(f"Error al eliminar notificación: {e}")
-
-    def clear_all_notifications(self):
-        """Limpiar todas las notificaciones"""
-        try:
-            self.notifications.clear()
-            self.update_notification_button()
-            # Refrescar el menú de notificaciones
-            if hasattr(self, 'notification_menu'):
-                self.notification_menu.close()
-                self.show_notifications_menu()
-        except Exception as e:
-            print(f"Error al limpiar notificaciones: {e}")
-
     def add_notification(self, notification):
         """Agregar una nueva notificación"""
-        self.notifications.insert(0, notification)  # Agregar al principio
-        # Mantener solo las últimas 50 notificaciones
-        if len(self.notifications) > 50:
-            self.notifications.pop()
+        self.notifications.appendleft(notification)  # Al principio; maxlen quita la más vieja
         # Actualizar el contador y el ícono
         self.update_notification_button()
 
     def update_notification_button(self):
         """Actualizar el botón de notificaciones"""
         count = len(self.notifications)
-        if count > 0:
-            self.notification_button.setText(f"🔔 {count}")
-            self.notification_button.setStyleSheet("""
-                QPushButton {
-                    background: rgba(255, 255, 255, 0.1);
-                    border: none;
-                    border-radius: 4px;
-                    padding: 4px;
-                    color: white;
-                }
-                QPushButton:hover {
-                    background: rgba(255, 255, 255, 0.2);
-                }
-            """)
-        else:
-            self.notification_button.setText("🔔")
-            self.notification_button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    padding: 4px;
-                }
-                QPushButton:hover {
-                    background: rgba(255, 255, 255, 0.1);
-                    border-radius: 4px;
-                }
-            """)
+        unread = count > 0
+        button = self.notification_button
+        button.setText(f"🔔 {count}" if unread else "🔔")
+        if button.property("unread") != unread:
+            # El estilo está en _PANEL_QSS: basta con cambiar la propiedad y repulir
+            button.setProperty("unread", unread)
+            button.style().unpolish(button)
+            button.style().polish(button)
+
+    def _notify_closed(self, notification, reason):
+        """Avisar a la aplicación de que su notificación se cerró (2 = por el usuario)"""
+        if self.notification_server is not None and notification.id:
+            self.notification_server.NotificationClosed.emit(notification.id, reason)
+
+    def _drop_notification(self, index):
+        """Quitar la notificación 'index' de la lista, del contador y del menú si está abierto"""
+        notification = self.notifications[index]
+        del self.notifications[index]
+        self.update_notification_button()
+        # Con el menú abierto solo se retira esa fila
+        if self.notification_menu is not None and self.notification_menu.isVisible():
+            self._remove_notification_row(index)
+        return notification
 
     def remove_notification(self, index):
         """Eliminar una notificación específica"""
         try:
             if 0 <= index < len(self.notifications):
-                del self.notifications[index]
-                self.update_notification_button()
-                # Refrescar el menú de notificaciones
-                if hasattr(self, 'notification_menu'):
-                    self.notification_menu.close()
-                    self.show_notifications_menu()
+                self._notify_closed(self._drop_notification(index), 2)
         except Exception as e:
             print(f"Error al eliminar notificación: {e}")
 
+    def on_notification_close_requested(self, notification_id):
+        """CloseNotification de una aplicación: retirar su notificación del panel"""
+        for i, notification in enumerate(self.notifications):
+            if notification.id == notification_id:
+                self._drop_notification(i)
+                break
+
     def clear_all_notifications(self):
         """Limpiar todas las notificaciones"""
         try:
+            for notification in self.notifications:
+                self._notify_closed(notification, 2)
             self.notifications.clear()
             self.update_notification_button()
-            # Refrescar el menú de notificaciones
-            if hasattr(self, 'notification_menu'):
-                self.notification_menu.close()
-                self.show_notifications_menu()
+            # Con el menú abierto basta con ocultar las filas
+            if self.notification_menu is not None and self.notification_menu.isVisible():
+                with _batched_updates(self._notif_scroll_widget):
+                    for row in self._notif_rows:
+                        row.hide()
+                self._fit_notifications_menu()
         except Exception as e:
             print(f"Error al limpiar notificaciones: {e}")
     
     def quit_application(self):
         """Salir de la aplicación"""
-        self.save_settings()
+        self.save_settings(wait=True)
+        self.stop_volume_monitor()
+        self._sys_stop.set()
         QApplication.quit()
     
     def closeEvent(self, event):
         """Manejar evento de cierre"""
-        if hasattr(self, 'tray') and self.tray.isVisible():
+        if self._tray_visible:
             # Minimizar a bandeja del sistema
             self.hide()
             event.ignore()
@@ -2971,55 +4420,28 @@ class DesktopPanel(QMainWindow):
 # Ya no es necesario, se movió arriba
 
 class SettingsDialog(QDialog):
-    def edit_selected_launcher_dialog(self):
-        row = self.launchers_list.currentRow()
-        if row < 0:
-            return
-        item = self.launchers_list.item(row)
-        launcher = item.data(Qt.ItemDataRole.UserRole)
-        dlg = QDialog(self)
-        dlg.setWindowTitle("Editar Lanzador")
-        layout = QVBoxLayout(dlg)
-        name_edit = QLineEdit(launcher.get("name", ""))
-        name_edit.setPlaceholderText("Nombre")
-        cmd_edit = QLineEdit(launcher.get("command") or "")
-        cmd_edit.setPlaceholderText("Comando (ej: thunar, firefox, etc)")
-        icon_edit = QLineEdit(launcher.get("icon", ""))
-        icon_edit.setPlaceholderText("Icono del sistema (ej: firefox, utilities-terminal)")
-        layout.addWidget(QLabel("Nombre:"))
-        layout.addWidget(name_edit)
-        layout.addWidget(QLabel("Comando:"))
-        layout.addWidget(cmd_edit)
-        layout.addWidget(QLabel("Icono del sistema:"))
-        layout.addWidget(icon_edit)
-        btns = QHBoxLayout()
-        ok_btn = QPushButton("Guardar")
-        cancel_btn = QPushButton("Cancelar")
-        btns.addWidget(ok_btn)
-        btns.addWidget(cancel_btn)
-        layout.addLayout(btns)
-        ok_btn.clicked.connect(dlg.accept)
-        cancel_btn.clicked.connect(dlg.reject)
-        if dlg.exec() == QDialog.Accepted:
-            name = name_edit.text().strip()
-            cmd = cmd_edit.text().strip()
-            icon = icon_edit.text().strip()
-            if name and icon:
-                new_launcher = {"name": name, "command": cmd if cmd else None, "icon": icon}
-                item.setText(name)
-                item.setIcon(self.parent.app_menu.get_icon(icon))
-                item.setData(Qt.ItemDataRole.UserRole, new_launcher)
     """Diálogo de configuración"""
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
-        self.setup_ui()
+        self._launcher_dlg = None  # Formulario de lanzador, creado al primer uso
+        self._launchers_loaded = False
+        self._launchers = []  # Un dict por fila de launchers_list, en el mismo orden
+        # Resueltos una vez: el tema del menú lo gestiona el panel (puede no tenerlo)
+        self._menu_theme = getattr(parent, 'menu_theme', None)
+        self._set_menu_theme = getattr(parent, 'set_menu_theme', None)
+        self._get_icon = ApplicationMenu.get_icon
+        # Construir sin repintar: la geometría se calcula una vez al terminar
+        with _batched_updates(self):
+            self.setup_ui()
     
     def setup_ui(self):
         """Configurar interfaz"""
         self.setWindowTitle("Configuración del Panel")
         self.setFixedSize(420, 340)
+        # Antes de crear los hijos, para que cada uno se pula una sola vez con ella
+        self.setStyleSheet(_SETTINGS_QSS)
 
         main_layout = QVBoxLayout(self)
 
@@ -3033,9 +4455,45 @@ class SettingsDialog(QDialog):
         self.tabs = QTabWidget()
         main_layout.addWidget(self.tabs)
 
-        # --- Pestaña de Opciones Generales ---
-        general_tab = QWidget()
-        general_layout = QVBoxLayout(general_tab)
+        # Las pestañas se construyen al abrirlas por primera vez; la visible, ya
+        self._tab_builders = [
+            ("General", self._build_general_tab),
+            ("Posición", self._build_position_tab),
+            ("Tema del Menú", self._build_theme_tab),
+            ("Panel", self._build_panel_tab),
+        ]
+        for name, _ in self._tab_builders:
+            self.tabs.addTab(QWidget(), name)
+        self._built_tabs = set()
+        self._ensure_tab_built(0)
+        self.tabs.currentChanged.connect(self._ensure_tab_built)
+
+        # --- Botones inferiores ---
+        buttons_layout = QHBoxLayout()
+        save_button = QPushButton("Guardar")
+        save_button.clicked.connect(self.on_save_clicked)
+        buttons_layout.addWidget(save_button)
+        cancel_button = QPushButton("Cancelar")
+        cancel_button.clicked.connect(self.reject)
+        buttons_layout.addWidget(cancel_button)
+        restart_button = QPushButton("Reiniciar Panel")
+        restart_button.clicked.connect(self.on_restart_clicked)
+        buttons_layout.addWidget(restart_button)
+        self.layout().addLayout(buttons_layout)
+
+    @pyqtSlot(int)
+    def _ensure_tab_built(self, index):
+        """Construir el contenido de la pestaña 'index' si todavía es un marcador vacío"""
+        if index < 0 or index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        tab = self.tabs.widget(index)
+        with _batched_updates(tab):
+            self._tab_builders[index][1](tab)
+
+    def _build_general_tab(self, tab):
+        """Pestaña de opciones generales"""
+        general_layout = QVBoxLayout(tab)
 
         options_group = QGroupBox("Opciones")
         options_layout = QVBoxLayout(options_group)
@@ -3049,6 +4507,9 @@ class SettingsDialog(QDialog):
         self.show_system_check = QCheckBox("Mostrar información del sistema")
         self.show_system_check.setChecked(self.parent.settings.get("show_system_info", True))
         options_layout.addWidget(self.show_system_check)
+        self.show_seconds_check = QCheckBox("Mostrar segundos en el reloj")
+        self.show_seconds_check.setChecked(self.parent.settings.get("show_seconds", True))
+        options_layout.addWidget(self.show_seconds_check)
 
         options_group.setLayout(options_layout)
         general_layout.addWidget(options_group)
@@ -3057,23 +4518,16 @@ class SettingsDialog(QDialog):
         info_group = QGroupBox("Información del Sistema")
         info_layout = QVBoxLayout(info_group)
         try:
-            import platform
-            system_info = f"Sistema: {platform.system()} {platform.release()}"
-            python_info = f"Python: {platform.python_version()}"
-            pyqt_info = f"PyQt: {PYQT_VERSION}"
-            info_layout.addWidget(QLabel(system_info))
-            info_layout.addWidget(QLabel(python_info))
-            info_layout.addWidget(QLabel(pyqt_info))
+            for line in _sys_info_lines():
+                info_layout.addWidget(QLabel(line))
             info_layout.addWidget(QLabel(f"psutil: {'Disponible' if PSUTIL_AVAILABLE else 'No disponible'}"))
         except Exception:
             info_layout.addWidget(QLabel("Información no disponible"))
         general_layout.addWidget(info_group)
 
-        self.tabs.addTab(general_tab, "General")
-
-        # --- Pestaña de Posición del Panel ---
-        position_tab = QWidget()
-        position_layout = QVBoxLayout(position_tab)
+    def _build_position_tab(self, tab):
+        """Pestaña de posición del panel"""
+        position_layout = QVBoxLayout(tab)
         position_group = QGroupBox("Posición del Panel")
         position_group_layout = QVBoxLayout(position_group)
         self.top_radio = QRadioButton("Arriba")
@@ -3087,7 +4541,6 @@ class SettingsDialog(QDialog):
         position_group.setLayout(position_group_layout)
         position_layout.addWidget(position_group)
         position_layout.addStretch()
-        self.tabs.addTab(position_tab, "Posición")
 
         # Cargar la posición actual
         position = self.parent.settings.get('position', 'bottom')
@@ -3100,9 +4553,9 @@ class SettingsDialog(QDialog):
         elif position == 'right':
             self.right_radio.setChecked(True)
 
-        # --- Pestaña de Tema del Menú ---
-        theme_tab = QWidget()
-        theme_layout = QVBoxLayout(theme_tab)
+    def _build_theme_tab(self, tab):
+        """Pestaña de tema del menú de aplicaciones"""
+        theme_layout = QVBoxLayout(tab)
         theme_group = QGroupBox("Tema del Menú de Aplicaciones")
         theme_group_layout = QVBoxLayout(theme_group)
 
@@ -3111,7 +4564,7 @@ class SettingsDialog(QDialog):
         self.theme_combo.addItem("Oscuro", "oscuro")
         self.theme_combo.addItem("Sistema", "sistema")
         # Cargar tema actual
-        current_theme = self.parent.app_menu.theme if hasattr(self.parent, 'app_menu') else "claro"
+        current_theme = self._menu_theme() if self._menu_theme is not None else "claro"
         idx = self.theme_combo.findData(current_theme)
         if idx >= 0:
             self.theme_combo.setCurrentIndex(idx)
@@ -3120,20 +4573,24 @@ class SettingsDialog(QDialog):
         theme_group.setLayout(theme_group_layout)
         theme_layout.addWidget(theme_group)
         theme_layout.addStretch()
-        self.tabs.addTab(theme_tab, "Tema del Menú")
 
-
-        # --- Pestaña de Lanzadores del Panel ---
-        panel_tab = QWidget()
-        panel_layout = QVBoxLayout(panel_tab)
+    def _build_panel_tab(self, tab):
+        """Pestaña de lanzadores del panel"""
+        panel_layout = QVBoxLayout(tab)
         self.launchers_list = QListWidget()
-        self.launchers_list.setIconSize(QSize(28, 28))
-        self.load_launchers_to_list()
+        self.launchers_list.setIconSize(_ICON_SIZE_28)
+        # Filas de igual altura y maquetación por lotes: la pestaña aparece sin esperar a la lista
+        self.launchers_list.setUniformItemSizes(True)
+        self.launchers_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.launchers_list.setBatchSize(16)
+        # La pestaña se pinta primero; la lista (y sus iconos) se llena en la siguiente vuelta
+        self.launchers_list.addItem(QListWidgetItem("Cargando..."))
+        self.launchers_list.setEnabled(False)
+        QTimer.singleShot(0, self.load_launchers_to_list)
         panel_layout.addWidget(QLabel("Lanzadores del Panel:"))
         panel_layout.addWidget(self.launchers_list)
 
-
-    # Botones para agregar, editar, eliminar y mover
+        # Botones para agregar, editar, eliminar y mover
         btns_layout = QHBoxLayout()
         add_btn = QPushButton("Agregar")
         edit_btn = QPushButton("Editar")
@@ -3152,186 +4609,203 @@ class SettingsDialog(QDialog):
         remove_btn.clicked.connect(self.remove_selected_launcher)
         up_btn.clicked.connect(self.move_launcher_up)
         down_btn.clicked.connect(self.move_launcher_down)
-        self.tabs.addTab(panel_tab, "Panel")
-
-        # --- Botones inferiores ---
-        buttons_layout = QHBoxLayout()
-        save_button = QPushButton("Guardar")
-        save_button.clicked.connect(self.on_save_clicked)
-        buttons_layout.addWidget(save_button)
-        cancel_button = QPushButton("Cancelar")
-        cancel_button.clicked.connect(self.reject)
-        buttons_layout.addWidget(cancel_button)
-        restart_button = QPushButton("Reiniciar Panel")
-        restart_button.clicked.connect(self.on_restart_clicked)
-        buttons_layout.addWidget(restart_button)
-        self.layout().addLayout(buttons_layout)
 
-    def on_save_clicked(self):
-        # Guardar la posición seleccionada
-        if self.top_radio.isChecked():
-            self.parent.settings['position'] = 'top'
-        elif self.bottom_radio.isChecked():
-            self.parent.settings['position'] = 'bottom'
-        elif self.left_radio.isChecked():
-            self.parent.settings['position'] = 'left'
-        elif self.right_radio.isChecked():
-            self.parent.settings['position'] = 'right'
+    def _store_general_settings(self):
+        """Pasar a parent.settings la posición y las opciones generales (sin escribir)"""
+        # Guardar la posición seleccionada (si no se abrió la pestaña, se conserva la actual)
+        if hasattr(self, 'top_radio'):
+            if self.top_radio.isChecked():
+                self.parent.settings['position'] = 'top'
+            elif self.bottom_radio.isChecked():
+                self.parent.settings['position'] = 'bottom'
+            elif self.left_radio.isChecked():
+                self.parent.settings['position'] = 'left'
+            elif self.right_radio.isChecked():
+                self.parent.settings['position'] = 'right'
         # Guardar otras opciones generales
         self.parent.settings['auto_hide'] = self.auto_hide_check.isChecked()
         self.parent.settings['show_system_info'] = self.show_system_check.isChecked()
-        # Guardar y aplicar
+        self.parent.settings['show_seconds'] = self.show_seconds_check.isChecked()
+
+    def _store_panel_settings(self):
+        """Pasar a parent.settings los lanzadores y el tema del menú, y mostrar u ocultar
+        la info del sistema (sin escribir ni cerrar el diálogo)"""
+        # Guardar lanzadores del panel (solo si se abrió su pestaña y ya se cargaron)
+        if self._launchers_loaded:
+            self.parent.settings["panel_launchers"] = list(self._launchers)
+
+        # Aplicar cambios
+        if not self.parent.settings["show_system_info"]:
+            self.parent.system_label.hide()
+        else:
+            self.parent.system_label.show()
+
+        # Guardar y aplicar tema del menú de aplicaciones
+        if self._set_menu_theme is not None and hasattr(self, 'theme_combo'):
+            selected_theme = self.theme_combo.currentData()
+            self._set_menu_theme(selected_theme)
+
+    def _apply_stored_settings(self, launchers=False):
+        """Escribir parent.settings una sola vez y aplicar posición (y lanzadores)"""
+        # La escritura va en segundo plano: no releer el archivo
+        if hasattr(self.parent, 'update_settings_state'):
+            self.parent.update_settings_state()
         if hasattr(self.parent, 'save_settings'):
             self.parent.save_settings()
-        if hasattr(self.parent, 'load_settings'):
-            self.parent.load_settings()
         if hasattr(self.parent, 'apply_position'):
             self.parent.apply_position()
+        if launchers and hasattr(self.parent, 'update_panel_launchers'):
+            self.parent.update_panel_launchers()
+
+    def on_save_clicked(self):
+        self._store_general_settings()
+        self._apply_stored_settings()
         self.accept()
 
     def on_restart_clicked(self):
-        # Guardar antes de reiniciar
-        self.on_save_clicked()
-        # Reiniciar el panel (cerrar y volver a abrir)
-        import sys
-        import os
-        python = sys.executable
-        os.execl(python, python, *sys.argv)
+        """Aplicar toda la configuración en caliente (posición, lanzadores, tema del menú e
+        info del sistema) en lugar de relanzar el intérprete; execl solo si algo falla"""
+        try:
+            self.save_settings()
+        except Exception as e:
+            print(f"No se pudo aplicar la configuración en caliente, reiniciando: {e}")
+            python = sys.executable
+            os.execl(python, python, *sys.argv)
 
     def load_launchers_to_list(self):
-        self.launchers_list.clear()
         launchers = self.parent.settings.get("panel_launchers", [
             {"name": "Menú", "command": None, "icon": "start-here"},
             {"name": "Terminal", "command": "terminal", "icon": "utilities-terminal"},
             {"name": "Archivos", "command": "file-manager", "icon": "system-file-manager"}
         ])
-        for launcher in launchers:
-            icon = self.parent.app_menu.get_icon(launcher["icon"])
-            item = QListWidgetItem(icon, launcher["name"])
-            item.setData(Qt.ItemDataRole.UserRole, launcher)
-            self.launchers_list.addItem(item)
+        # Sin repintar ni emitir currentRowChanged/itemChanged por cada fila
+        with _batched_updates(self.launchers_list):
+            self.launchers_list.clear()  # Quita también la fila "Cargando..."
+            for launcher in launchers:
+                icon = self._get_icon(launcher["icon"])
+                self.launchers_list.addItem(QListWidgetItem(icon, launcher["name"]))
+        self._launchers = list(launchers)
+        self.launchers_list.setEnabled(True)
+        self._launchers_loaded = True
+
+    def _launcher_form(self, title, ok_text, initial=None):
+        """Formulario de lanzador (se crea una vez y se reutiliza para agregar y editar).
+        Devuelve el lanzador como dict, o None si se cancela o faltan nombre o icono"""
+        if self._launcher_dlg is None:
+            dlg = self._launcher_dlg = QDialog(self)
+            layout = QVBoxLayout(dlg)
+            dlg.name_edit = QLineEdit()
+            dlg.name_edit.setPlaceholderText("Nombre")
+            dlg.cmd_edit = QLineEdit()
+            dlg.cmd_edit.setPlaceholderText("Comando (ej: thunar, firefox, etc)")
+            dlg.icon_edit = QLineEdit()
+            dlg.icon_edit.setPlaceholderText("Icono del sistema (ej: firefox, utilities-terminal)")
+            layout.addWidget(QLabel("Nombre:"))
+            layout.addWidget(dlg.name_edit)
+            layout.addWidget(QLabel("Comando:"))
+            layout.addWidget(dlg.cmd_edit)
+            layout.addWidget(QLabel("Icono del sistema:"))
+            layout.addWidget(dlg.icon_edit)
+            btns = QHBoxLayout()
+            dlg.ok_btn = QPushButton()
+            cancel_btn = QPushButton("Cancelar")
+            btns.addWidget(dlg.ok_btn)
+            btns.addWidget(cancel_btn)
+            layout.addLayout(btns)
+            dlg.ok_btn.clicked.connect(dlg.accept)
+            cancel_btn.clicked.connect(dlg.reject)
+        dlg = self._launcher_dlg
+        initial = initial or {}
+        dlg.setWindowTitle(title)
+        dlg.ok_btn.setText(ok_text)
+        dlg.name_edit.setText(initial.get("name", ""))
+        dlg.cmd_edit.setText(initial.get("command") or "")
+        dlg.icon_edit.setText(initial.get("icon", ""))
+        dlg.name_edit.setFocus()
+        if dlg.exec() != QDialog.Accepted:
+            return None
+        name = dlg.name_edit.text().strip()
+        cmd = dlg.cmd_edit.text().strip()
+        icon = dlg.icon_edit.text().strip()
+        if not (name and icon):
+            return None
+        return {"name": name, "command": cmd if cmd else None, "icon": icon}
 
     def add_launcher_dialog(self):
-        dlg = QDialog(self)
-        dlg.setWindowTitle("Agregar Lanzador")
-        layout = QVBoxLayout(dlg)
-        name_edit = QLineEdit()
-        name_edit.setPlaceholderText("Nombre")
-        cmd_edit = QLineEdit()
-        cmd_edit.setPlaceholderText("Comando (ej: thunar, firefox, etc)")
-        icon_edit = QLineEdit()
-        icon_edit.setPlaceholderText("Icono del sistema (ej: firefox, utilities-terminal)")
-        layout.addWidget(QLabel("Nombre:"))
-        layout.addWidget(name_edit)
-        layout.addWidget(QLabel("Comando:"))
-        layout.addWidget(cmd_edit)
-        layout.addWidget(QLabel("Icono del sistema:"))
-        layout.addWidget(icon_edit)
-        btns = QHBoxLayout()
-        ok_btn = QPushButton("Agregar")
-        cancel_btn = QPushButton("Cancelar")
-        btns.addWidget(ok_btn)
-        btns.addWidget(cancel_btn)
-        layout.addLayout(btns)
-        ok_btn.clicked.connect(dlg.accept)
-        cancel_btn.clicked.connect(dlg.reject)
-        if dlg.exec() == QDialog.Accepted:
-            name = name_edit.text().strip()
-            cmd = cmd_edit.text().strip()
-            icon = icon_edit.text().strip()
-            if name and icon:
-                launcher = {"name": name, "command": cmd if cmd else None, "icon": icon}
-                item = QListWidgetItem(self.parent.app_menu.get_icon(icon), name)
-                item.setData(Qt.ItemDataRole.UserRole, launcher)
-                self.launchers_list.addItem(item)
+        launcher = self._launcher_form("Agregar Lanzador", "Agregar")
+        if launcher:
+            self.launchers_list.addItem(QListWidgetItem(self._get_icon(launcher["icon"]), launcher["name"]))
+            self._launchers.append(launcher)
+
+    def edit_selected_launcher_dialog(self):
+        row = self.launchers_list.currentRow()
+        if row < 0:
+            return
+        item = self.launchers_list.item(row)
+        launcher = self._launcher_form("Editar Lanzador", "Guardar", self._launchers[row])
+        if launcher:
+            item.setText(launcher["name"])
+            item.setIcon(self._get_icon(launcher["icon"]))
+            self._launchers[row] = launcher
 
     def remove_selected_launcher(self):
         row = self.launchers_list.currentRow()
         if row >= 0:
             self.launchers_list.takeItem(row)
+            del self._launchers[row]
 
     def move_launcher_up(self):
         row = self.launchers_list.currentRow()
         if row > 0:
-            item = self.launchers_list.takeItem(row)
-            self.launchers_list.insertItem(row-1, item)
-            self.launchers_list.setCurrentRow(row-1)
+            with _batched_updates(self.launchers_list):
+                item = self.launchers_list.takeItem(row)
+                self.launchers_list.insertItem(row-1, item)
+            self._launchers[row-1], self._launchers[row] = self._launchers[row], self._launchers[row-1]
+            self.launchers_list.setCurrentRow(row-1)  # Una sola currentRowChanged
 
     def move_launcher_down(self):
         row = self.launchers_list.currentRow()
         if row < self.launchers_list.count()-1 and row >= 0:
-            item = self.launchers_list.takeItem(row)
-            self.launchers_list.insertItem(row+1, item)
-            self.launchers_list.setCurrentRow(row+1)
-
-        # Estilo
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #3e3e3e;
-                color: white;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 1px solid #555;
-                margin-top: 10px;
-                padding-top: 5px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QPushButton {
-                background-color: #505050;
-                border: 1px solid #666;
-                padding: 5px 15px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #606060;
-            }
-        """)
+            with _batched_updates(self.launchers_list):
+                item = self.launchers_list.takeItem(row)
+                self.launchers_list.insertItem(row+1, item)
+            self._launchers[row], self._launchers[row+1] = self._launchers[row+1], self._launchers[row]
+            self.launchers_list.setCurrentRow(row+1)  # Una sola currentRowChanged
     
     def save_settings(self):
-        """Guardar configuración"""
-        self.parent.settings["auto_hide"] = self.auto_hide_check.isChecked()
-        self.parent.settings["show_system_info"] = self.show_system_check.isChecked()
-
-        # Guardar lanzadores del panel
-        launchers = []
-        for i in range(self.launchers_list.count()):
-            launcher = self.launchers_list.item(i).data(Qt.ItemDataRole.UserRole)
-            launchers.append(launcher)
-        self.parent.settings["panel_launchers"] = launchers
-
-        # Aplicar cambios
-        if not self.parent.settings["show_system_info"]:
-            self.parent.system_label.hide()
-        else:
-            self.parent.system_label.show()
-
-        # Guardar y aplicar tema del menú de aplicaciones
-        if hasattr(self.parent, 'app_menu'):
-            selected_theme = self.theme_combo.currentData()
-            self.parent.app_menu.set_theme(selected_theme)
-
-        self.parent.save_settings()
-        if hasattr(self.parent, 'update_panel_launchers'):
-            self.parent.update_panel_launchers()
+        """Guardar toda la configuración del diálogo con una sola escritura"""
+        self._store_general_settings()
+        self._store_panel_settings()
+        self._apply_stored_settings(launchers=True)
         self.accept()
     
     def restart_panel(self):
         """Reiniciar panel"""
         self.accept()
         self.parent.quit_application()
-        subprocess.Popen([sys.executable, __file__])
+        _spawn([sys.executable, __file__])
 
 
 
 def main():
     """Función principal"""
+    # Antes de crear la QApplication: sin ventanas nativas hermanas para cada widget nativo
+    # y con los eventos de ratón/tableta seguidos agrupados en uno
+    for name in ('AA_DontCreateNativeWidgetSiblings', 'AA_CompressHighFrequencyEvents',
+                 'AA_CompressTabletEvents'):
+        # PyQt6 solo expone los enums con ámbito; los PyQt5 antiguos solo en Qt
+        attr = getattr(Qt.ApplicationAttribute, name, None)
+        if attr is None:
+            attr = getattr(Qt, name, None)
+        if attr is not None:
+            QApplication.setAttribute(attr, True)
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)  # No salir cuando se cierra la ventana
+    try:
+        # Ordenación alfabética según el idioma del sistema (lista de aplicaciones)
+        locale.setlocale(locale.LC_COLLATE, "")
+    except locale.Error:
+        pass
     
     # Verificar si ya hay una instancia ejecutándose
     app.setApplicationName("DesktopPanel")
@@ -3339,6 +4813,8 @@ def main():
     # Crear y mostrar panel
     panel = DesktopPanel()
     panel.show()
+    # Precargar los iconos fijos cuando el bucle de eventos ya esté en marcha
+    QTimer.singleShot(0, _prewarm_icons)
     
     # Configurar manejo de señales del sistema
     import signal
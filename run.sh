@@ -143,8 +143,8 @@ check_pip() {
 # Función para instalar dependencias Python
 install_python_dependencies() {
     print_message $CYAN "Verificando dependencias de Python..."
-    # Lista de dependencias Python
-    local python_deps=("psutil" "notify2")
+    # Lista de dependencias Python ("módulo:paquete de pip" si los nombres difieren)
+    local python_deps=("psutil" "notify2" "Xlib:python-xlib" "orjson" "pulsectl")
     local pyqt_deps=("PyQt6" "PyQt5")
     local missing_deps=()
     local pyqt_found=false
@@ -165,11 +165,13 @@ install_python_dependencies() {
 
     # Verificar otras dependencias Python
     for dep in "${python_deps[@]}"; do
-        python3 -c "import $dep" 2>/dev/null
+        local module="${dep%%:*}"
+        local package="${dep#*:}"
+        python3 -c "import $module" 2>/dev/null
         if [ $? -ne 0 ]; then
-            missing_deps+=("$dep")
+            missing_deps+=("$package")
         else
-            print_message $GREEN "✓ $dep disponible"
+            print_message $GREEN "✓ $package disponible"
         fi
     done
 